@@ -0,0 +1,97 @@
+import asyncio
+import hashlib
+import json
+import os
+from typing import Any, Dict, List, Optional
+
+from backboard import BackboardClient, BackboardNotFoundError
+
+from app.settings import CACHE_DIR, env_str
+
+
+def assistant_fingerprint(namespace: str, name: str, description: str, tools: List[Dict[str, Any]]) -> str:
+    payload = json.dumps(
+        {"namespace": namespace, "name": name, "description": description, "tools": tools},
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class AssistantRegistry:
+    """
+    Creates each Backboard assistant once per distinct (name, prompt, tools)
+    and remembers its id in a local JSON file, so requests and restarts reuse
+    it instead of creating a new assistant every time.
+    """
+
+    def __init__(self, client: BackboardClient, path: Optional[str] = None):
+        self.client = client
+        self.path = path
+        # Ids are only valid for the account/server that issued them.
+        account = f"{getattr(client, 'base_url', '')}|{getattr(client, 'api_key', '')}"
+        self.namespace = hashlib.sha256(account.encode("utf-8")).hexdigest()[:16]
+        self._ids: Dict[str, str] = self._load()
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    def _load(self) -> Dict[str, str]:
+        if not self.path or not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as fh:
+                data = json.load(fh)
+        except (OSError, ValueError):
+            return {}
+        return {str(k): str(v) for k, v in data.items()} if isinstance(data, dict) else {}
+
+    def _save(self) -> None:
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as fh:
+            json.dump(self._ids, fh, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    async def ensure(self, name: str, description: str, tools: Optional[List[Dict[str, Any]]] = None) -> str:
+        key = assistant_fingerprint(self.namespace, name, description, tools or [])
+        assistant_id = self._ids.get(key)
+        if assistant_id:
+            return assistant_id
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            assistant_id = self._ids.get(key)
+            if assistant_id:
+                return assistant_id
+            assistant = await self.client.create_assistant(
+                name=name,
+                description=description,
+                tools=tools or [],
+            )
+            assistant_id = str(assistant.assistant_id)
+            self._ids[key] = assistant_id
+            self._save()
+            return assistant_id
+
+    async def create_thread(self, name: str, description: str, tools: Optional[List[Dict[str, Any]]] = None):
+        assistant_id = await self.ensure(name, description, tools)
+        try:
+            return await self.client.create_thread(assistant_id=assistant_id)
+        except BackboardNotFoundError:
+            # Deleted server-side since we cached it: recreate once and retry.
+            self.invalidate(assistant_id)
+            assistant_id = await self.ensure(name, description, tools)
+            return await self.client.create_thread(assistant_id=assistant_id)
+
+    def invalidate(self, assistant_id: str) -> None:
+        """Forget an id the server no longer recognises; the next ensure() recreates it."""
+        stale = [key for key, value in self._ids.items() if value == assistant_id]
+        for key in stale:
+            del self._ids[key]
+        if stale:
+            self._save()
+
+
+def default_registry_path() -> str:
+    return env_str("ASSISTANT_REGISTRY_PATH", os.path.join(CACHE_DIR, "assistants.json"))
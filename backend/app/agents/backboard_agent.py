@@ -1,12 +1,38 @@
+import asyncio
 from datetime import datetime, timezone
 import json
-from time import timezone
-from typing import Any, Dict, List, Optional
+import logging
+from typing import Any, Dict, List, Optional, Tuple
 from backboard import BackboardClient
 from pydantic import BaseModel, ValidationError
 from app.agents.prompts import SYSTEM_PROMPT
+from app.agents.evidence import compact_evidence_bundle
+from app.agents.provisional import provisional_risk
 from app.schemas.agent_io import AgentContext, AgentOutput, ClaimInput, Verdict
-from app.tools.registry import get_tool_definitions, build_tool_registry
+from app.agents.assistant_registry import AssistantRegistry, default_registry_path
+from app.events import emit
+from app.metrics import EVIDENCE_BUNDLE_BYTES, span
+from app.settings import env_bool, env_float, env_int, env_str
+from app.tools.registry import get_tool_definitions, build_tool_registry, warm_tool_assistants
+
+logger = logging.getLogger(__name__)
+
+
+# Per-tool defaults (seconds); TOOL_TIMEOUT_<NAME>_SECONDS overrides each.
+_TOOL_TIMEOUTS: Dict[str, float] = {
+    "web_search_llm": 90.0,
+    "credibility_llm": 45.0,
+    "numeric_verify": 5.0,
+}
+
+
+def make_backboard_client(api_key: str) -> BackboardClient:
+    """BACKBOARD_BASE_URL points the SDK at another server, e.g. the local stand-in used for load tests."""
+    options: Dict[str, Any] = {"timeout": env_int("BACKBOARD_TIMEOUT_SECONDS", 30)}
+    base_url = env_str("BACKBOARD_BASE_URL", "")
+    if base_url:
+        options["base_url"] = base_url
+    return BackboardClient(api_key=api_key, **options)
 
 
 def _now_iso() -> str:
@@ -27,7 +53,7 @@ def extract_evidence_items_tools_output(
 
     if tool_name == "web_search_llm":
         selected = tool_output.get("selected", []) or []
-        print(f"Extracting evidence from web_search_llm output, selected items: {selected}")
+        logger.debug("Extracting evidence from web_search_llm output, selected items: %s", selected)
         for item in selected:
             evidence.append(
                 {
@@ -46,7 +72,9 @@ def extract_evidence_items_tools_output(
         # This tool doesn't create evidence; it annotates credibility.
         # We return empty; caller will use this output to enrich evidence.
         return []
-    
+    # numeric_verify and any other tool: no evidence items.
+    return evidence
+
 def _apply_credibility_to_evidence(
     evidence: List[Dict[str, Any]],
     credibility_items: List[Dict[str, Any]],
@@ -88,34 +116,77 @@ def _tc_parsed_args(tc):
 
 
 class BackboardAgent:
-    def __init__(self, api_key:str, model_name:str = ""):
-        self.client = BackboardClient(api_key=api_key)
+    ASSISTANT_NAME = "Backboard_agent"
+
+    def __init__(self, api_key:str, model_name:str = "", client: Optional[BackboardClient] = None):
+        # `client` lets benchmarks and local runs substitute a stand-in for the SDK client.
+        self.client = client or make_backboard_client(api_key)
         self.model_name = model_name
+        self.assistants = AssistantRegistry(self.client, path=default_registry_path())
+        # Built once: the tools hold no per-request state.
+        self.tool_registry = build_tool_registry(client=self.client, assistants=self.assistants)
+        self.tools = get_tool_definitions()
+        self.assistant_id: Optional[str] = None
+        self.max_concurrent_tools = max(1, env_int("TOOL_ROUND_CONCURRENCY", 4))
 
     async def ensure_assistant(self):
-        tools = get_tool_definitions()
-        print(tools)
-        assistant = await self.client.create_assistant(
-            name=f"Backboard_agent",
-            description= SYSTEM_PROMPT,
-            tools = tools,
+        self.assistant_id = await self.assistants.ensure(
+            name=self.ASSISTANT_NAME,
+            description=SYSTEM_PROMPT,
+            tools=self.tools,
         )
-
-        print(f"Created assistant with ID: {assistant.assistant_id}")
-        self.assistant_id = assistant.assistant_id
         return self.assistant_id
-    
 
-    async def run(self, inp: ClaimInput, assistant_id: Optional[str] = None) -> AgentOutput:
-        tool_registry = build_tool_registry(client=self.client)
-        assistant_id = await self.ensure_assistant()
+    async def warm(self) -> None:
+        """Resolve every assistant up front so none is created on the request path."""
+        await self.ensure_assistant()
+        await warm_tool_assistants(self.client, self.assistants)
+
+    def _tool_timeout(self, fn_name: str) -> float:
+        default = env_float("TOOL_TIMEOUT_SECONDS", 60.0)
+        return env_float(f"TOOL_TIMEOUT_{fn_name.upper()}_SECONDS", _TOOL_TIMEOUTS.get(fn_name, default))
+
+    async def _run_tool_call(
+        self,
+        tool_registry: Dict[str, Any],
+        tc: Any,
+        semaphore: asyncio.Semaphore,
+    ) -> Tuple[Optional[str], Any, Any]:
+        """Runs one tool call; returns (fn_name, claim_id_hint, output)."""
+        fn_name = _tc_name(tc)
+        args_str = _tc_args_str(tc)
+        logger.debug("Tool call: %s with arguments: %s", fn_name, args_str)
+
+        if fn_name is None:
+            return None, None, {"error": "Malformed tool call: missing function.name"}
+
+        args = _tc_parsed_args(tc)
+        if args is None:
+            args = json.loads(args_str)
+
+        claim_id_hint = args.get("claim_id") if isinstance(args, dict) else None
+
+        async with semaphore:
+            try:
+                with span(f"tool:{fn_name}"):
+                    out = await asyncio.wait_for(tool_registry[fn_name](args), timeout=self._tool_timeout(fn_name))
+            except asyncio.TimeoutError:
+                out = {"error": f"Tool {fn_name} timed out"}
+            except Exception as e:
+                logger.warning("Tool %s failed: %s: %s", fn_name, type(e).__name__, e)
+                out = {"error": f"Tool {fn_name} execution error"}
+        return fn_name, claim_id_hint, out
 
-        # if not assistant_id:
-            # assistant_id = await self.ensure_assistant()
-        
-        thread = await self.client.create_thread(
-            assistant_id=assistant_id
-        )
+    async def run(self, inp: ClaimInput, assistant_id: Optional[str] = None) -> AgentOutput:
+        tool_registry = self.tool_registry
+        if assistant_id:
+            thread = await self.client.create_thread(assistant_id=assistant_id)
+        else:
+            thread = await self.assistants.create_thread(
+                name=self.ASSISTANT_NAME,
+                description=SYSTEM_PROMPT,
+                tools=self.tools,
+            )
 
         thread_id = thread.thread_id
         message_payload : Dict[str, Any] = {
@@ -125,16 +196,17 @@ class BackboardAgent:
         if inp.context:
             message_payload["context"] = inp.context.model_dump()
         
-        print(message_payload)
-        resp = await self.client.add_message(
-            thread_id=thread_id,
-            content=json.dumps(message_payload, default=str),
-            stream=False,
-            memory="off",
-            model_name=self.model_name,
-        )
+        logger.debug("Initial message: %s", message_payload)
+        with span("llm_planning"):
+            resp = await self.client.add_message(
+                thread_id=thread_id,
+                content=json.dumps(message_payload, default=str),
+                stream=False,
+                memory="off",
+                model_name=self.model_name,
+            )
 
-        print(f"Initial response: {resp}")
+        logger.debug("Initial response: %s", resp)
 
         tool_rounds = 0
         working_evidence: List[Dict[str, Any]] = []
@@ -144,38 +216,32 @@ class BackboardAgent:
             tool_rounds += 1
             outputs = []
 
-            for tc in resp.tool_calls:
-                # fn_name = tc.function.name
-                fn_name = _tc_name(tc)
-                args_str = _tc_args_str(tc)
-                print(f"Tool call: {fn_name} with arguments: {args_str}")
-                
-                # if fn_name not in tool_registry:
-                #     out = {"error": f"Tool {fn_name} not found"}
-                # else:
-                #     args = getattr(tc.function,  "parsed_arguments", None)
+            # Calls in one round are independent: run them concurrently, then
+            # fold results back in the model's call order so evidence and
+            # credibility merging stay deterministic.
+            semaphore = asyncio.Semaphore(self.max_concurrent_tools)
+            await emit("tool_round", {"round": tool_rounds, "tools": [_tc_name(tc) for tc in resp.tool_calls]})
+            results = await asyncio.gather(
+                *(self._run_tool_call(tool_registry, tc, semaphore) for tc in resp.tool_calls)
+            )
 
+            for tc, (fn_name, claim_id_hint, out) in zip(resp.tool_calls, results):
                 if fn_name is None:
-                    out = {"error": "Malformed tool call: missing function.name"}
-                    tool_call_id = _tc_id(tc)
-                    outputs.append({"tool_call_id": tool_call_id, "output": json.dumps(out)})
+                    outputs.append({"tool_call_id": _tc_id(tc), "output": json.dumps(out)})
                     continue
 
-                args = _tc_parsed_args(tc)
-                if args is None:
-                    args = json.loads(args_str)
-
-                claim_id_hint = args.get("claim_id") if isinstance(args, dict) else None
-                
-                try:
-                    out = await tool_registry[fn_name](args)
-                except Exception as e:
-                    out = {"error": f"Tool {fn_name} execution error"}
-
                 out_dict = _safe_json_load(out)
                 if fn_name == "credibility_llm":
                     credibility_cache.extend(out_dict.get("items", []) or [])
+                    await emit("credibility", {"items": out_dict.get("items", []) or []})
                 else:
+                    if fn_name == "web_search_llm":
+                        await emit("search_results", {
+                            "claim_id": claim_id_hint,
+                            "queries": out_dict.get("queries", []),
+                            "selected": out_dict.get("selected", []) or [],
+                            "error": out_dict.get("error"),
+                        })
                     working_evidence.extend(
                         extract_evidence_items_tools_output(
                             tool_name=fn_name,
@@ -188,21 +254,34 @@ class BackboardAgent:
                     "output": json.dumps(out)
                 })
 
-            resp = await self.client.submit_tool_outputs(
-                thread_id=thread_id,
-                run_id=resp.run_id,
-                tool_outputs=outputs
-            )
+            if credibility_cache:
+                context_text = (inp.context.ocr_text or "") if inp.context else ""
+                await emit("provisional", provisional_risk(
+                    "\n".join(list(inp.claims) + [context_text]),
+                    [item.get("tier") for item in credibility_cache],
+                ))
 
-        
-        if credibility_cache and working_evidence:
-            working_evidence = _apply_credibility_to_evidence(working_evidence, credibility_cache)
+            with span("llm_tool_round"):
+                resp = await self.client.submit_tool_outputs(
+                    thread_id=thread_id,
+                    run_id=resp.run_id,
+                    tool_outputs=outputs
+                )
 
-        evidence_bundle = {
-            "claims": [{"claim_id": i, "text": c} for i, c in enumerate(inp.claims)],
-            "evidence": working_evidence,
-            "credibility_items": credibility_cache,
-        }
+        
+        if env_bool("EVIDENCE_COMPACTION_ENABLED", True):
+            evidence_bundle, compaction = compact_evidence_bundle(inp.claims, working_evidence, credibility_cache)
+            EVIDENCE_BUNDLE_BYTES.observe(("raw",), compaction["bytes_before"])
+            EVIDENCE_BUNDLE_BYTES.observe(("compact",), compaction["bytes_after"])
+            logger.debug("Evidence bundle compaction: %s", compaction)
+        else:
+            if credibility_cache and working_evidence:
+                working_evidence = _apply_credibility_to_evidence(working_evidence, credibility_cache)
+            evidence_bundle = {
+                "claims": [{"claim_id": i, "text": c} for i, c in enumerate(inp.claims)],
+                "evidence": working_evidence,
+                "credibility_items": credibility_cache,
+            }
 
         synthesis_message = (
             "You are now in STAGE 3 (Evidence Synthesis and Conclusion Generation).\n\n"
@@ -217,15 +296,16 @@ class BackboardAgent:
             f"{json.dumps(evidence_bundle, ensure_ascii=False)}"
         )
 
-        resp2 = await self.client.add_message(
-            thread_id=thread_id,
-            content=synthesis_message,
-            stream=False,
-            memory="off",
-            model_name=self.model_name,
-        )
+        with span("llm_synthesis"):
+            resp2 = await self.client.add_message(
+                thread_id=thread_id,
+                content=synthesis_message,
+                stream=False,
+                memory="off",
+                model_name=self.model_name,
+            )
 
-        print(f"Synthesis response: {resp2}")
+        logger.debug("Synthesis response: %s", resp2)
 
 
         raw = getattr(resp2, "content" , None)
@@ -0,0 +1,149 @@
+import json
+import re
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from app.settings import env_float, env_int
+from app.tools.urls import canonical_url, url_domain
+
+_TIER_WEIGHT = {"high": 1.0, "medium": 0.6, "low": 0.2}
+_UNKNOWN_TIER_WEIGHT = 0.4
+_WORD_RE = re.compile(r"[^\W_]{3,}")
+# Shingles keep every token, numbers included: "rose 3%" and "rose 5%" are different reports.
+_TOKEN_RE = re.compile(r"[^\W_]+")
+_STOPWORDS = {
+    "the", "and", "for", "that", "this", "with", "from", "are", "was", "were", "has", "have",
+    "had", "its", "not", "but", "you", "they", "their", "will", "about", "into", "than",
+}
+
+
+def _terms(text: str) -> Set[str]:
+    return {word for word in _WORD_RE.findall((text or "").lower()) if word not in _STOPWORDS}
+
+
+def _shingles(text: str) -> Set[Tuple[str, ...]]:
+    words = _TOKEN_RE.findall((text or "").lower())
+    if len(words) < 3:
+        return {tuple(words)} if words else set()
+    return {tuple(words[i:i + 3]) for i in range(len(words) - 2)}
+
+
+def _similarity(a: Set[Tuple[str, ...]], b: Set[Tuple[str, ...]]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def _truncate(text: str, max_tokens: int) -> str:
+    # ~4 characters per token for English text; close enough for budgeting.
+    max_chars = max_tokens * 4
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars]
+    space = cut.rfind(" ")
+    return (cut[:space] if space > max_chars // 2 else cut).rstrip(" ,;:") + "…"
+
+
+def _tier_lookup(credibility_items: Sequence[Dict[str, Any]]) -> Tuple[Dict[str, str], Dict[str, str]]:
+    by_url: Dict[str, str] = {}
+    by_domain: Dict[str, str] = {}
+    for item in credibility_items:
+        tier = str(item.get("tier") or "").lower()
+        if tier not in _TIER_WEIGHT:
+            continue
+        url = str(item.get("url") or "")
+        if url:
+            by_url.setdefault(canonical_url(url), tier)
+        domain = item.get("domain") or url_domain(url)
+        if domain:
+            by_domain.setdefault(str(domain), tier)
+    return by_url, by_domain
+
+
+def compact_evidence_bundle(
+    claims: Sequence[str],
+    evidence: Sequence[Dict[str, Any]],
+    credibility_items: Sequence[Dict[str, Any]],
+) -> Tuple[Dict[str, Any], Dict[str, int]]:
+    """
+    The synthesis bundle with credibility tiers folded into the evidence
+    items (no separate credibility_items list), evidence deduplicated by
+    canonical URL and near-identical summary, at most EVIDENCE_MAX_PER_CLAIM
+    items per claim ranked by claim-term overlap plus credibility, and
+    summaries truncated to share EVIDENCE_TOKEN_BUDGET. Duplicates are kept as
+    `also_reported_by` domains on the item that survives.
+
+    Returns (bundle, stats); stats compare the serialized sizes of the
+    uncompacted and compacted bundles.
+    """
+    max_per_claim = max(1, env_int("EVIDENCE_MAX_PER_CLAIM", 6))
+    similarity = env_float("EVIDENCE_DUPLICATE_SIMILARITY", 0.8)
+    token_budget = max(1, env_int("EVIDENCE_TOKEN_BUDGET", 2000))
+    max_item_tokens = max(1, env_int("EVIDENCE_SUMMARY_MAX_TOKENS", 120))
+
+    tier_by_url, tier_by_domain = _tier_lookup(credibility_items)
+    claim_terms = [_terms(claim) for claim in claims]
+
+    by_claim: Dict[int, List[Tuple[float, int, Dict[str, Any]]]] = {}
+    for position, item in enumerate(evidence):
+        claim_id = int(item.get("claim_id") or 0)
+        url = str(item.get("source_url") or "")
+        tier = str(item.get("source_credibility") or "").lower() or None
+        if tier not in _TIER_WEIGHT:
+            tier = tier_by_url.get(canonical_url(url)) or tier_by_domain.get(url_domain(url))
+        terms = claim_terms[claim_id] if 0 <= claim_id < len(claim_terms) else set()
+        text_terms = _terms(f"{item.get('title') or ''} {item.get('summary') or ''}")
+        relevance = len(terms & text_terms) / len(terms) if terms else 0.0
+        score = relevance + _TIER_WEIGHT.get(tier or "", _UNKNOWN_TIER_WEIGHT)
+        by_claim.setdefault(claim_id, []).append((score, position, {**item, "source_credibility": tier}))
+
+    duplicates = 0
+    over_cap = 0
+    kept: List[Dict[str, Any]] = []
+    for claim_id in sorted(by_claim):
+        ranked = sorted(by_claim[claim_id], key=lambda entry: (-entry[0], entry[1]))
+        survivors: List[Tuple[Dict[str, Any], Optional[str], Set[Tuple[str, ...]]]] = []
+        for _score, _position, item in ranked:
+            url = str(item.get("source_url") or "")
+            key = canonical_url(url) if url else None
+            shingles = _shingles(str(item.get("summary") or ""))
+            match = next(
+                (
+                    survivor
+                    for survivor in survivors
+                    if (key and key == survivor[1]) or _similarity(shingles, survivor[2]) >= similarity
+                ),
+                None,
+            )
+            if match is not None:
+                duplicates += 1
+                domain = url_domain(url)
+                also = match[0].setdefault("also_reported_by", [])
+                if domain and domain != url_domain(str(match[0].get("source_url") or "")) and domain not in also:
+                    also.append(domain)
+                continue
+            if len(survivors) >= max_per_claim:
+                over_cap += 1
+                continue
+            survivors.append((item, key, shingles))
+        kept.extend(survivor[0] for survivor in survivors)
+
+    per_item_tokens = min(max_item_tokens, token_budget // max(1, len(kept)))
+    for item in kept:
+        item["summary"] = _truncate(str(item.get("summary") or ""), per_item_tokens)
+        if not item.get("also_reported_by"):
+            item.pop("also_reported_by", None)
+
+    claims_payload = [{"claim_id": i, "text": c} for i, c in enumerate(claims)]
+    original = {"claims": claims_payload, "evidence": list(evidence), "credibility_items": list(credibility_items)}
+    bundle = {"claims": claims_payload, "evidence": kept}
+    bytes_before = len(json.dumps(original, ensure_ascii=False).encode("utf-8"))
+    bytes_after = len(json.dumps(bundle, ensure_ascii=False).encode("utf-8"))
+    stats = {
+        "items_before": len(evidence),
+        "items_after": len(kept),
+        "duplicates_merged": duplicates,
+        "dropped_over_cap": over_cap,
+        "bytes_before": bytes_before,
+        "bytes_after": bytes_after,
+    }
+    return bundle, stats
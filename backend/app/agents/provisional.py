@@ -0,0 +1,63 @@
+import re
+from typing import Any, Dict, List, Sequence
+
+# Wording typical of viral misinformation; each hit nudges the score up.
+_SENSATIONAL = [
+    r"\bbreaking\b",
+    r"\bshocking\b",
+    r"\bexposed\b",
+    r"\bmiracle\b",
+    r"\bcures?\b",
+    r"\bbanned\b",
+    r"\bhoax\b",
+    r"\bcover[- ]?up\b",
+    r"\bwake up\b",
+    r"\bshare (this )?before\b",
+    r"don'?t want you to know",
+    r"(main ?stream|msm) (media )?(won'?t|will not)",
+    r"\b100 ?%",
+]
+_SENSATIONAL_RE = [re.compile(pattern, re.IGNORECASE) for pattern in _SENSATIONAL]
+_NUMBER_RE = re.compile(r"\d[\d,.]*\s*(%|percent|million|billion|x\b)", re.IGNORECASE)
+
+
+def provisional_risk(text: str, credibility_tiers: Sequence[str] = ()) -> Dict[str, Any]:
+    """
+    Cheap heuristic misinformation risk from the post text and, once known,
+    the credibility tiers of retrieved sources. Only a placeholder for the UI
+    until the agent's verdict arrives; it never feeds into that verdict.
+    """
+    text = text or ""
+    score = 0.35
+    signals: List[str] = []
+
+    hits = sum(1 for pattern in _SENSATIONAL_RE if pattern.search(text))
+    if hits:
+        score += min(0.25, 0.08 * hits)
+        signals.append(f"sensational_phrases:{hits}")
+
+    letters = [ch for ch in text if ch.isalpha()]
+    if len(letters) >= 20 and sum(ch.isupper() for ch in letters) / len(letters) > 0.3:
+        score += 0.1
+        signals.append("shouting_caps")
+
+    if text.count("!") >= 2:
+        score += 0.05
+        signals.append("exclamations")
+
+    if _NUMBER_RE.search(text):
+        score += 0.05
+        signals.append("numeric_claim")
+
+    tiers = [str(tier).lower() for tier in credibility_tiers if tier]
+    if tiers:
+        high = sum(tier == "high" for tier in tiers) / len(tiers)
+        low = sum(tier == "low" for tier in tiers) / len(tiers)
+        score += 0.25 * low - 0.2 * high
+        signals.append(f"sources:{len(tiers)} high={high:.2f} low={low:.2f}")
+
+    return {
+        "misinformation_risk_score": round(min(0.95, max(0.05, score)), 3),
+        "signals": signals,
+        "provisional": True,
+    }
@@ -0,0 +1,108 @@
+import re
+from typing import List, Optional
+
+from app.metrics import TRIAGE_DECISIONS
+from app.schemas.agent_io import AgentOutput, Verdict
+from app.settings import env_bool
+from app.tools.numeric_verify import numeric_verify_batch
+
+# Auto-generated alt text ("Photo by jane on May 1, 2024. May be an image of
+# 2 people and text that says 'SALE'"): only the quoted text is post content.
+_BOILERPLATE_ALT_RE = re.compile(
+    r"^\s*(?:(?:photo|image|picture|video|reel)\s+(?:by|from|shared by)\b"
+    r"|(?:may|might)\s+be\s+(?:an?\s+)?(?:image|graphic|cartoon|meme|screenshot|illustration|close-up)\b"
+    r"|no (?:photo|image) description available)",
+    re.IGNORECASE,
+)
+_SAYS_RE = re.compile(r"text that says\s+['\"‘“](.+?)['\"’”](?=[\s.,]|$)", re.IGNORECASE | re.DOTALL)
+_WORD_RE = re.compile(r"[^\W\d_]{2,}")
+_MENTION_RE = re.compile(r"(?<!\w)@\w+")
+_URL_RE = re.compile(r"https?://|www\.", re.IGNORECASE)
+
+# Words that make up greetings, celebrations, feelings, everyday scenes and
+# account promotion ("Happy Friday! Link in bio"). A post counts as having no
+# claim only when every word it has is one of these, so any other word, a
+# number or a link sends it to the agent. Keep it to vocabulary that cannot
+# carry a checkable claim on its own.
+_SOCIAL_WORDS = frozenset(
+    """
+    an the and or but to of in on at for with from by up out off all as if
+    my me mine our ours us we you your yours ya it its this that these those here there
+    is are am was be been being ve ll re im ive youre were thats whats
+    just very too so much many more most some one ever always again now still what how who when
+    love loved loving lovely lovin happy happiest birthday bday anniversary congrats congratulations
+    wedding engaged thank thanks thankful grateful gratitude blessed proud miss missing
+    good great best better morning afternoon evening night tonight today tomorrow yesterday
+    weekend week monday tuesday wednesday thursday friday saturday sunday
+    vibes vibe mood throwback tbt memories memory friends friend bestie besties bff
+    family fam mom mum dad baby babe kids sister brother squad crew girls guys everyone everybody
+    summer winter spring fall autumn season holiday holidays vacation christmas xmas merry
+    easter halloween thanksgiving new year day days time times moment moments life
+    cute beautiful gorgeous amazing awesome cool nice perfect sweet fun funny cheers
+    lol lmao omg wow yay yes hello hi hey bye welcome enjoy enjoying enjoyed
+    celebrate celebrating feeling feel feels smile smiles sunshine sunset sunrise beach view views
+    selfie pic pics photo photos coffee brunch dinner lunch breakfast food foodie yummy delicious party
+    ootd nofilter instagood photooftheday xoxo forever together home back finally first last
+    link bio follow followers like likes comment comments tag subscribe check post posts dm
+    stay tuned coming soon live watch shop sale giveaway win
+    support couple date wait game go let lets can outfit
+    """.split()
+)
+
+
+def post_content(alt_text: str) -> str:
+    """The part of alt text written by a person, or quoted from the image, rather than generated boilerplate."""
+    alt_text = (alt_text or "").strip()
+    if not _BOILERPLATE_ALT_RE.match(alt_text):
+        return alt_text
+    return "\n".join(quote.strip() for quote in _SAYS_RE.findall(alt_text))
+
+
+def _words(text: str) -> List[str]:
+    return _WORD_RE.findall(_MENTION_RE.sub(" ", text).lower())
+
+
+def _numbers(text: str) -> int:
+    return len(numeric_verify_batch([text])[0]["finding"]["extracted_numbers"])
+
+
+def _unverifiable(reason: str, words: int) -> AgentOutput:
+    return AgentOutput(
+        ai_generated_risk_score=0.0,
+        misinformation_risk_score=0.05,
+        verdict=Verdict.unverifiable,
+        confidence=0.6 if words == 0 else 0.5,
+        reasoning_chain=[
+            f"Triage: {reason}.",
+            f"Signals: {words} words, no numbers or links.",
+            "No factual claim to check, so no research was run.",
+        ],
+        evidence=[],
+        uncertainties=["The image itself was not analysed beyond its OCR text.", "AI-generation risk was not assessed."],
+    )
+
+
+def triage(alt_text: str, caption: str, ocr_text: str) -> Optional[AgentOutput]:
+    """
+    Local pre-check before the agent loop. Returns an `unverifiable`,
+    low-risk AgentOutput when the post has no text (empty, emoji or
+    generated alt-text boilerplate) or only social vocabulary (greetings,
+    celebrations, "link in bio") with no numbers or links, or None when it
+    should go to the agent.
+    """
+    if not env_bool("TRIAGE_ENABLED", True):
+        return None
+
+    parts: List[str] = [(caption or "").strip(), post_content(alt_text), (ocr_text or "").strip()]
+    text = "\n".join(part for part in parts if part)
+    words = _words(text)
+
+    # The numeric scan only runs for posts that would otherwise be answered here.
+    if _URL_RE.search(text) or any(word not in _SOCIAL_WORDS for word in words) or _numbers(text):
+        TRIAGE_DECISIONS.inc(("escalated",))
+        return None
+    if not words:
+        TRIAGE_DECISIONS.inc(("no_text",))
+        return _unverifiable("no text once boilerplate alt text is dropped", 0)
+    TRIAGE_DECISIONS.inc(("no_claims",))
+    return _unverifiable("only greetings, social or promotional wording", len(words))
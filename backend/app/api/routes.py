@@ -3,8 +3,14 @@ from dotenv import load_dotenv
 from fastapi import APIRouter, HTTPException
 from app.schemas.agent_io import AgentContext, AgentOutput, ClaimInput
 from app.agents.backboard_agent import BackboardAgent
-from app.post_classifier import extract_post_text_for_llm
-import asyncio
+from app.post_classifier import extract_post_text_for_llm_async
+from app.ocr.cache import get_ocr_cache
+from app.ocr.scheduler import get_variant_yield_stats
+from app.tools.credibility_index import get_credibility_index
+from app.tools.rate_limiter import BATCH, get_search_rate_limiter, search_priority
+from app.tools.search_cache import get_search_cache
+from app.ocr.phash import get_perceptual_index
+from app.verdict_cache import get_verdict_cache, image_verdict_key, verdict_key
 
 router = APIRouter()
 
@@ -14,11 +20,18 @@ env_path = os.path.join(app_dir, '.env')
 load_dotenv(env_path)
 
 BACKBOARD_API_KEY = os.getenv("BACKBOARD_API_KEY")
-print(f"Loaded BACKBOARD_API_KEY: {BACKBOARD_API_KEY is not None}")  # Debug statement
 agent_runner = BackboardAgent(api_key=BACKBOARD_API_KEY)
 
-from pydantic import BaseModel
-from typing import Any, Dict, Optional
+import asyncio
+import json
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional
+from app.agents.provisional import provisional_risk
+from app.agents.triage import triage
+from app.events import emit, listening
+from app.metrics import REQUESTS, register_stats, request_context, span
+from app.settings import env_bool, env_int
 
 class AnalyzeUrlRequest(BaseModel):
     url: str
@@ -29,30 +42,221 @@ class AnalyzeUrlRequest(BaseModel):
     max_images: int = 3
 
 
-@router.post("/analyze_claims", response_model=AgentOutput)
-async def analyze_claims(payload: AnalyzeUrlRequest):
-    try:
-        ocr_res = await asyncio.to_thread(
-            extract_post_text_for_llm,
+class AnalyzeBatchRequest(BaseModel):
+    posts: List[AnalyzeUrlRequest] = Field(..., min_length=1)
+
+
+class AnalyzeBatchItem(BaseModel):
+    index: int
+    request_id: Optional[str] = None
+    ok: bool
+    result: Optional[AgentOutput] = None
+    error: Optional[str] = None
+
+
+class AnalyzeBatchResponse(BaseModel):
+    results: List[AnalyzeBatchItem]
+    unique_posts: int
+
+
+async def _analyze(payload: AnalyzeUrlRequest) -> AgentOutput:
+    with span("ocr_ingest"):
+        ocr_res = await extract_post_text_for_llm_async(
             post_url=payload.url,
             caption=payload.caption,
             alt_text=payload.alt_text,
             max_images=payload.max_images,
             # ocr_profile=payload.ocr_profile,
         )
-        llm_input_text = ocr_res.get("llm-input-text", "") or ""
-        claim_input = ClaimInput(
-            claims=[payload.alt_text],  # ✅ claim == alt_text
-            context={
-                "caption": payload.caption or "",
-                # TEMP: store merged text; BETTER: store true OCR text (see below)
-                "ocr_text": llm_input_text,
-                "urls": [payload.url],
-                "metadata": payload.metadata or {},
-            },
-            request_id=payload.request_id or "auto",
-        )
+    llm_input_text = ocr_res.get("llm-input-text", "") or ""
+    await emit("ocr_text", {"text": llm_input_text})
+    await emit("provisional", provisional_risk(llm_input_text))
+    with span("triage"):
+        shortcut = triage(payload.alt_text, payload.caption, ocr_res.get("ocr-text", ""))
+    if shortcut is not None:
+        return shortcut
+    # Reposts of one image with the same wording share a verdict (opt-in).
+    cache = get_verdict_cache()
+    image_ids = ocr_res.get("image-ids") or []
+    image_key = None
+    if cache and env_bool("VERDICT_REUSE_BY_IMAGE", False) and len(image_ids) == 1 and image_ids[0]:
+        image_key = image_verdict_key(image_ids[0], payload.alt_text, payload.caption)
+        reused = cache.get(image_key)
+        if reused is not None:
+            return reused.model_copy(deep=True)
+    claim_input = ClaimInput(
+        claims=[payload.alt_text],  # ✅ claim == alt_text
+        context={
+            "caption": payload.caption or "",
+            # TEMP: store merged text; BETTER: store true OCR text (see below)
+            "ocr_text": llm_input_text,
+            "urls": [payload.url],
+            "metadata": payload.metadata or {},
+        },
+        request_id=payload.request_id or "auto",
+    )
+    with span("agent_run"):
         result = await agent_runner.run(claim_input)
-        return result
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+    if image_key is not None:
+        cache.put(image_key, result)
+    return result
+
+
+async def analyze_cached(payload: AnalyzeUrlRequest) -> AgentOutput:
+    """Identical concurrent requests share one analysis; finished ones are reused until they expire."""
+    cache = get_verdict_cache()
+    if cache is None:
+        return await _analyze(payload)
+    key = verdict_key(payload.url, payload.alt_text, payload.caption, payload.max_images)
+    return await cache.run(key, lambda: _analyze(payload))
+
+
+@router.post("/analyze_claims", response_model=AgentOutput)
+async def analyze_claims(payload: AnalyzeUrlRequest):
+    with request_context(payload.request_id):
+        try:
+            with span("analyze"):
+                result = await analyze_cached(payload)
+        except Exception as e:
+            REQUESTS.inc(("analyze_claims", "error"))
+            raise HTTPException(status_code=500, detail=str(e))
+    REQUESTS.inc(("analyze_claims", "ok"))
+    return result
+
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+@router.post("/analyze_claims_stream")
+async def analyze_claims_stream(payload: AnalyzeUrlRequest):
+    """
+    Server-sent events for one post, in order as stages finish:
+    provisional (heuristic score, re-sent as evidence arrives), ocr_text,
+    tool_round, queries_planned, search_results, credibility, then final
+    (the AgentOutput) or error.
+    """
+    queue: "asyncio.Queue[Optional[tuple[str, Dict[str, Any]]]]" = asyncio.Queue()
+
+    async def _on_event(event: str, data: Dict[str, Any]) -> None:
+        await queue.put((event, data))
+
+    async def _work() -> None:
+        outcome = "error"
+        try:
+            with listening(_on_event), request_context(payload.request_id), span("analyze_stream"):
+                await emit("provisional", provisional_risk(f"{payload.alt_text}\n{payload.caption}"))
+                cache = get_verdict_cache()
+                key = verdict_key(payload.url, payload.alt_text, payload.caption, payload.max_images)
+                result = cache.get(key) if cache else None
+                cached = result is not None
+                if result is None:
+                    # Not coalesced with other in-flight requests: their stages
+                    # would never reach this listener.
+                    result = await _analyze(payload)
+                    if cache:
+                        cache.put(key, result)
+                await emit("final", {"cached": cached, "result": result.model_dump(mode="json")})
+            outcome = "ok"
+        except Exception as e:
+            await queue.put(("error", {"detail": f"{type(e).__name__}: {e}"}))
+        finally:
+            REQUESTS.inc(("analyze_claims_stream", outcome))
+            await queue.put(None)
+
+    async def _stream():
+        task = asyncio.get_running_loop().create_task(_work())
+        try:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    break
+                yield _sse(*item)
+        finally:
+            # Client went away: stop the analysis nobody is listening to.
+            if not task.done():
+                task.cancel()
+
+    return StreamingResponse(
+        _stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/analyze_claims_batch", response_model=AnalyzeBatchResponse)
+async def analyze_claims_batch(payload: AnalyzeBatchRequest):
+    """
+    Analyses a feed's worth of posts in one call. Duplicate posts run once,
+    distinct ones run concurrently up to BATCH_MAX_CONCURRENT_POSTS, and
+    results come back in input order with per-post errors instead of failing
+    the whole batch. Shared images and search queries are coalesced further
+    down (OCR single-flight, search cache).
+    """
+    max_posts = env_int("BATCH_MAX_POSTS", 50)
+    if len(payload.posts) > max_posts:
+        raise HTTPException(status_code=413, detail=f"At most {max_posts} posts per batch")
+
+    groups: Dict[str, List[int]] = {}
+    for index, post in enumerate(payload.posts):
+        key = verdict_key(post.url, post.alt_text, post.caption, post.max_images)
+        groups.setdefault(key, []).append(index)
+
+    semaphore = asyncio.Semaphore(max(1, env_int("BATCH_MAX_CONCURRENT_POSTS", 4)))
+
+    async def _run(first: int) -> AgentOutput:
+        async with semaphore:
+            # Interactive single-post requests get Brave tokens first.
+            with search_priority(BATCH), request_context(payload.posts[first].request_id), span("analyze"):
+                return await analyze_cached(payload.posts[first])
+
+    outcomes = await asyncio.gather(
+        *(_run(indices[0]) for indices in groups.values()),
+        return_exceptions=True,
+    )
+
+    results: List[Optional[AnalyzeBatchItem]] = [None] * len(payload.posts)
+    for indices, outcome in zip(groups.values(), outcomes):
+        if isinstance(outcome, BaseException) and not isinstance(outcome, Exception):
+            raise outcome
+        REQUESTS.inc(("analyze_claims_batch", "error" if isinstance(outcome, Exception) else "ok"), len(indices))
+        for index in indices:
+            post = payload.posts[index]
+            if isinstance(outcome, Exception):
+                results[index] = AnalyzeBatchItem(
+                    index=index,
+                    request_id=post.request_id,
+                    ok=False,
+                    error=f"{type(outcome).__name__}: {outcome}",
+                )
+            else:
+                results[index] = AnalyzeBatchItem(
+                    index=index,
+                    request_id=post.request_id,
+                    ok=True,
+                    result=outcome.model_copy(deep=True),
+                )
+    return AnalyzeBatchResponse(results=results, unique_posts=len(groups))
+
+
+def _optional_stats(component: Any) -> Optional[Dict[str, Any]]:
+    return component.stats() if component else None
+
+
+_STATS_SOURCES = {
+    "ocr_cache": lambda: _optional_stats(get_ocr_cache()),
+    "search_cache": lambda: _optional_stats(get_search_cache()),
+    "credibility_index": lambda: _optional_stats(get_credibility_index()),
+    "verdict_cache": lambda: _optional_stats(get_verdict_cache()),
+    "image_index": lambda: _optional_stats(get_perceptual_index()),
+    "search_rate_limiter": lambda: get_search_rate_limiter().stats(),
+}
+for _name, _collector in _STATS_SOURCES.items():
+    register_stats(_name, _collector)
+
+
+@router.get("/stats")
+async def stats():
+    result: Dict[str, Any] = {name: collector() for name, collector in _STATS_SOURCES.items()}
+    result["ocr_variants"] = get_variant_yield_stats().snapshot()
+    return result
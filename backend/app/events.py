@@ -0,0 +1,35 @@
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional
+
+# (event name, JSON-serialisable data)
+EventCallback = Callable[[str, Dict[str, Any]], Awaitable[None]]
+
+logger = logging.getLogger(__name__)
+
+_listener: ContextVar[Optional[EventCallback]] = ContextVar("analysis_event_listener", default=None)
+
+
+@contextmanager
+def listening(callback: Optional[EventCallback]) -> Iterator[None]:
+    """
+    Routes emit() calls made in this context, including tasks it spawns
+    (tool rounds, search fan-out), to `callback`.
+    """
+    token = _listener.set(callback)
+    try:
+        yield
+    finally:
+        _listener.reset(token)
+
+
+async def emit(event: str, data: Dict[str, Any]) -> None:
+    """Reports a pipeline stage to the current listener, if any. Never raises."""
+    callback = _listener.get()
+    if callback is None:
+        return
+    try:
+        await callback(event, data)
+    except Exception as e:
+        logger.warning("Event listener failed on %s: %s: %s", event, type(e).__name__, e)
@@ -0,0 +1,123 @@
+import asyncio
+import threading
+import time
+from typing import Any, Optional
+
+import httpx
+
+from app.settings import env_float, env_int
+
+try:
+    import h2  # noqa: F401  (enables HTTP/2 in httpx)
+
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Gateway-style failures worth one more try on idempotent requests.
+RETRY_STATUSES = {502, 503, 504}
+
+_async_client: Optional[httpx.AsyncClient] = None
+_sync_client: Optional[httpx.Client] = None
+_sync_lock = threading.Lock()
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=env_int("HTTP_MAX_CONNECTIONS", 100),
+        max_keepalive_connections=env_int("HTTP_MAX_KEEPALIVE_CONNECTIONS", 20),
+        keepalive_expiry=env_float("HTTP_KEEPALIVE_SECONDS", 30.0),
+    )
+
+
+def _timeout() -> httpx.Timeout:
+    return httpx.Timeout(
+        env_float("HTTP_TIMEOUT_SECONDS", 15.0),
+        connect=env_float("HTTP_CONNECT_TIMEOUT_SECONDS", 5.0),
+    )
+
+
+def _retries() -> int:
+    return max(0, env_int("HTTP_RETRIES", 2))
+
+
+def _backoff(attempt: int) -> float:
+    return env_float("HTTP_RETRY_BACKOFF_SECONDS", 0.25) * (2 ** attempt)
+
+
+def _build_async_client() -> httpx.AsyncClient:
+    transport = httpx.AsyncHTTPTransport(
+        http2=HTTP2_AVAILABLE, limits=_limits(), retries=_retries()
+    )
+    return httpx.AsyncClient(transport=transport, timeout=_timeout(), follow_redirects=True)
+
+
+def _build_sync_client() -> httpx.Client:
+    transport = httpx.HTTPTransport(http2=HTTP2_AVAILABLE, limits=_limits(), retries=_retries())
+    return httpx.Client(transport=transport, timeout=_timeout(), follow_redirects=True)
+
+
+async def start_http_clients() -> None:
+    global _async_client
+    if _async_client is None:
+        _async_client = _build_async_client()
+
+
+async def close_http_clients() -> None:
+    global _async_client, _sync_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
+    with _sync_lock:
+        if _sync_client is not None:
+            _sync_client.close()
+            _sync_client = None
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """
+    Application-wide pooled client (keep-alive, HTTP/2 when `h2` is installed).
+    Opened by the FastAPI lifespan; created on demand for scripts and the CLI.
+    """
+    global _async_client
+    if _async_client is None:
+        _async_client = _build_async_client()
+    return _async_client
+
+
+def get_sync_client() -> httpx.Client:
+    """Pooled client with the same settings for code that runs in worker threads."""
+    global _sync_client
+    with _sync_lock:
+        if _sync_client is None:
+            _sync_client = _build_sync_client()
+        return _sync_client
+
+
+async def request_with_retries(method: str, url: str, **kwargs: Any) -> httpx.Response:
+    """
+    Connection failures are retried by the transport; this also retries
+    gateway errors with exponential backoff. Use for idempotent requests.
+    """
+    client = get_async_client()
+    retries = _retries()
+    for attempt in range(retries + 1):
+        response = await client.request(method, url, **kwargs)
+        if response.status_code not in RETRY_STATUSES or attempt == retries:
+            return response
+        await response.aclose()
+        await asyncio.sleep(_backoff(attempt))
+    return response
+
+
+def request_with_retries_sync(method: str, url: str, stream: bool = False, **kwargs: Any) -> httpx.Response:
+    """With stream=True the body is left unread for iter_bytes(); the caller must close the response."""
+    client = get_sync_client()
+    retries = _retries()
+    for attempt in range(retries + 1):
+        response = client.send(client.build_request(method, url, **kwargs), stream=stream)
+        if response.status_code not in RETRY_STATUSES or attempt == retries:
+            return response
+        response.close()
+        time.sleep(_backoff(attempt))
+    return response
@@ -1,7 +1,14 @@
+from contextlib import asynccontextmanager
+import logging
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from dotenv import load_dotenv
 import os
-from app.api.routes import router as api_router
+from app.api.routes import agent_runner, router as api_router
+from app.http_client import close_http_clients, start_http_clients
+from app.metrics import render_metrics
+from app.ocr.engine import shutdown_ocr_engine
+from app.settings import env_str
 
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -10,7 +17,29 @@ env_path = os.path.join(base_dir, '.env')
 load_dotenv(env_path)
 # load_dotenv() # Debug: Check if the API key is loaded
 
-app = FastAPI()
+logging.basicConfig(
+    level=env_str("LOG_LEVEL", "WARNING").upper(),
+    format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await start_http_clients()
+    try:
+        await agent_runner.warm()
+    except Exception as exc:
+        # Not fatal: assistants are resolved lazily on first use instead.
+        logger.warning("Assistant warm-up failed: %s: %s", type(exc).__name__, exc)
+    try:
+        yield
+    finally:
+        await close_http_clients()
+        shutdown_ocr_engine()
+
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -20,7 +49,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.include_router(api_router, prefix="/api")
 
 
-print(os.getenv("BACKBOARD_API_KEY")) 
-app.include_router(api_router, prefix="/api")
\ No newline at end of file
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus text exposition: stage latency histograms, request counters, cache/limiter gauges."""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,229 @@
+import asyncio
+import bisect
+import logging
+import math
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger("app.spans")
+
+_request_id: ContextVar[str] = ContextVar("request_id", default="-")
+
+# Seconds; spans range from sub-millisecond cache hits to multi-minute agent runs.
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0,
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, labels: Sequence[str] = (), amount: float = 1.0) -> None:
+        key = tuple(str(label) for label in labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.labelnames, key)} {_number(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        # labels -> (per-bucket counts with a final +Inf slot, [sum])
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, labels: Sequence[str], value: float) -> None:
+        key = tuple(str(label) for label in labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, totals = self._values.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[index] += 1
+            totals[0] += value
+
+    def counts(self) -> Dict[Tuple[str, ...], int]:
+        """Observations so far per label set."""
+        with self._lock:
+            return {key: sum(counts) for key, (counts, _) in self._values.items()}
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, (counts, totals) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + (math.inf,), counts):
+                    cumulative += count
+                    le = f'le="{_number(bound)}"'
+                    lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}")
+                lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_number(totals[0])}")
+                lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+STAGE_SECONDS = Histogram(
+    "factcheck_stage_duration_seconds",
+    "Wall time of one pipeline stage (page fetch, image download, LLM call, tool call, search query, ...).",
+    ("stage", "outcome"),
+)
+OCR_PASS_SECONDS = Histogram(
+    "factcheck_ocr_pass_duration_seconds",
+    "Tesseract time for one preprocessing variant and page segmentation mode, measured in the worker.",
+    ("variant", "psm"),
+)
+REQUESTS = Counter(
+    "factcheck_requests_total",
+    "Analysis requests by endpoint and outcome.",
+    ("endpoint", "outcome"),
+)
+EVIDENCE_BUNDLE_BYTES = Histogram(
+    "factcheck_evidence_bundle_bytes",
+    "Serialized size of the synthesis evidence bundle before (raw) and after (compact) compaction.",
+    ("stage",),
+    buckets=(1024, 2048, 4096, 8192, 16384, 32768, 65536, 131072, 262144),
+)
+TRIAGE_DECISIONS = Counter(
+    "factcheck_triage_total",
+    "Posts answered locally by triage (no_text, no_claims) or escalated to the agent.",
+    ("decision",),
+)
+
+_collectors: Dict[str, Callable[[], Optional[Dict[str, Any]]]] = {}
+_span_sinks: List[Callable[[str, str, float], None]] = []
+
+
+def register_stats(name: str, collector: Callable[[], Optional[Dict[str, Any]]]) -> None:
+    """Expose a component's numeric stats() values as factcheck_<name>_<key> gauges."""
+    _collectors[name] = collector
+
+
+@contextmanager
+def request_context(request_id: Optional[str] = None) -> Iterator[str]:
+    """Tags every span in this context (and tasks it spawns) with `request_id`."""
+    value = request_id or uuid.uuid4().hex[:16]
+    token = _request_id.set(value)
+    try:
+        yield value
+    finally:
+        _request_id.reset(token)
+
+
+def current_request_id() -> str:
+    return _request_id.get()
+
+
+@contextmanager
+def span_sink(callback: Callable[[str, str, float], None]) -> Iterator[None]:
+    """Also hands every finished span's (stage, outcome, seconds) to `callback`, e.g. for exact percentiles."""
+    _span_sinks.append(callback)
+    try:
+        yield
+    finally:
+        _span_sinks.remove(callback)
+
+
+@contextmanager
+def span(stage: str, **fields: Any) -> Iterator[None]:
+    """
+    Times the enclosed block into factcheck_stage_duration_seconds and logs it
+    at DEBUG with the current request_id. Works around awaits as well.
+    """
+    start = time.perf_counter()
+    outcome = "ok"
+    try:
+        yield
+    except BaseException as e:
+        outcome = "cancelled" if isinstance(e, asyncio.CancelledError) else "error"
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.observe((stage, outcome), elapsed)
+        for sink in list(_span_sinks):
+            sink(stage, outcome, elapsed)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "span stage=%s outcome=%s seconds=%.4f request_id=%s %s",
+                stage,
+                outcome,
+                elapsed,
+                current_request_id(),
+                " ".join(f"{key}={value}" for key, value in fields.items()),
+            )
+
+
+_PSM_RE = re.compile(r"--psm\s+(\d+)")
+
+
+def observe_ocr_pass(variant: str, config: str, seconds: float) -> None:
+    match = _PSM_RE.search(config or "")
+    OCR_PASS_SECONDS.observe((variant, match.group(1) if match else "default"), seconds)
+
+
+def _metric_name(*parts: str) -> str:
+    return re.sub(r"[^a-zA-Z0-9_]", "_", "_".join(parts)).lower()
+
+
+def _gauge_lines(prefix: str, stats: Dict[str, Any]) -> List[str]:
+    lines: List[str] = []
+    for key, value in sorted(stats.items()):
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            continue
+        name = _metric_name("factcheck", prefix, key)
+        lines.append(f"# TYPE {name} gauge")
+        lines.append(f"{name} {_number(value)}")
+    return lines
+
+
+def render_metrics() -> str:
+    lines: List[str] = []
+    for metric in (REQUESTS, TRIAGE_DECISIONS, STAGE_SECONDS, OCR_PASS_SECONDS, EVIDENCE_BUNDLE_BYTES):
+        lines.extend(metric.render())
+    for name, collector in sorted(_collectors.items()):
+        try:
+            stats = collector()
+        except Exception:
+            logger.exception("stats collector %s failed", name)
+            continue
+        if stats:
+            lines.extend(_gauge_lines(name, stats))
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,101 @@
+import re
+import threading
+from typing import Dict, Optional
+
+import pytesseract
+from PIL import Image
+
+from app.settings import env_str
+
+try:
+    import tesserocr
+except ImportError:  # optional: needs libtesseract headers to build
+    tesserocr = None
+
+
+_PSM_RE = re.compile(r"--psm\s+(\d+)")
+
+
+def _psm_from_config(config: str, default: int = 3) -> int:
+    match = _PSM_RE.search(config or "")
+    return int(match.group(1)) if match else default
+
+
+class OcrBackend:
+    name = "base"
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self._calls_lock = threading.Lock()
+
+    def _count(self) -> None:
+        with self._calls_lock:
+            self.calls += 1
+
+    def image_to_string(self, image: Image.Image, config: str = "") -> str:
+        raise NotImplementedError
+
+
+class PytesseractBackend(OcrBackend):
+    """Original path: one temp file + one `tesseract` process per call."""
+
+    name = "pytesseract"
+
+    def image_to_string(self, image: Image.Image, config: str = "") -> str:
+        self._count()
+        return pytesseract.image_to_string(image, config=config)
+
+
+class TesserocrBackend(OcrBackend):
+    """
+    Long-lived libtesseract engine. Language data is loaded once per
+    (thread, psm) and the API handle is reused for every later image.
+    """
+
+    name = "tesserocr"
+
+    def __init__(self, lang: str = "eng") -> None:
+        super().__init__()
+        if tesserocr is None:
+            raise RuntimeError("tesserocr is not installed")
+        self.lang = lang
+        self._local = threading.local()
+
+    def _api(self, psm: int):
+        apis: Dict[int, "tesserocr.PyTessBaseAPI"] = getattr(self._local, "apis", None)
+        if apis is None:
+            apis = self._local.apis = {}
+        api = apis.get(psm)
+        if api is None:
+            api = tesserocr.PyTessBaseAPI(lang=self.lang, psm=psm)
+            apis[psm] = api
+        return api
+
+    def image_to_string(self, image: Image.Image, config: str = "") -> str:
+        self._count()
+        api = self._api(_psm_from_config(config))
+        api.SetImage(image)
+        return api.GetUTF8Text()
+
+
+def make_ocr_backend(name: str) -> OcrBackend:
+    if name == "pytesseract":
+        return PytesseractBackend()
+    if name == "tesserocr":
+        return TesserocrBackend(lang=env_str("OCR_LANG", "eng"))
+    if name == "auto":
+        return make_ocr_backend("tesserocr" if tesserocr is not None else "pytesseract")
+    raise ValueError("OCR_BACKEND must be 'auto', 'tesserocr' or 'pytesseract'")
+
+
+_backend: Optional[OcrBackend] = None
+_backend_lock = threading.Lock()
+
+
+def get_ocr_backend() -> OcrBackend:
+    """Per-process backend chosen by OCR_BACKEND (auto prefers tesserocr)."""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = make_ocr_backend(env_str("OCR_BACKEND", "auto"))
+        return _backend
@@ -0,0 +1,281 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from PIL import Image
+
+from app.settings import CACHE_DIR, env_bool, env_float, env_int, env_str
+
+
+def image_digest(image: Image.Image) -> str:
+    """
+    Content address of a decoded image: identical pixels hash the same
+    no matter which CDN URL or container format they arrived in.
+    """
+    digest = hashlib.sha256()
+    digest.update(f"{image.mode}:{image.width}x{image.height}:".encode("ascii"))
+    digest.update(image.tobytes())
+    return digest.hexdigest()
+
+
+def cache_key(digest: str, ocr_profile: str) -> str:
+    return f"{digest}:{ocr_profile}"
+
+
+class OcrResultCache:
+    """
+    Two-tier OCR result cache: an in-memory LRU in front of a SQLite store.
+
+    Results are keyed by image digest + ocr_profile. A second index maps image
+    URLs to digests so a repeated URL can be answered without downloading it.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str],
+        memory_entries: int = 2048,
+        disk_max_bytes: int = 256 * 1024 * 1024,
+        max_age_seconds: float = 7 * 24 * 3600,
+        prune_every: int = 64,
+    ):
+        self.path = path
+        self.memory_entries = max(1, memory_entries)
+        self.disk_max_bytes = disk_max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.prune_every = max(1, prune_every)
+
+        self._lock = threading.Lock()
+        self._results: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._urls: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._writes_since_prune = 0
+        self._stats: Dict[str, int] = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "url_hits": 0,
+            "url_misses": 0,
+            "writes": 0,
+            "evictions": 0,
+        }
+
+        self._db: Optional[sqlite3.Connection] = None
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS ocr_results ("
+                "key TEXT PRIMARY KEY, text TEXT NOT NULL, size INTEGER NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS url_index ("
+                "url TEXT PRIMARY KEY, digest TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS image_hashes ("
+                "digest TEXT PRIMARY KEY, phash INTEGER NOT NULL, detail BLOB NOT NULL, "
+                "canonical TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS ocr_results_accessed ON ocr_results (accessed_at)"
+            )
+            self._db.commit()
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return now - created_at > self.max_age_seconds
+
+    def _remember(self, table: "OrderedDict[str, Tuple[str, float]]", key: str, value: str, created_at: float) -> None:
+        table[key] = (value, created_at)
+        table.move_to_end(key)
+        while len(table) > self.memory_entries:
+            table.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            entry = self._results.get(key)
+            if entry is not None:
+                if not self._expired(entry[1], now):
+                    self._results.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                    return entry[0]
+                del self._results[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT text, created_at FROM ocr_results WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and not self._expired(row[1], now):
+                    self._db.execute(
+                        "UPDATE ocr_results SET accessed_at = ? WHERE key = ?", (now, key)
+                    )
+                    self._db.commit()
+                    self._remember(self._results, key, row[0], row[1])
+                    self._stats["disk_hits"] += 1
+                    return row[0]
+
+            self._stats["misses"] += 1
+            return None
+
+    def put(self, key: str, text: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._remember(self._results, key, text, now)
+            self._stats["writes"] += 1
+            if self._db is None:
+                return
+            self._db.execute(
+                "INSERT OR REPLACE INTO ocr_results (key, text, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, text, len(key) + len(text.encode("utf-8")), now, now),
+            )
+            self._db.commit()
+            self._writes_since_prune += 1
+            if self._writes_since_prune >= self.prune_every:
+                self._prune_locked(now)
+
+    def digest_for_url(self, url: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            entry = self._urls.get(url)
+            if entry is not None and not self._expired(entry[1], now):
+                self._urls.move_to_end(url)
+                self._stats["url_hits"] += 1
+                return entry[0]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT digest, created_at FROM url_index WHERE url = ?", (url,)
+                ).fetchone()
+                if row is not None and not self._expired(row[1], now):
+                    self._remember(self._urls, url, row[0], row[1])
+                    self._stats["url_hits"] += 1
+                    return row[0]
+
+            self._stats["url_misses"] += 1
+            return None
+
+    def remember_url(self, url: str, digest: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._remember(self._urls, url, digest, now)
+            if self._db is None:
+                return
+            self._db.execute(
+                "INSERT OR REPLACE INTO url_index (url, digest, created_at) VALUES (?, ?, ?)",
+                (url, digest, now),
+            )
+            self._db.commit()
+
+    def lookup_url(self, url: str, ocr_profile: str) -> Optional[str]:
+        digest = self.digest_for_url(url)
+        if digest is None:
+            return None
+        return self.get(cache_key(digest, ocr_profile))
+
+    def remember_phash(self, digest: str, phash: int, detail: int, canonical: str) -> None:
+        """Persists an image's perceptual hashes so the near-duplicate index survives restarts."""
+        if self._db is None:
+            return
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO image_hashes (digest, phash, detail, canonical, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (
+                    digest,
+                    # SQLite integers are signed 64-bit.
+                    phash - (1 << 64) if phash >= 1 << 63 else phash,
+                    detail.to_bytes((detail.bit_length() + 7) // 8, "big"),
+                    canonical,
+                    time.time(),
+                ),
+            )
+            self._db.commit()
+
+    def stored_phashes(self, limit: int) -> List[Tuple[str, int, int, str]]:
+        """The newest `limit` unexpired (digest, phash, detail, canonical) rows, oldest first."""
+        if self._db is None:
+            return []
+        cutoff = time.time() - self.max_age_seconds
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT digest, phash, detail, canonical FROM image_hashes "
+                "WHERE created_at >= ? ORDER BY created_at DESC LIMIT ?",
+                (cutoff, limit),
+            ).fetchall()
+        return [
+            (digest, phash & ((1 << 64) - 1), int.from_bytes(detail, "big"), canonical)
+            for digest, phash, detail, canonical in reversed(rows)
+        ]
+
+    def prune(self) -> None:
+        with self._lock:
+            self._prune_locked(time.time())
+
+    def _prune_locked(self, now: float) -> None:
+        self._writes_since_prune = 0
+        if self._db is None:
+            return
+        cutoff = now - self.max_age_seconds
+        removed = self._db.execute("DELETE FROM ocr_results WHERE created_at < ?", (cutoff,)).rowcount
+        self._db.execute("DELETE FROM url_index WHERE created_at < ?", (cutoff,))
+        self._db.execute("DELETE FROM image_hashes WHERE created_at < ?", (cutoff,))
+
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM ocr_results").fetchone()[0]
+        if total > self.disk_max_bytes:
+            # Drop least recently used rows until the store is back under budget.
+            overflow = total - self.disk_max_bytes
+            rows = self._db.execute(
+                "SELECT key, size FROM ocr_results ORDER BY accessed_at ASC"
+            ).fetchall()
+            doomed = []
+            for key, size in rows:
+                if overflow <= 0:
+                    break
+                doomed.append((key,))
+                overflow -= size
+            self._db.executemany("DELETE FROM ocr_results WHERE key = ?", doomed)
+            removed += len(doomed)
+        self._db.commit()
+        self._stats["evictions"] += max(0, removed)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+            stats["memory_entries"] = len(self._results)
+            if self._db is not None:
+                count, size = self._db.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM ocr_results"
+                ).fetchone()
+                stats["disk_entries"] = count
+                stats["disk_bytes"] = size
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_ratio"] = round((stats["memory_hits"] + stats["disk_hits"]) / lookups, 4) if lookups else 0.0
+        return stats
+
+
+_cache: Optional[OcrResultCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_ocr_cache() -> Optional[OcrResultCache]:
+    """Process-wide cache configured from OCR_CACHE_* env vars; None when disabled."""
+    global _cache
+    if not env_bool("OCR_CACHE_ENABLED", True):
+        return None
+    with _cache_lock:
+        if _cache is None:
+            path = env_str("OCR_CACHE_PATH", os.path.join(CACHE_DIR, "ocr_cache.sqlite3"))
+            _cache = OcrResultCache(
+                path=None if path == ":memory:" else path,
+                memory_entries=env_int("OCR_CACHE_MEMORY_ENTRIES", 2048),
+                disk_max_bytes=env_int("OCR_CACHE_DISK_MAX_MB", 256) * 1024 * 1024,
+                max_age_seconds=env_float("OCR_CACHE_MAX_AGE_SECONDS", 7 * 24 * 3600),
+            )
+        return _cache
@@ -0,0 +1,193 @@
+import asyncio
+import contextlib
+import functools
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Iterator, List, Optional, Sequence, Tuple
+
+from PIL import Image
+
+from app.metrics import observe_ocr_pass
+from app.ocr.backends import get_ocr_backend
+from app.settings import env_int
+
+# (preprocessed image, tesseract config) – one tesseract invocation.
+OcrJob = Tuple[Image.Image, str]
+
+# How long a pool worker waits for the rest of the pool to come up.
+_POOL_START_TIMEOUT_SECONDS = 60
+
+
+@contextlib.contextmanager
+def _environ(name: str, value: str) -> Iterator[None]:
+    previous = os.environ.get(name)
+    os.environ[name] = value
+    try:
+        yield
+    finally:
+        if previous is None:
+            os.environ.pop(name, None)
+        else:
+            os.environ[name] = previous
+
+
+def _await_pool(started: Any) -> None:
+    # A worker stays busy here until every worker exists, so each warm-up
+    # submit finds no idle worker and spawns the next one.
+    started.wait()
+
+
+def _noop() -> None:
+    return None
+
+
+def run_ocr_job(image: Image.Image, config: str) -> str:
+    # Pool processes are long-lived, so a resident backend keeps its models
+    # loaded across jobs instead of paying tesseract startup per call.
+    return get_ocr_backend().image_to_string(image, config=config).strip()
+
+
+def _timed_ocr_job(image: Image.Image, config: str) -> Tuple[str, float]:
+    # Timed inside the worker so the metric excludes queueing and pickling.
+    start = time.perf_counter()
+    text = run_ocr_job(image, config)
+    return text, time.perf_counter() - start
+
+
+def run_ocr_job_observed(image: Image.Image, config: str, variant: str) -> str:
+    text, seconds = _timed_ocr_job(image, config)
+    observe_ocr_pass(variant, config, seconds)
+    return text
+
+
+def _resolve_timed(target: Future, variant: str, config: str, source: Future) -> None:
+    if source.cancelled():
+        target.cancel()
+        return
+    exc = source.exception()
+    if exc is not None:
+        target.set_exception(exc)
+        return
+    text, seconds = source.result()
+    observe_ocr_pass(variant, config, seconds)
+    target.set_result(text)
+
+
+def _completed(fn: Callable[..., Any], *args: Any) -> Future:
+    future: Future = Future()
+    try:
+        future.set_result(fn(*args))
+    except Exception as exc:
+        future.set_exception(exc)
+    return future
+
+
+class OcrEngine:
+    """
+    Runs image downloads on a thread pool and tesseract jobs on a process pool
+    sized to the machine. With workers <= 1 everything runs inline, which is
+    the original sequential behaviour.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        download_workers: int = 8,
+        tesseract_threads: int = 1,
+        blocking_threads: int = 4,
+    ):
+        self.workers = workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._downloads: Optional[ThreadPoolExecutor] = None
+        # Bounded executor for the async path's blocking steps (HTML parsing,
+        # decoding, preprocessing), kept apart from asyncio's default pool.
+        self._blocking = ThreadPoolExecutor(
+            max_workers=max(1, blocking_threads), thread_name_prefix="ocr-blocking"
+        )
+        if workers > 1:
+            # Each pool process already owns a core; keep tesseract (OpenMP) from
+            # fanning out on top of that and oversubscribing the machine. OpenMP
+            # reads the limit once, when libtesseract is loaded, and importing
+            # the backends loads it, so workers are spawned fresh with the limit
+            # in the environment they copy at start-up; pytesseract subprocesses
+            # inherit it from them. Spawned workers start on demand, so all of
+            # them are started here, while the limit is set, and the API
+            # process's own environment is restored afterwards.
+            context = multiprocessing.get_context("spawn")
+            started = context.Barrier(workers, timeout=_POOL_START_TIMEOUT_SECONDS)
+            self._pool = ProcessPoolExecutor(
+                max_workers=workers, mp_context=context, initializer=_await_pool, initargs=(started,)
+            )
+            with _environ("OMP_THREAD_LIMIT", str(tesseract_threads)):
+                for future in [self._pool.submit(_noop) for _ in range(workers)]:
+                    future.result()
+            self._downloads = ThreadPoolExecutor(
+                max_workers=max(1, download_workers), thread_name_prefix="ocr-download"
+            )
+
+    def map_downloads(self, fn: Callable[[str], Any], urls: Sequence[str]) -> List[Future]:
+        if self._downloads is None:
+            return [_completed(fn, url) for url in urls]
+        return [self._downloads.submit(fn, url) for url in urls]
+
+    def submit(self, jobs: Sequence[OcrJob], variants: Optional[Sequence[str]] = None) -> List[Future]:
+        """Futures of the OCR text; `variants` names each job for the per-pass latency metric."""
+        names = list(variants) if variants is not None else ["unknown"] * len(jobs)
+        if self._pool is None:
+            return [
+                _completed(run_ocr_job_observed, image, config, name)
+                for (image, config), name in zip(jobs, names)
+            ]
+        futures: List[Future] = []
+        for (image, config), name in zip(jobs, names):
+            result: Future = Future()
+            pooled = self._pool.submit(_timed_ocr_job, image, config)
+            pooled.add_done_callback(functools.partial(_resolve_timed, result, name, config))
+            futures.append(result)
+        return futures
+
+    async def run_blocking(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._blocking, functools.partial(fn, *args, **kwargs))
+
+    async def run_jobs(self, jobs: Sequence[OcrJob], variants: Optional[Sequence[str]] = None) -> List[str]:
+        """Async counterpart of submit(): awaits the pool without tying up a thread."""
+        if self._pool is None:
+            return await self.run_blocking(lambda: [future.result() for future in self.submit(jobs, variants)])
+        return list(await asyncio.gather(*(asyncio.wrap_future(future) for future in self.submit(jobs, variants))))
+
+    def shutdown(self) -> None:
+        self._blocking.shutdown(wait=False, cancel_futures=True)
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+        if self._downloads is not None:
+            self._downloads.shutdown(wait=False, cancel_futures=True)
+
+
+_engine: Optional[OcrEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_ocr_engine() -> OcrEngine:
+    """Process-wide engine; OCR_WORKERS defaults to the CPU count."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = OcrEngine(
+                workers=env_int("OCR_WORKERS", os.cpu_count() or 1),
+                download_workers=env_int("OCR_DOWNLOAD_WORKERS", 8),
+                tesseract_threads=env_int("OCR_TESSERACT_THREADS", 1),
+                blocking_threads=env_int("INGEST_BLOCKING_THREADS", 4),
+            )
+        return _engine
+
+
+def shutdown_ocr_engine() -> None:
+    global _engine
+    with _engine_lock:
+        if _engine is not None:
+            _engine.shutdown()
+            _engine = None
@@ -0,0 +1,97 @@
+import io
+import math
+from typing import AsyncIterator, Iterable, Optional, Tuple
+
+from PIL import Image
+
+from app.settings import env_int
+
+# OcrVariants never upscales more than this, as before the target resolution existed.
+MAX_UPSCALE = 2.0
+
+
+class ImageRejected(ValueError):
+    """The image was refused before decoding: too many bytes or too many pixels."""
+
+
+def max_image_bytes() -> int:
+    return max(1, env_int("IMAGE_MAX_BYTES", 20 * 1024 * 1024))
+
+
+def max_image_pixels() -> int:
+    return max(1, env_int("IMAGE_MAX_PIXELS", 40_000_000))
+
+
+def ocr_target_short_edge() -> int:
+    # 2× a 1080px-wide feed image or screenshot, so those are scaled exactly as before.
+    return max(1, env_int("OCR_TARGET_SHORT_EDGE", 2160))
+
+
+def ocr_max_pixels() -> int:
+    return max(1, env_int("OCR_MAX_PIXELS", 24_000_000))
+
+
+def ocr_scale(size: Tuple[int, int]) -> float:
+    """
+    Factor OCR runs at. The short edge, which sets how tall text is relative
+    to the image, is upscaled towards OCR_TARGET_SHORT_EDGE by at most
+    MAX_UPSCALE, and images are never brought below native resolution, so
+    tall or wide screenshots keep their text legible. The one exception is
+    the hard memory cap: the scaled image never exceeds OCR_MAX_PIXELS.
+    """
+    width, height = max(1, size[0]), max(1, size[1])
+    scale = max(1.0, min(MAX_UPSCALE, ocr_target_short_edge() / min(width, height)))
+    return min(scale, math.sqrt(ocr_max_pixels() / (width * height)))
+
+
+def _check_length(content_length: Optional[str], limit: int) -> None:
+    if content_length and content_length.isdigit() and int(content_length) > limit:
+        raise ImageRejected(f"image is {content_length} bytes, over IMAGE_MAX_BYTES={limit}")
+
+
+def read_capped(content_length: Optional[str], chunks: Iterable[bytes]) -> bytes:
+    """Reads a streamed body, refusing it as soon as it passes IMAGE_MAX_BYTES."""
+    limit = max_image_bytes()
+    _check_length(content_length, limit)
+    body = bytearray()
+    for chunk in chunks:
+        body += chunk
+        if len(body) > limit:
+            raise ImageRejected(f"image body passed IMAGE_MAX_BYTES={limit}")
+    return bytes(body)
+
+
+async def aread_capped(content_length: Optional[str], chunks: AsyncIterator[bytes]) -> bytes:
+    limit = max_image_bytes()
+    _check_length(content_length, limit)
+    body = bytearray()
+    async for chunk in chunks:
+        body += chunk
+        if len(body) > limit:
+            raise ImageRejected(f"image body passed IMAGE_MAX_BYTES={limit}")
+    return bytes(body)
+
+
+def decode_image(content: bytes) -> Image.Image:
+    """
+    RGB image for OCR, decoded no larger than needed. Dimensions are checked
+    from the header before any pixel is decoded. Images over OCR_MAX_PIXELS,
+    the only ones OCR runs below native scale, are shrunk while loading:
+    JPEGs are decoded in draft mode at the smallest DCT scale that still
+    covers the capped size, and other formats are reduced by an integer
+    factor right after decoding.
+    """
+    image = Image.open(io.BytesIO(content))
+    width, height = image.size
+    limit = max_image_pixels()
+    if width * height > limit:
+        raise ImageRejected(f"image is {width}x{height}, over IMAGE_MAX_PIXELS={limit}")
+
+    scale = ocr_scale(image.size)
+    if scale < 1 and image.format == "JPEG":
+        image.draft("RGB", (math.ceil(width * scale), math.ceil(height * scale)))
+    image = image.convert("RGB")
+    factor = int(1 / ocr_scale(image.size))
+    if factor >= 2:
+        image = image.reduce(factor)
+    return image
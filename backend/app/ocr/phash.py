@@ -0,0 +1,198 @@
+import threading
+from collections import OrderedDict
+from itertools import combinations, islice
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from PIL import Image
+
+from app.ocr.cache import get_ocr_cache
+from app.settings import env_bool, env_int
+
+HASH_BITS = 64
+DETAIL_SIZE = 32
+_CHUNKS = 4
+_CHUNK_BITS = HASH_BITS // _CHUNKS
+_CHUNK_MASK = (1 << _CHUNK_BITS) - 1
+_DCT_SIZE = 32
+_DCT = np.cos(np.pi * (2 * np.arange(_DCT_SIZE)[None, :] + 1) * np.arange(_DCT_SIZE)[:, None] / (2 * _DCT_SIZE))
+# Gray levels a detail-hash gradient must exceed: flat regions then hash as 0
+# instead of flipping with every recompression.
+_DETAIL_MARGIN = 4
+# Images flatter than this (blank frames, solid fills) have no usable hash.
+_MIN_STDDEV = 2.0
+
+
+def perceptual_hashes(image: Image.Image) -> Optional[Tuple[int, int]]:
+    """
+    (phash, detail) for an image, or None when it is too flat to identify.
+
+    phash is the 64-bit DCT hash: the 8x8 lowest frequencies of a 32x32 gray
+    thumbnail against their median. It is stable under rescaling and
+    recompression and indexes well, because half its bits are always set.
+    detail is a 1024-bit horizontal-gradient hash of a 33x32 thumbnail. It
+    tells apart images that share a layout, such as one meme template with
+    different captions, which the phash alone cannot.
+    """
+    gray = image.convert("L")
+    small = np.asarray(gray.resize((_DCT_SIZE, _DCT_SIZE), Image.Resampling.BOX), dtype=np.float64)
+    if small.std() < _MIN_STDDEV:
+        return None
+    coefficients = (_DCT @ small @ _DCT.T)[:8, :8].flatten()
+    phash_bits = np.packbits(coefficients > np.median(coefficients[1:]))
+    cells = np.asarray(gray.resize((DETAIL_SIZE + 1, DETAIL_SIZE), Image.Resampling.BOX), dtype=np.int16)
+    detail_bits = np.packbits((cells[:, :-1] - cells[:, 1:]) > _DETAIL_MARGIN)
+    return int.from_bytes(phash_bits.tobytes(), "big"), int.from_bytes(detail_bits.tobytes(), "big")
+
+
+def _chunks(phash: int) -> Iterable[Tuple[int, int]]:
+    for index in range(_CHUNKS):
+        yield index, (phash >> (index * _CHUNK_BITS)) & _CHUNK_MASK
+
+
+class PerceptualIndex:
+    """
+    Near-duplicate lookup over (phash, detail) pairs by multi-index hashing.
+
+    Each 64-bit phash is split into four 16-bit chunks, with one table per
+    chunk. Two hashes within Hamming distance r differ in at most r // 4
+    bits of some chunk (pigeonhole), so a lookup only probes each table at
+    the chunk values within that many bit flips. For r < 8 that is 68 dict
+    probes, however many images are indexed. Only the few candidates found
+    there have their full phash and detail distances checked.
+
+    Screenshots of text hash close together (one template with different
+    captions often hashes identically), so buckets grow with the index. A
+    lookup scans at most `max_candidates` bucket entries, newest first, and
+    counts the lookups it cut short as `truncated`: an older repost past the
+    budget is simply not found, and its image is OCR'd as new.
+
+    Every entry also records a canonical key: the first-seen image of its
+    near-duplicate group. Results keyed on it (verdicts) are shared by the
+    group. Oldest entries are evicted past `max_entries`.
+    """
+
+    def __init__(
+        self,
+        max_distance: int = 6,
+        max_detail_distance: int = 12,
+        max_entries: int = 1_000_000,
+        max_candidates: int = 256,
+    ):
+        self.max_distance = max(0, min(max_distance, HASH_BITS))
+        self.max_detail_distance = max(0, max_detail_distance)
+        self.max_entries = max(1, max_entries)
+        self.max_candidates = max(1, max_candidates)
+        self._probe_masks: List[int] = [
+            sum(1 << bit for bit in bits)
+            for flips in range(min(self.max_distance // _CHUNKS, _CHUNK_BITS) + 1)
+            for bits in combinations(range(_CHUNK_BITS), flips)
+        ]
+        self._lock = threading.Lock()
+        # key -> (phash, detail, canonical key)
+        self._entries: "OrderedDict[str, Tuple[int, int, str]]" = OrderedDict()
+        # chunk table -> chunk value -> {key: phash}, so candidates are filtered without touching _entries.
+        self._tables: List[Dict[int, Dict[str, int]]] = [{} for _ in range(_CHUNKS)]
+        self._stats: Dict[str, int] = {"lookups": 0, "matches": 0, "truncated": 0, "evictions": 0}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _unlink(self, key: str, phash: int) -> None:
+        for index, chunk in _chunks(phash):
+            bucket = self._tables[index].get(chunk)
+            if bucket is not None:
+                bucket.pop(key, None)
+                if not bucket:
+                    del self._tables[index][chunk]
+
+    def add(self, key: str, phash: int, detail: int, canonical: Optional[str] = None) -> None:
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._unlink(key, previous[0])
+            self._entries[key] = (phash, detail, canonical or key)
+            for index, chunk in _chunks(phash):
+                self._tables[index].setdefault(chunk, {})[key] = phash
+            while len(self._entries) > self.max_entries:
+                old_key, (old_hash, _, _) = self._entries.popitem(last=False)
+                self._unlink(old_key, old_hash)
+                self._stats["evictions"] += 1
+
+    def hashes_of(self, key: str) -> Optional[Tuple[int, int]]:
+        with self._lock:
+            entry = self._entries.get(key)
+        return (entry[0], entry[1]) if entry else None
+
+    def canonical_of(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+        return entry[2] if entry else None
+
+    def nearest(self, phash: int, detail: int) -> List[Tuple[int, str]]:
+        """(detail distance, key) for indexed near-duplicates, closest first."""
+        max_distance = self.max_distance
+        budget = self.max_candidates
+        truncated = False
+        candidates: Set[str] = set()
+        matches: List[Tuple[int, str]] = []
+        with self._lock:
+            self._stats["lookups"] += 1
+            for index, chunk in _chunks(phash):
+                table = self._tables[index]
+                for mask in self._probe_masks:
+                    bucket = table.get(chunk ^ mask)
+                    if not bucket:
+                        continue
+                    truncated = truncated or len(bucket) > budget
+                    if budget <= 0:
+                        continue
+                    scanned = list(islice(reversed(bucket.items()), budget))
+                    budget -= len(scanned)
+                    candidates.update([key for key, other in scanned if (phash ^ other).bit_count() <= max_distance])
+            for key in candidates:
+                distance = (detail ^ self._entries[key][1]).bit_count()
+                if distance <= self.max_detail_distance:
+                    matches.append((distance, key))
+            if matches:
+                self._stats["matches"] += 1
+            if truncated:
+                self._stats["truncated"] += 1
+        matches.sort()
+        return matches
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+            stats["entries"] = len(self._entries)
+        return stats
+
+
+_index: Optional[PerceptualIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_perceptual_index() -> Optional[PerceptualIndex]:
+    """
+    Process-wide index of OCR'd images keyed by image digest, seeded from the
+    hashes the OCR cache has persisted. None unless PHASH_ENABLED=1, and when
+    the OCR cache, which holds the reusable text, is off.
+    """
+    global _index
+    if not env_bool("PHASH_ENABLED", False):
+        return None
+    cache = get_ocr_cache()
+    if cache is None:
+        return None
+    with _index_lock:
+        if _index is None:
+            index = PerceptualIndex(
+                max_distance=env_int("PHASH_MAX_DISTANCE", 6),
+                max_detail_distance=env_int("PHASH_DETAIL_MAX_DISTANCE", 12),
+                max_entries=env_int("PHASH_MAX_ENTRIES", 1_000_000),
+                max_candidates=env_int("PHASH_MAX_CANDIDATES", 256),
+            )
+            for digest, phash, detail, canonical in cache.stored_phashes(index.max_entries):
+                index.add(digest, phash, detail, canonical)
+            _index = index
+        return _index
@@ -0,0 +1,152 @@
+from typing import Dict, Iterator, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+THRESHOLD = 180
+_IDENTITY = np.arange(256, dtype=np.uint8)
+
+FAST_VARIANTS: Tuple[str, ...] = ("autocontrast", "thresholded")
+ACCURATE_VARIANTS: Tuple[str, ...] = (
+    "resized",
+    "gray",
+    "autocontrast",
+    "thresholded",
+    "inverted",
+    "inverted_thresholded",
+    "red_autocontrast",
+    "green_autocontrast",
+    "blue_autocontrast",
+)
+
+
+def variant_names(ocr_profile: str) -> Tuple[str, ...]:
+    return FAST_VARIANTS if ocr_profile == "fast" else ACCURATE_VARIANTS
+
+
+def _autocontrast_lut(histogram: np.ndarray) -> np.ndarray:
+    """Same LUT ImageOps.autocontrast(cutoff=0) builds, computed in one shot."""
+    present = np.flatnonzero(histogram)
+    if present.size == 0 or present[-1] <= present[0]:
+        return _IDENTITY
+    lo, hi = int(present[0]), int(present[-1])
+    scale = 255.0 / (hi - lo)
+    offset = -lo * scale
+    # int() truncates toward zero, as does astype on the float values.
+    return np.clip((np.arange(256) * scale + offset).astype(np.int64), 0, 255).astype(np.uint8)
+
+
+def _contrast_lut(gray_histogram: np.ndarray, pixel_count: int, factor: float = 2.0) -> np.ndarray:
+    """ImageEnhance.Contrast(gray).enhance(factor) expressed as a LUT over gray levels."""
+    total = int(np.dot(np.arange(256, dtype=np.int64), gray_histogram.astype(np.int64)))
+    mean = int(total / pixel_count + 0.5)
+    levels = mean + factor * (np.arange(256, dtype=np.float64) - mean)
+    return np.clip(levels, 0, 255).astype(np.uint8)
+
+
+def _threshold_lut(lut: np.ndarray) -> np.ndarray:
+    return np.where(lut < THRESHOLD, 0, 255).astype(np.uint8)
+
+
+_RGB_VARIANTS = {"resized", "red_autocontrast", "green_autocontrast", "blue_autocontrast"}
+_CHANNELS = {"red_autocontrast": 0, "green_autocontrast": 1, "blue_autocontrast": 2}
+
+
+class OcrVariants:
+    """
+    Lazily produced OCR preprocessing variants for one image.
+
+    Every grayscale variant (autocontrast, threshold, inversion and their
+    combinations) is one 256-entry LUT composed with NumPy from a single
+    histogram of the shared gray buffer, then applied in one C pass. Nothing
+    is materialised until the OCR loop asks for that variant, so at most one
+    variant is alive next to the base buffers.
+
+    Gray is always taken after the RGB upscale, as in the legacy chain, so
+    every variant is pixel-identical to it. Profiles that only need grayscale
+    variants drop the upscaled RGB buffer once gray is derived from it.
+    """
+
+    def __init__(self, image: Image.Image, ocr_profile: str, scale: float = 2.0):
+        self.ocr_profile = ocr_profile
+        self.names = variant_names(ocr_profile)
+        self._source = image
+        self._target = (
+            max(1, int(round(image.width * scale))),
+            max(1, int(round(image.height * scale))),
+        )
+        self._needs_rgb = any(name in _RGB_VARIANTS for name in self.names)
+        self._resized: Optional[Image.Image] = None
+        self._gray: Optional[Image.Image] = None
+        self._luts: Dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __iter__(self) -> Iterator[Image.Image]:
+        for name in self.names:
+            yield self.get(name)
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        return self._target
+
+    def _upscale(self, image: Image.Image) -> Image.Image:
+        if image.size == self._target:
+            return image
+        return image.resize(self._target, Image.Resampling.LANCZOS)
+
+    def _upscaled_rgb(self) -> Image.Image:
+        source = self._source if self._source.mode == "RGB" else self._source.convert("RGB")
+        return self._upscale(source)
+
+    def _resized_rgb(self) -> Image.Image:
+        if self._resized is None:
+            self._resized = self._upscaled_rgb()
+        return self._resized
+
+    def _gray_image(self) -> Image.Image:
+        if self._gray is None:
+            rgb = self._resized_rgb() if self._needs_rgb else self._upscaled_rgb()
+            self._gray = rgb.convert("L")
+        return self._gray
+
+    def _autocontrast(self) -> np.ndarray:
+        lut = self._luts.get("autocontrast")
+        if lut is None:
+            gray = self._gray_image()
+            histogram = np.asarray(gray.histogram(), dtype=np.int64)
+            contrast = _contrast_lut(histogram, gray.width * gray.height)
+            # Histogram of the contrasted image, derived from the gray one
+            # without touching the pixels again.
+            contrast_histogram = np.zeros(256, dtype=np.int64)
+            np.add.at(contrast_histogram, contrast, histogram)
+            lut = _autocontrast_lut(contrast_histogram)[contrast]
+            self._luts["autocontrast"] = lut
+        return lut
+
+    def lut(self, name: str) -> np.ndarray:
+        """Gray-level LUT that produces `name` from the shared gray buffer."""
+        if name == "gray":
+            return _IDENTITY
+        autocontrast = self._autocontrast()
+        if name == "autocontrast":
+            return autocontrast
+        if name == "thresholded":
+            return _threshold_lut(autocontrast)
+        if name == "inverted":
+            return 255 - autocontrast
+        if name == "inverted_thresholded":
+            return _threshold_lut(255 - autocontrast)
+        raise KeyError(name)
+
+    def get(self, name: str) -> Image.Image:
+        if name == "resized":
+            return self._resized_rgb()
+        if name == "gray":
+            return self._gray_image()
+        if name in _CHANNELS:
+            channel = self._resized_rgb().getchannel(_CHANNELS[name])
+            histogram = np.asarray(channel.histogram(), dtype=np.int64)
+            return channel.point(_autocontrast_lut(histogram).tolist())
+        return self._gray_image().point(self.lut(name).tolist())
@@ -0,0 +1,166 @@
+import threading
+from typing import Any, Callable, Dict, List, Sequence, Set, Tuple
+
+from PIL import Image
+
+from app.ocr.engine import OcrJob
+from app.ocr.preprocess import OcrVariants
+
+# (variant name, tesseract config)
+Label = Tuple[str, str]
+
+
+class VariantYieldStats:
+    """
+    Tracks, per OCR profile, how often each (variant, psm) pass ran and how
+    often it contributed a line to the merged output. The yield ratio orders
+    future passes so the productive ones run first.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._runs: Dict[Tuple[str, Label], int] = {}
+        self._contributed: Dict[Tuple[str, Label], int] = {}
+        self._images: Dict[str, int] = {}
+        self._skipped: Dict[str, int] = {}
+
+    def order(self, ocr_profile: str, labels: Sequence[Label]) -> List[Label]:
+        with self._lock:
+            def _key(item: Tuple[int, Label]) -> Tuple[float, int]:
+                index, label = item
+                runs = self._runs.get((ocr_profile, label), 0)
+                contributed = self._contributed.get((ocr_profile, label), 0)
+                # Laplace prior keeps the default order until there is data.
+                return (-(contributed + 1) / (runs + 2), index)
+
+            return [label for _, label in sorted(enumerate(labels), key=_key)]
+
+    def record(self, ocr_profile: str, ran: Sequence[Label], contributed: Sequence[Label], skipped: int) -> None:
+        with self._lock:
+            self._images[ocr_profile] = self._images.get(ocr_profile, 0) + 1
+            self._skipped[ocr_profile] = self._skipped.get(ocr_profile, 0) + skipped
+            for label in ran:
+                key = (ocr_profile, label)
+                self._runs[key] = self._runs.get(key, 0) + 1
+            for label in set(contributed):
+                key = (ocr_profile, label)
+                self._contributed[key] = self._contributed.get(key, 0) + 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            profiles: Dict[str, Any] = {}
+            for (profile, (variant, psm)), runs in self._runs.items():
+                contributed = self._contributed.get((profile, (variant, psm)), 0)
+                entry = profiles.setdefault(
+                    profile,
+                    {
+                        "images": self._images.get(profile, 0),
+                        "passes_skipped": self._skipped.get(profile, 0),
+                        "variants": {},
+                    },
+                )
+                entry["variants"][f"{variant} {psm}"] = {
+                    "runs": runs,
+                    "contributed": contributed,
+                    "yield": round(contributed / runs, 4) if runs else 0.0,
+                }
+            return profiles
+
+
+class VariantScheduler:
+    """
+    Runs the (variant, psm) passes for one image in yield order, a wave at a
+    time, and stops early once the merged line set has hit `max_lines` or
+    `patience` consecutive passes have added no new line.
+
+    Callers drive it: `next_jobs(n)` hands out up to n jobs, `feed(texts)`
+    returns their output in the same order, `result()` merges.
+    """
+
+    def __init__(
+        self,
+        variants: OcrVariants,
+        psm_modes: Sequence[str],
+        stats: VariantYieldStats,
+        line_keys: Callable[[str], Set[str]],
+        merge: Callable[[List[str]], Tuple[str, List[int]]],
+        max_lines: int = 12,
+        patience: int = 2,
+        early_exit: bool = False,
+    ):
+        self.variants = variants
+        self.stats = stats
+        self.line_keys = line_keys
+        self.merge = merge
+        self.max_lines = max_lines
+        self.patience = max(1, patience)
+        self.early_exit = early_exit
+        labels = [(name, psm) for name in variants.names for psm in psm_modes]
+        # Without early exit every pass runs anyway; keep the default order so
+        # candidate tie-breaks match the exhaustive sweep exactly.
+        self.order = stats.order(variants.ocr_profile, labels) if early_exit else labels
+        self._position = 0
+        self._ran: List[Label] = []
+        self._texts: List[str] = []
+        self._keys: Set[str] = set()
+        self._idle = 0
+        self._images: Dict[str, Image.Image] = {}
+        # Variant names of the jobs the last next_jobs() call handed out.
+        self.last_variants: List[str] = []
+        self.done = not self.order
+
+    @property
+    def remaining(self) -> int:
+        return len(self.order) - self._position
+
+    def next_jobs(self, count: int) -> List[OcrJob]:
+        labels = self.order[self._position:self._position + max(1, count)]
+        self._position += len(labels)
+        jobs: List[OcrJob] = []
+        self.last_variants = [name for name, _ in labels]
+        for name, psm in labels:
+            image = self._images.get(name)
+            if image is None:
+                image = self._images[name] = self.variants.get(name)
+            jobs.append((image, psm))
+            self._ran.append((name, psm))
+        # Drop variant images no later pass needs, so only the live ones stay in memory.
+        pending = {name for name, _ in self.order[self._position:]}
+        for name in list(self._images):
+            if name not in pending:
+                del self._images[name]
+        return jobs
+
+    def feed(self, texts: Sequence[str]) -> None:
+        for text in texts:
+            self._texts.append(text)
+            new_keys = self.line_keys(text) - self._keys
+            if new_keys:
+                self._keys |= new_keys
+                self._idle = 0
+            elif self._keys:
+                self._idle += 1
+        if self._position >= len(self.order):
+            self.done = True
+        elif self.early_exit and self._keys and (
+            len(self._keys) >= self.max_lines or self._idle >= self.patience
+        ):
+            self.done = True
+
+    def result(self) -> str:
+        text, sources = self.merge(self._texts)
+        self.stats.record(
+            self.variants.ocr_profile,
+            ran=self._ran,
+            contributed=[self._ran[index] for index in sources],
+            skipped=self.remaining,
+        )
+        self._images.clear()
+        return text
+
+
+_yield_stats = VariantYieldStats()
+
+
+def get_variant_yield_stats() -> VariantYieldStats:
+    return _yield_stats
@@ -1,14 +1,23 @@
 import argparse
-import io
+import asyncio
 import json
 import re
-from typing import List
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Sequence
 from urllib.parse import urljoin, urlparse
 
-import pytesseract
-import requests
 from bs4 import BeautifulSoup
-from PIL import Image, ImageEnhance, ImageOps
+from PIL import Image
+
+from app.http_client import get_async_client, request_with_retries_sync
+from app.ocr.cache import OcrResultCache, cache_key, get_ocr_cache, image_digest
+from app.metrics import span
+from app.ocr.engine import OcrJob, get_ocr_engine
+from app.ocr.images import aread_capped, decode_image, ocr_scale, read_capped
+from app.ocr.phash import get_perceptual_index, perceptual_hashes
+from app.ocr.preprocess import OcrVariants
+from app.ocr.scheduler import VariantScheduler, get_variant_yield_stats
+from app.settings import env_bool, env_int
 
 USER_AGENT = (
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
@@ -16,30 +25,13 @@ USER_AGENT = (
 )
 
 
-def _session() -> requests.Session:
-    sess = requests.Session()
-    sess.headers.update({"User-Agent": USER_AGENT})
-    return sess
-
-
 def _is_image_url(url: str) -> bool:
     parsed = urlparse(url)
     return bool(re.search(r"\.(png|jpe?g|webp|bmp)$", parsed.path.lower()))
 
 
-def _extract_image_urls(post_url: str, max_images: int = 3) -> List[str]:
-    if _is_image_url(post_url):
-        return [post_url]
-
-    sess = _session()
-    response = sess.get(post_url, timeout=15)
-    response.raise_for_status()
-
-    content_type = response.headers.get("content-type", "").lower()
-    if content_type.startswith("image/"):
-        return [post_url]
-
-    soup = BeautifulSoup(response.text, "html.parser")
+def _image_urls_from_html(post_url: str, html: str, max_images: int = 3) -> List[str]:
+    soup = BeautifulSoup(html, "html.parser")
     candidates: List[str] = []
 
     for attr in [("property", "og:image"), ("name", "twitter:image")]:
@@ -62,39 +54,34 @@ def _extract_image_urls(post_url: str, max_images: int = 3) -> List[str]:
     return image_urls
 
 
-def _download_image(url: str) -> Image.Image:
-    sess = _session()
-    response = sess.get(url, timeout=15)
-    response.raise_for_status()
-    return Image.open(io.BytesIO(response.content)).convert("RGB")
+def _extract_image_urls(post_url: str, max_images: int = 3) -> List[str]:
+    if _is_image_url(post_url):
+        return [post_url]
 
+    with span("page_fetch"):
+        response = request_with_retries_sync("GET", post_url, headers={"User-Agent": USER_AGENT})
+        response.raise_for_status()
 
-def _preprocess_for_ocr(image: Image.Image, ocr_profile: str) -> List[Image.Image]:
-    resized = image.resize(
-        (max(1, image.width * 2), max(1, image.height * 2)),
-        Image.Resampling.LANCZOS,
-    )
-    gray = ImageOps.grayscale(resized)
-    boosted_contrast = ImageEnhance.Contrast(gray).enhance(2.0)
-    autocontrast = ImageOps.autocontrast(boosted_contrast)
-    thresholded = autocontrast.point(lambda value: 0 if value < 180 else 255)
-    if ocr_profile == "fast":
-        return [autocontrast, thresholded]
+    content_type = response.headers.get("content-type", "").lower()
+    if content_type.startswith("image/"):
+        return [post_url]
+
+    return _image_urls_from_html(post_url, response.text, max_images=max_images)
 
-    inverted = ImageOps.invert(autocontrast)
-    inverted_thresholded = inverted.point(lambda value: 0 if value < 180 else 255)
-    red_channel, green_channel, blue_channel = resized.split()
-    return [
-        resized,
-        gray,
-        autocontrast,
-        thresholded,
-        inverted,
-        inverted_thresholded,
-        ImageOps.autocontrast(red_channel),
-        ImageOps.autocontrast(green_channel),
-        ImageOps.autocontrast(blue_channel),
-    ]
+
+def _download_image(url: str) -> Image.Image:
+    with span("image_download"):
+        response = request_with_retries_sync("GET", url, stream=True, headers={"User-Agent": USER_AGENT})
+        try:
+            response.raise_for_status()
+            content = read_capped(response.headers.get("content-length"), response.iter_bytes())
+        finally:
+            response.close()
+    return decode_image(content)
+
+
+def _preprocess_for_ocr(image: Image.Image, ocr_profile: str) -> OcrVariants:
+    return OcrVariants(image, ocr_profile=ocr_profile, scale=ocr_scale(image.size))
 
 
 def _ocr_psm_modes(ocr_profile: str) -> tuple[str, ...]:
@@ -134,48 +121,370 @@ def _is_reasonable_ocr_line(line: str) -> bool:
     return _line_quality_score(stripped) >= 12
 
 
-def _extract_best_text_from_image(image: Image.Image, ocr_profile: str) -> str:
-    candidates: List[str] = []
-    for processed in _preprocess_for_ocr(image, ocr_profile=ocr_profile):
-        for psm_mode in _ocr_psm_modes(ocr_profile):
-            text = pytesseract.image_to_string(processed, config=psm_mode).strip()
-            if text:
-                candidates.append(text)
+def _ocr_jobs(image: Image.Image, ocr_profile: str) -> List[OcrJob]:
+    """Every (variant, psm) pass for an image, in default order; the exhaustive sweep."""
+    return [
+        (processed, psm_mode)
+        for processed in _preprocess_for_ocr(image, ocr_profile=ocr_profile)
+        for psm_mode in _ocr_psm_modes(ocr_profile)
+    ]
+
+
+def _normalized_ocr_lines(text: str) -> List[tuple[str, str]]:
+    lines: List[tuple[str, str]] = []
+    for raw_line in text.splitlines():
+        line = raw_line.strip()
+        if not _is_reasonable_ocr_line(line):
+            continue
+        normalized = re.sub(r"[^a-z0-9]", "", line.lower())
+        if len(normalized) < 4:
+            continue
+        lines.append((line, normalized))
+    return lines
+
+
+def _ocr_line_keys(text: str) -> set[str]:
+    return {normalized for _, normalized in _normalized_ocr_lines(text)}
+
+
+def _merge_ocr_candidates_with_sources(texts: List[str]) -> tuple[str, List[int]]:
+    """Merge OCR candidates; also returns the indices of the candidates that contributed."""
+    candidates = [(index, text) for index, text in enumerate(texts) if text]
     if not candidates:
-        return ""
+        return "", []
     merged_lines: List[str] = []
+    sources: List[int] = []
     seen_normalized: set[str] = set()
-    scored_candidates = sorted(candidates, key=_ocr_text_score, reverse=True)
-    for candidate in scored_candidates:
-        for raw_line in candidate.splitlines():
-            line = raw_line.strip()
-            if not _is_reasonable_ocr_line(line):
-                continue
-            normalized = re.sub(r"[^a-z0-9]", "", line.lower())
-            if len(normalized) < 4 or normalized in seen_normalized:
+    scored_candidates = sorted(candidates, key=lambda item: _ocr_text_score(item[1]), reverse=True)
+    for index, candidate in scored_candidates:
+        for line, normalized in _normalized_ocr_lines(candidate):
+            if normalized in seen_normalized:
                 continue
             seen_normalized.add(normalized)
             merged_lines.append(line)
+            if index not in sources:
+                sources.append(index)
             if len(merged_lines) >= 12:
-                return "\n".join(merged_lines)
+                return "\n".join(merged_lines), sources
     if merged_lines:
-        return "\n".join(merged_lines)
-    return scored_candidates[0]
+        return "\n".join(merged_lines), sources
+    return scored_candidates[0][1], [scored_candidates[0][0]]
+
+
+def _merge_ocr_candidates(texts: List[str]) -> str:
+    return _merge_ocr_candidates_with_sources(texts)[0]
+
+
+def _variant_scheduler(image: Image.Image, ocr_profile: str) -> VariantScheduler:
+    return VariantScheduler(
+        _preprocess_for_ocr(image, ocr_profile=ocr_profile),
+        psm_modes=_ocr_psm_modes(ocr_profile),
+        stats=get_variant_yield_stats(),
+        line_keys=_ocr_line_keys,
+        merge=_merge_ocr_candidates_with_sources,
+        patience=env_int("OCR_SATURATION_PATIENCE", 2),
+        early_exit=env_bool("OCR_EARLY_EXIT", False),
+    )
+
+
+def _store_ocr_result(cache: OcrResultCache, image_url: str, digest: str, ocr_profile: str, text: str) -> None:
+    cache.put(cache_key(digest, ocr_profile), text)
+    cache.remember_url(image_url, digest)
+
+
+def _image_id(digest: Optional[str]) -> Optional[str]:
+    """Canonical id of an already indexed image: the digest of the first-seen copy in its near-duplicate group."""
+    index = get_perceptual_index()
+    if index is None or not digest:
+        return digest
+    return index.canonical_of(digest) or digest
+
+
+# The single pass that must read an image's text back before a near-duplicate's
+# cached text is reused for it: the first pass of the fast profile.
+_VERIFY_VARIANT = "autocontrast"
+_VERIFY_PSM = "--psm 6"
+
+
+def _near_duplicates(
+    cache: OcrResultCache, image: Image.Image, digest: str, ocr_profile: str
+) -> tuple[Optional[tuple[int, int]], List[tuple[str, str]]]:
+    """
+    Perceptual hashes of an image with no cached text under its own digest,
+    and (digest, cached text) of every indexed near-duplicate. Near hashes
+    only mean a similar layout: a meme with one word or digit of its caption
+    changed hashes like the original, so candidates are only reused once
+    `_verified_near_duplicate` agrees.
+    """
+    index = get_perceptual_index()
+    if index is None:
+        return None, []
+    hashes = index.hashes_of(digest) or perceptual_hashes(image)
+    if hashes is None:
+        return None, []
+    candidates: List[tuple[str, str]] = []
+    for _distance, other in index.nearest(*hashes):
+        text = cache.get(cache_key(other, ocr_profile)) if other != digest else None
+        if text is not None:
+            candidates.append((other, text))
+    return hashes, candidates
+
+
+def _verification_job(image: Image.Image) -> OcrJob:
+    return _preprocess_for_ocr(image, ocr_profile="fast").get(_VERIFY_VARIANT), _VERIFY_PSM
+
+
+def _verifies(stored: str, verification: str) -> bool:
+    """Whether a verification pass read exactly the lines of a candidate's cached text."""
+    keys = _ocr_line_keys(verification)
+    return bool(keys) and keys == _ocr_line_keys(stored)
+
+
+def _verified_near_duplicate(
+    cache: OcrResultCache,
+    digest: str,
+    hashes: tuple[int, int],
+    candidates: List[tuple[str, str]],
+    verification: Optional[str],
+) -> tuple[Optional[str], str]:
+    """
+    The cached text of the first candidate whose lines equal what the
+    verification pass read from the image (None if none does), and the
+    image's canonical id, inherited only from that candidate. The image is
+    indexed either way.
+    """
+    index = get_perceptual_index()
+    if index is None:
+        return None, digest
+    text = None
+    canonical = index.canonical_of(digest)
+    for other, stored in candidates:
+        if verification is not None and _verifies(stored, verification):
+            text = stored
+            canonical = canonical or index.canonical_of(other)
+            break
+    canonical = canonical or digest
+    if index.hashes_of(digest) is None:
+        index.add(digest, *hashes, canonical)
+        cache.remember_phash(digest, *hashes, canonical)
+    return text, canonical
 
 
 def _extract_ocr_text(image_urls: List[str], ocr_profile: str) -> tuple[str, List[str]]:
-    chunks: List[str] = []
-    errors: List[str] = []
-    for image_url in image_urls:
+    cache = get_ocr_cache()
+    engine = get_ocr_engine()
+    texts: List[Optional[str]] = [None] * len(image_urls)
+    errors: dict[int, str] = {}
+
+    def _record_error(index: int, exc: Exception) -> None:
+        errors[index] = f"{image_urls[index]} -> {type(exc).__name__}: {exc}"
+
+    pending: List[int] = []
+    for index, image_url in enumerate(image_urls):
+        cached = cache.lookup_url(image_url, ocr_profile) if cache else None
+        if cached is None:
+            pending.append(index)
+        else:
+            texts[index] = cached
+
+    downloads = engine.map_downloads(_download_image, [image_urls[i] for i in pending])
+    scheduled: List[tuple[int, Optional[str], VariantScheduler]] = []
+    for index, download in zip(pending, downloads):
         try:
-            image = _download_image(image_url)
-            text = _extract_best_text_from_image(image, ocr_profile=ocr_profile)
-            if text.strip():
-                chunks.append(text.strip())
+            image = download.result()
+            digest = image_digest(image) if cache else None
+            if cache and digest:
+                cached = cache.get(cache_key(digest, ocr_profile))
+                if cached is not None:
+                    texts[index] = cached
+                    cache.remember_url(image_urls[index], digest)
+                    continue
+                hashes, candidates = _near_duplicates(cache, image, digest, ocr_profile)
+                if hashes is not None:
+                    verification = engine.submit([_verification_job(image)])[0].result() if candidates else None
+                    cached, _ = _verified_near_duplicate(cache, digest, hashes, candidates, verification)
+                if cached is not None:
+                    texts[index] = cached
+                    _store_ocr_result(cache, image_urls[index], digest, ocr_profile, cached)
+                    continue
+            scheduled.append((index, digest, _variant_scheduler(image, ocr_profile)))
         except Exception as exc:
-            errors.append(f"{image_url} -> {type(exc).__name__}: {exc}")
+            _record_error(index, exc)
+
+    # Every image advances one wave at a time, sharing the OCR pool between
+    # them, until its scheduler reports the merged text has saturated.
+    active = list(scheduled)
+    while active:
+        wave_size = max(1, engine.workers // len(active))
+        submitted: List[tuple[int, VariantScheduler, List[Future]]] = []
+        for index, _, scheduler in active:
+            count = wave_size if scheduler.early_exit else scheduler.remaining
+            jobs = scheduler.next_jobs(count)
+            submitted.append((index, scheduler, engine.submit(jobs, scheduler.last_variants)))
+        for index, scheduler, futures in submitted:
+            try:
+                scheduler.feed([future.result() for future in futures])
+            except Exception as exc:
+                _record_error(index, exc)
+        active = [entry for entry in active if not entry[2].done and entry[0] not in errors]
+
+    for index, digest, scheduler in scheduled:
+        if index in errors:
             continue
-    return "\n".join(chunks), errors
+        text = scheduler.result()
+        texts[index] = text
+        if cache and digest:
+            _store_ocr_result(cache, image_urls[index], digest, ocr_profile, text)
+
+    chunks = [text.strip() for text in texts if text and text.strip()]
+    return "\n".join(chunks), [errors[index] for index in sorted(errors)]
+
+
+class _IngestLimits:
+    def __init__(self) -> None:
+        self.fetches = asyncio.Semaphore(env_int("INGEST_MAX_CONCURRENT_FETCHES", 16))
+        self.images = asyncio.Semaphore(env_int("INGEST_MAX_CONCURRENT_IMAGES", 8))
+        # (image url, ocr profile) -> OCR task other posts can join.
+        self.ocr_inflight: Dict[tuple[str, str], "asyncio.Task[tuple[str, Optional[str]]]"] = {}
+
+
+_ingest_limits: Optional[tuple[asyncio.AbstractEventLoop, _IngestLimits]] = None
+
+
+def _limits() -> _IngestLimits:
+    global _ingest_limits
+    loop = asyncio.get_running_loop()
+    if _ingest_limits is None or _ingest_limits[0] is not loop:
+        _ingest_limits = (loop, _IngestLimits())
+    return _ingest_limits[1]
+
+
+async def _extract_image_urls_async(post_url: str, max_images: int = 3) -> List[str]:
+    if _is_image_url(post_url):
+        return [post_url]
+
+    async with _limits().fetches:
+        with span("page_fetch"):
+            async with get_async_client().stream("GET", post_url, headers={"User-Agent": USER_AGENT}) as response:
+                response.raise_for_status()
+                content_type = response.headers.get("content-type", "").lower()
+                if content_type.startswith("image/"):
+                    return [post_url]
+                await response.aread()
+                html = response.text
+
+    return await get_ocr_engine().run_blocking(_image_urls_from_html, post_url, html, max_images)
+
+
+async def _download_image_async(url: str) -> Image.Image:
+    async with _limits().fetches:
+        with span("image_download"):
+            async with get_async_client().stream("GET", url, headers={"User-Agent": USER_AGENT}) as response:
+                response.raise_for_status()
+                content = await aread_capped(response.headers.get("content-length"), response.aiter_bytes())
+    return await get_ocr_engine().run_blocking(decode_image, content)
+
+
+async def _ocr_image_async(image_url: str, ocr_profile: str, wave_size: int) -> tuple[str, Optional[str]]:
+    # Posts in one feed often share an image (reposts, batch requests): concurrent
+    # callers join one download + OCR instead of racing the cache.
+    inflight = _limits().ocr_inflight
+    key = (image_url, ocr_profile)
+    task = inflight.get(key)
+    if task is None:
+        task = asyncio.get_running_loop().create_task(_ocr_image_once_async(image_url, ocr_profile, wave_size))
+        inflight[key] = task
+        task.add_done_callback(lambda _: inflight.pop(key, None))
+    return await asyncio.shield(task)
+
+
+async def _ocr_image_once_async(image_url: str, ocr_profile: str, wave_size: int) -> tuple[str, Optional[str]]:
+    """OCR text of one image and its canonical image id (None without the OCR cache)."""
+    engine = get_ocr_engine()
+    cache = get_ocr_cache()
+    if cache:
+        digest = await engine.run_blocking(cache.digest_for_url, image_url)
+        if digest is not None:
+            cached = await engine.run_blocking(cache.get, cache_key(digest, ocr_profile))
+            if cached is not None:
+                return cached, _image_id(digest)
+
+    async with _limits().images:
+        image = await _download_image_async(image_url)
+        digest = None
+        image_id = None
+        if cache:
+            digest = image_id = await engine.run_blocking(image_digest, image)
+            cached = await engine.run_blocking(cache.get, cache_key(digest, ocr_profile))
+            if cached is not None:
+                await engine.run_blocking(cache.remember_url, image_url, digest)
+                return cached, _image_id(digest)
+            hashes, candidates = await engine.run_blocking(_near_duplicates, cache, image, digest, ocr_profile)
+            if hashes is not None:
+                verification = None
+                if candidates:
+                    job = await engine.run_blocking(_verification_job, image)
+                    (verification,) = await engine.run_jobs([job])
+                cached, image_id = await engine.run_blocking(
+                    _verified_near_duplicate, cache, digest, hashes, candidates, verification
+                )
+            if cached is not None:
+                await engine.run_blocking(_store_ocr_result, cache, image_url, digest, ocr_profile, cached)
+                return cached, image_id
+
+        with span("ocr_image"):
+            scheduler = _variant_scheduler(image, ocr_profile)
+            while not scheduler.done:
+                count = wave_size if scheduler.early_exit else scheduler.remaining
+                jobs = await engine.run_blocking(scheduler.next_jobs, count)
+                scheduler.feed(await engine.run_jobs(jobs, scheduler.last_variants))
+            text = await engine.run_blocking(scheduler.result)
+
+        if cache and digest:
+            await engine.run_blocking(_store_ocr_result, cache, image_url, digest, ocr_profile, text)
+    return text, image_id
+
+
+async def _extract_ocr_text_async(
+    image_urls: List[str], ocr_profile: str
+) -> tuple[str, List[str], List[Optional[str]]]:
+    """Merged text, per-image errors, and each image's canonical id (None when unknown)."""
+    engine = get_ocr_engine()
+    wave_size = max(1, engine.workers // max(1, len(image_urls)))
+    results = await asyncio.gather(
+        *(_ocr_image_async(image_url, ocr_profile, wave_size) for image_url in image_urls),
+        return_exceptions=True,
+    )
+    chunks: List[str] = []
+    errors: List[str] = []
+    image_ids: List[Optional[str]] = []
+    for image_url, result in zip(image_urls, results):
+        if isinstance(result, BaseException):
+            if not isinstance(result, Exception):
+                raise result
+            errors.append(f"{image_url} -> {type(result).__name__}: {result}")
+            image_ids.append(None)
+            continue
+        text, image_id = result
+        image_ids.append(image_id)
+        if text.strip():
+            chunks.append(text.strip())
+    return "\n".join(chunks), errors, image_ids
+
+
+def _llm_input_payload(
+    caption: str, alt_text: str, ocr_text: str, image_ids: Sequence[Optional[str]] = ()
+) -> dict[str, Any]:
+    llm_input_parts = [caption.strip(), alt_text.strip(), ocr_text.strip()]
+    llm_input_text = "\n\n".join(part for part in llm_input_parts if part)
+
+    return {
+        "llm-input-text": llm_input_text,
+        "caption": caption,
+        "alt-text": alt_text,
+        "ocr-text": ocr_text,
+        "image-ids": list(image_ids),
+    }
 
 
 def extract_post_text_for_llm(
@@ -184,19 +493,30 @@ def extract_post_text_for_llm(
     alt_text: str = "",
     max_images: int = 3,
     ocr_profile: str = "fast",
-) -> dict[str, str]:
+) -> dict[str, Any]:
     if ocr_profile not in {"fast", "accurate"}:
         raise ValueError("ocr_profile must be either 'fast' or 'accurate'")
     image_urls = _extract_image_urls(post_url, max_images=max_images)
     ocr_text, _ = _extract_ocr_text(image_urls, ocr_profile=ocr_profile)
-    llm_input_parts = [caption.strip(), alt_text.strip(), ocr_text.strip()]
-    llm_input_text = "\n\n".join(part for part in llm_input_parts if part)
+    return _llm_input_payload(caption, alt_text, ocr_text)
 
-    return {
-        "llm-input-text": llm_input_text,
-        "caption": caption,
-        "alt-text": alt_text,
-    }
+
+async def extract_post_text_for_llm_async(
+    post_url: str,
+    caption: str = "",
+    alt_text: str = "",
+    max_images: int = 3,
+    ocr_profile: str = "fast",
+) -> dict[str, Any]:
+    """
+    Async twin of extract_post_text_for_llm: network I/O runs on the event
+    loop, blocking work on the OCR engine's bounded executor and process pool.
+    """
+    if ocr_profile not in {"fast", "accurate"}:
+        raise ValueError("ocr_profile must be either 'fast' or 'accurate'")
+    image_urls = await _extract_image_urls_async(post_url, max_images=max_images)
+    ocr_text, _, image_ids = await _extract_ocr_text_async(image_urls, ocr_profile=ocr_profile)
+    return _llm_input_payload(caption, alt_text, ocr_text, image_ids)
 
 
 def get_image_data() -> None:
@@ -0,0 +1,314 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.settings import CACHE_DIR, env_bool, env_float, env_str
+
+TIERS = ("high", "medium", "low")
+
+# Domain (or public suffix) -> tier. A host resolves through its most specific
+# listed suffix, so "news.bbc.co.uk" uses "bbc.co.uk" and "cdc.gov" uses "gov".
+SEED_TIERS: Dict[str, str] = {
+    # Government, intergovernmental and academic suffixes.
+    "gov": "high",
+    "mil": "high",
+    "edu": "high",
+    "int": "high",
+    "gov.uk": "high",
+    "ac.uk": "high",
+    "nhs.uk": "high",
+    "gov.au": "high",
+    "edu.au": "high",
+    "gc.ca": "high",
+    "gouv.fr": "high",
+    "gov.in": "high",
+    "nic.in": "high",
+    "govt.nz": "high",
+    "go.jp": "high",
+    "ac.jp": "high",
+    "europa.eu": "high",
+    # Wire services, public broadcasters and newspapers of record.
+    "reuters.com": "high",
+    "apnews.com": "high",
+    "afp.com": "high",
+    "bbc.com": "high",
+    "bbc.co.uk": "high",
+    "npr.org": "high",
+    "pbs.org": "high",
+    "cbc.ca": "high",
+    "abc.net.au": "high",
+    "nytimes.com": "high",
+    "washingtonpost.com": "high",
+    "wsj.com": "high",
+    "ft.com": "high",
+    "economist.com": "high",
+    "theguardian.com": "high",
+    "bloomberg.com": "high",
+    "lemonde.fr": "high",
+    "dw.com": "high",
+    # Journals and research bodies.
+    "nature.com": "high",
+    "science.org": "high",
+    "thelancet.com": "high",
+    "nejm.org": "high",
+    "bmj.com": "high",
+    "who.int": "high",
+    "un.org": "high",
+    "worldbank.org": "high",
+    "imf.org": "high",
+    # Fact-checkers.
+    "snopes.com": "high",
+    "politifact.com": "high",
+    "factcheck.org": "high",
+    "fullfact.org": "high",
+    # Mainstream outlets with editorial standards but more opinion mix.
+    "cnn.com": "medium",
+    "foxnews.com": "medium",
+    "nbcnews.com": "medium",
+    "cbsnews.com": "medium",
+    "abcnews.go.com": "medium",
+    "usatoday.com": "medium",
+    "politico.com": "medium",
+    "axios.com": "medium",
+    "thehill.com": "medium",
+    "forbes.com": "medium",
+    "businessinsider.com": "medium",
+    "time.com": "medium",
+    "newsweek.com": "medium",
+    "independent.co.uk": "medium",
+    "telegraph.co.uk": "medium",
+    "aljazeera.com": "medium",
+    "wikipedia.org": "medium",
+    "britannica.com": "medium",
+    # User-generated content platforms.
+    "twitter.com": "low",
+    "x.com": "low",
+    "facebook.com": "low",
+    "instagram.com": "low",
+    "tiktok.com": "low",
+    "reddit.com": "low",
+    "quora.com": "low",
+    "medium.com": "low",
+    "substack.com": "low",
+    "blogspot.com": "low",
+    "wordpress.com": "low",
+    "tumblr.com": "low",
+    "youtube.com": "low",
+    "pinterest.com": "low",
+    "bsky.app": "low",
+    "t.me": "low",
+    # Tabloids and known misinformation / content-farm sites.
+    "dailymail.co.uk": "low",
+    "thesun.co.uk": "low",
+    "nypost.com": "low",
+    "infowars.com": "low",
+    "naturalnews.com": "low",
+    "breitbart.com": "low",
+    "zerohedge.com": "low",
+    "theonion.com": "low",
+    "babylonbee.com": "low",
+    "beforeitsnews.com": "low",
+    "worldnewsdailyreport.com": "low",
+    "yournewswire.com": "low",
+    "newspunch.com": "low",
+}
+
+# Second-level registries under country TLDs (so "bbc.co.uk" is the registrable
+# domain, not "co.uk"). They are also the only suffixes a seeded brand is
+# matched on: a brand under an arbitrary TLD (nytimes.xyz, apnews.news) is a
+# classic lookalike, not a country edition.
+_COUNTRY_SECOND_LEVELS = {
+    "co.uk", "org.uk", "com.au", "net.au", "org.au", "co.nz", "co.jp", "com.br",
+    "co.in", "co.za", "com.mx", "com.sg", "com.hk", "com.tr", "com.ar", "co.kr",
+}
+_GENERIC_TLDS = {"com", "org", "net"}
+
+
+def _is_public_suffix(domain: str) -> bool:
+    """A bare TLD or country registry ("com", "co.uk"): a tier learned for it would cover every site below it."""
+    return "." not in domain or domain in _COUNTRY_SECOND_LEVELS
+
+
+def registrable_domain(host: str) -> str:
+    labels = host.split(".")
+    if len(labels) >= 3 and ".".join(labels[-2:]) in _COUNTRY_SECOND_LEVELS:
+        return ".".join(labels[-3:])
+    return ".".join(labels[-2:])
+
+
+def _brand(domain: str) -> Tuple[str, str]:
+    """("reuters", "de") for "reuters.de"; ("bbc", "co.uk") for "bbc.co.uk"."""
+    name, _, suffix = domain.partition(".")
+    return name, suffix
+
+
+def _capped(tier: str) -> str:
+    # A brand on a country registry can't prove who owns it, so it never vouches "high".
+    return "medium" if tier == "high" else tier
+
+
+class CredibilityIndex:
+    """
+    Local domain -> credibility tier lookup.
+
+    A tier learned from the credibility assistant applies to its exact host
+    only: the model may rate a shared suffix (com.ng, github.io,
+    blogspot.com), and that must not cover every site below it. Otherwise
+    resolution walks seed entries from the full host towards its suffixes.
+    Failing that, a well-known brand under a listed country registry
+    (cnn.co.jp, reuters.com.br) resolves through its .com/.org/.net seed
+    entry, capped at "medium". Learned tiers are stored in SQLite and expire
+    after `learned_ttl_seconds`; bare TLDs and country registries are never
+    learned.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str],
+        seed: Optional[Dict[str, str]] = None,
+        learned_ttl_seconds: float = 30 * 24 * 3600,
+    ):
+        self.path = path
+        self.learned_ttl_seconds = learned_ttl_seconds
+        self.seed = {domain.lower(): tier for domain, tier in (seed if seed is not None else SEED_TIERS).items()}
+        self._brands: Dict[str, str] = {}
+        for domain, tier in self.seed.items():
+            name, suffix = _brand(domain)
+            if suffix in _GENERIC_TLDS:
+                self._brands.setdefault(name, tier)
+
+        self._lock = threading.Lock()
+        self._learned: Dict[str, Tuple[str, str, List[str], float]] = {}
+        self._stats: Dict[str, int] = {
+            "seed_hits": 0,
+            "learned_hits": 0,
+            "brand_hits": 0,
+            "misses": 0,
+            "learned": 0,
+        }
+
+        self._db: Optional[sqlite3.Connection] = None
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS learned_tiers ("
+                "domain TEXT PRIMARY KEY, tier TEXT NOT NULL, rationale TEXT NOT NULL, "
+                "signals TEXT NOT NULL, learned_at REAL NOT NULL)"
+            )
+            self._db.commit()
+            cutoff = time.time() - learned_ttl_seconds
+            self._db.execute("DELETE FROM learned_tiers WHERE learned_at < ?", (cutoff,))
+            self._db.commit()
+            for domain, tier, rationale, signals, learned_at in self._db.execute(
+                "SELECT domain, tier, rationale, signals, learned_at FROM learned_tiers"
+            ):
+                if _is_public_suffix(domain):
+                    continue
+                try:
+                    parsed = json.loads(signals)
+                except ValueError:
+                    parsed = []
+                self._learned[domain] = (tier, rationale, parsed, learned_at)
+
+    def _learned_entry(self, domain: str, now: float) -> Optional[Tuple[str, str, List[str], float]]:
+        entry = self._learned.get(domain)
+        if entry is None:
+            return None
+        if now - entry[3] > self.learned_ttl_seconds:
+            del self._learned[domain]
+            return None
+        return entry
+
+    def resolve(self, domain: str) -> Optional[Dict[str, Any]]:
+        """{tier, rationale, signals} for `domain`, or None when only the model can say."""
+        domain = (domain or "").lower().strip(".")
+        if not domain:
+            return None
+        now = time.time()
+        labels = domain.split(".")
+        with self._lock:
+            tier = self.seed.get(domain)
+            learned = self._learned_entry(domain, now) if tier is None else None
+            if learned is not None:
+                self._stats["learned_hits"] += 1
+                return {
+                    "tier": learned[0],
+                    "rationale": learned[1],
+                    "signals": list(learned[2]) + ["credibility_index_learned"],
+                }
+            for start in range(len(labels)):
+                candidate = ".".join(labels[start:])
+                tier = self.seed.get(candidate)
+                if tier is not None:
+                    self._stats["seed_hits"] += 1
+                    return {
+                        "tier": tier,
+                        "rationale": f"Listed in the local credibility index as {candidate}.",
+                        "signals": ["credibility_index", f"suffix:{candidate}"],
+                    }
+
+            name, suffix = _brand(registrable_domain(domain))
+            tier = self._brands.get(name)
+            if tier is not None and suffix in _COUNTRY_SECOND_LEVELS:
+                self._stats["brand_hits"] += 1
+                return {
+                    "tier": _capped(tier),
+                    "rationale": f"Country domain of the indexed brand {name}.",
+                    "signals": ["credibility_index", "brand_match"],
+                }
+
+            self._stats["misses"] += 1
+            return None
+
+    def learn(self, domain: str, tier: str, rationale: str = "", signals: Optional[List[str]] = None) -> bool:
+        """Remember a model-assigned tier for exactly this host; invalid tiers, seeded domains and public suffixes are ignored."""
+        domain = (domain or "").lower().strip(".")
+        tier = (tier or "").lower().strip()
+        if not domain or tier not in TIERS or domain in self.seed or _is_public_suffix(domain):
+            return False
+        now = time.time()
+        clean_signals = [str(signal) for signal in (signals or [])][:6]
+        with self._lock:
+            self._learned[domain] = (tier, rationale or "", clean_signals, now)
+            self._stats["learned"] += 1
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO learned_tiers (domain, tier, rationale, signals, learned_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (domain, tier, rationale or "", json.dumps(clean_signals), now),
+                )
+                self._db.commit()
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+            stats["seed_entries"] = len(self.seed)
+            stats["learned_entries"] = len(self._learned)
+        lookups = stats["seed_hits"] + stats["learned_hits"] + stats["brand_hits"] + stats["misses"]
+        stats["hit_ratio"] = round((lookups - stats["misses"]) / lookups, 4) if lookups else 0.0
+        return stats
+
+
+_index: Optional[CredibilityIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_credibility_index() -> Optional[CredibilityIndex]:
+    """Process-wide index configured from CREDIBILITY_INDEX_* env vars; None when disabled."""
+    global _index
+    if not env_bool("CREDIBILITY_INDEX_ENABLED", True):
+        return None
+    with _index_lock:
+        if _index is None:
+            path = env_str("CREDIBILITY_INDEX_PATH", os.path.join(CACHE_DIR, "credibility.sqlite3"))
+            _index = CredibilityIndex(
+                path=None if path == ":memory:" else path,
+                learned_ttl_seconds=env_float("CREDIBILITY_LEARNED_TTL_SECONDS", 30 * 24 * 3600),
+            )
+        return _index
@@ -1,39 +1,39 @@
 import json
 from typing import Any, Dict, List, Optional
-from urllib.parse import urlparse
 
 from backboard import BackboardClient
+from app.agents.assistant_registry import AssistantRegistry
 from app.agents.prompts import CREDIBILITY_TOOL_PROMPT
+from app.metrics import span
+from app.tools.credibility_index import CredibilityIndex, get_credibility_index
+from app.tools.urls import url_domain
 
-def _domain(u: str) -> str:
-    return (urlparse(u).netloc or "").lower().replace("www.", "")
 
 class CredibilityTool:
-    def __init__(self,  client: BackboardClient, model_name: str ="gpt-4o"):
-        print("Initializing CredibilityTool...")
+    ASSISTANT_NAME = "CredibilityTool"
+
+    def __init__(
+        self,
+        client: BackboardClient,
+        model_name: str = "gpt-4o",
+        assistants: Optional[AssistantRegistry] = None,
+        index: Optional[CredibilityIndex] = None,
+    ):
         self.client = client
         self.model_name = model_name
+        self.assistants = assistants or AssistantRegistry(client)
         self.assistant_id: Optional[str] = None
+        self.index = index if index is not None else get_credibility_index()
     
     async def ensure_assistant(self):
-        if self.assistant_id:
-            return self.assistant_id
-        
-        a = await self.client.create_assistant(
-            name="CredibilityTool",
+        self.assistant_id = await self.assistants.ensure(
+            name=self.ASSISTANT_NAME,
             description=CREDIBILITY_TOOL_PROMPT,
-            tools=[]
+            tools=[],
         )
-
-        self.assistant_id = a.assistant_id
         return self.assistant_id
 
     async def run(self, payload: Dict[str, Any]) -> Dict[str, Any]:
-        assistant_id = await self.ensure_assistant()
-        thread = await self.client.start_thread(
-            assistant_id=assistant_id,
-        )
-
         sources = payload.get("sources", [])
         normalized = []
         for s in sources:
@@ -43,23 +43,72 @@ class CredibilityTool:
             normalized.append(
                 {
                     "url": url,
-                    "domain": _domain(url),
+                    "domain": url_domain(url),
                     "title": s.get("title"),
                     "snippet": s.get("snippet"),
                 }
             )
-        
+
+        # Domains the local index knows never reach the model.
+        items: List[Optional[Dict[str, Any]]] = []
+        unknown: List[Dict[str, Any]] = []
+        for source in normalized:
+            known = self.index.resolve(source["domain"]) if self.index is not None else None
+            if known is None:
+                items.append(None)
+                unknown.append(source)
+            else:
+                items.append({"url": source["url"], "domain": source["domain"], **known})
+
+        data: Dict[str, Any] = {}
+        if unknown:
+            data = await self._rate_with_llm(unknown)
+
+        rated: Dict[str, Dict[str, Any]] = {}
+        for item in data.get("items", []) or []:
+            if not isinstance(item, dict) or not item.get("url"):
+                continue
+            rated[str(item["url"])] = item
+            if self.index is not None:
+                # Learned under the host that was rated: the model's `domain` may name a shared suffix.
+                self.index.learn(
+                    url_domain(str(item["url"])),
+                    str(item.get("tier") or ""),
+                    str(item.get("rationale") or ""),
+                    item.get("signals") if isinstance(item.get("signals"), list) else None,
+                )
+
+        merged: List[Dict[str, Any]] = []
+        for source, item in zip(normalized, items):
+            if item is None:
+                item = rated.pop(source["url"], None)
+            if item is not None:
+                merged.append(item)
+        # Anything the model rated under a URL we didn't send is passed through as before.
+        merged.extend(rated.values())
+
+        data["items"] = merged
+        return data
+
+    async def _rate_with_llm(self, sources: List[Dict[str, Any]]) -> Dict[str, Any]:
+        thread = await self.assistants.create_thread(
+            name=self.ASSISTANT_NAME,
+            description=CREDIBILITY_TOOL_PROMPT,
+            tools=[],
+        )
+
         msg = {
-            "sources": normalized
+            "sources": sources
         }
 
-        resp = await self.client.add_message(
-            thread_id=thread.thread_id,
-            content=json.dumps(msg),
-            stream=False,
-            memory="off",
-            model_name=self.model_name
-        )
+        with span("credibility_llm"):
+            resp = await self.client.add_message(
+                thread_id=thread.thread_id,
+                content=json.dumps(msg),
+                stream=False,
+                memory="off",
+                model_name=self.model_name
+            )
 
         raw = resp.content
         if isinstance(raw, str):
@@ -67,6 +116,4 @@ class CredibilityTool:
         else:
             data = raw
 
-        return data
-    
-    
\ No newline at end of file
+        return data if isinstance(data, dict) else {"items": data or []}
@@ -1,98 +1,151 @@
 import re
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Sequence, Set, Tuple
 
 from app.schemas.tool_io import NumericVerifyInput, NumericVerifyOutput, NumericFinding
 
 
+# Grouped thousands ("1,000") are tried first, but only when there is a group:
+# otherwise "2024" would be split into "202" and "4".
 _NUM_RE = re.compile(
     r"""
     (?:
-        (?P<currency>\$)\s*(?P<cur_num>\d{1,3}(?:,\d{3})*(?:\.\d+)?|\d+(?:\.\d+)?) |
+        (?P<currency>\$)\s*(?P<cur_num>\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?) |
         (?P<percent>\d+(?:\.\d+)?)\s*(?P<pct_sign>%) |
-        (?P<number>\d{1,3}(?:,\d{3})*(?:\.\d+)?|\d+(?:\.\d+)?)
+        (?P<number>\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?)
     )
     """,
     re.VERBOSE,
 )
 
-_RANGE_RE = re.compile(r"(\d+(?:\.\d+)?)\s*(?:-|to)\s*(\d+(?:\.\d+)?)", re.IGNORECASE)
-
-
-def _extract_numeric_strings(text: str) -> List[str]:
-    found: List[str] = []
-    for m in _NUM_RE.finditer(text):
-        s = m.group(0).strip()
-        if s:
-            found.append(s)
-    return found
+# What may sit between two numbers for them to read as a range: "90-95%", "10 to 12", "$5–$10".
+_RANGE_GAP_RE = re.compile(r"\s*(?:-|–|to)\s*", re.IGNORECASE)
+
+ABSOLUTE_KEYWORDS: Tuple[str, ...] = ("100%", "guaranteed", "no risk", "always", "never")
+URGENCY_KEYWORDS: Tuple[str, ...] = ("today", "now", "urgent", "limited time", "within")
+
+_KEYWORD_KIND = {
+    **{keyword: "absolute" for keyword in ABSOLUTE_KEYWORDS},
+    **{keyword: "urgency" for keyword in URGENCY_KEYWORDS},
+}
+# One pass over the lowered text finds every keyword. The lookahead is
+# zero-width, so overlapping hits ("now" inside "known") are all seen, the
+# same substring semantics as `keyword in lowered`.
+_KEYWORD_RE = re.compile(
+    "(?=(" + "|".join(re.escape(k) for k in sorted(_KEYWORD_KIND, key=len, reverse=True)) + "))"
+)
 
 
 def _to_float(num_str: str) -> float:
     return float(num_str.replace(",", "").replace("$", "").replace("%", "").strip())
 
 
-def numeric_verify(payload: Dict[str, Any]) -> Dict[str, Any]:
-    """
-    Tool entrypoint: accepts dict (from Backboard tool call args),
-    validates via Pydantic, returns JSON-serializable dict output.
-    """
-    inp = NumericVerifyInput(**payload)
-    claim = inp.claim_text
+def _keyword_kinds(lowered: str) -> Set[str]:
+    kinds: Set[str] = set()
+    for m in _KEYWORD_RE.finditer(lowered):
+        kinds.add(_KEYWORD_KIND[m.group(1)])
+        if len(kinds) == 2:
+            break
+    return kinds
+
 
-    extracted = _extract_numeric_strings(claim)
+def _scan_numbers(text: str) -> Tuple[List[str], List[float], List[Tuple[float, float]]]:
+    """One scan: the numeric strings, the percent values, and ranges formed by adjacent numbers."""
+    extracted: List[str] = []
+    percents: List[float] = []
+    ranges: List[Tuple[float, float]] = []
+    previous = None
+    previous_value = 0.0
+    for m in _NUM_RE.finditer(text):
+        s = m.group(0).strip()
+        if not s:
+            continue
+        extracted.append(s)
+        value = _to_float(s)
+        if m.group("pct_sign"):
+            percents.append(value)
+        if previous is not None and _RANGE_GAP_RE.fullmatch(text, previous.end(), m.start()):
+            ranges.append((min(previous_value, value), max(previous_value, value)))
+            # A number closes at most one range: "1-2-3" is (1, 2), not also (2, 3).
+            previous = None
+            continue
+        previous, previous_value = m, value
+    return extracted, percents, ranges
+
+
+def _finding(text: str) -> Dict[str, Any]:
+    extracted, percents, ranges = _scan_numbers(text)
+    kinds = _keyword_kinds(text.lower())
     flags: List[str] = []
     computed: Dict[str, Any] = {}
 
     # Flag suspicious "too precise" or "absolute certainty" patterns
-    lowered = claim.lower()
-    if any(k in lowered for k in ["100%", "guaranteed", "no risk", "always", "never"]):
+    if "absolute" in kinds:
         flags.append("contains_absolute_or_guarantee_language")
 
     # Percent sanity checks
-    percents = []
-    for s in extracted:
-        if "%" in s:
-            try:
-                val = _to_float(s)
-                percents.append(val)
-            except Exception:
-                continue
-
     for p in percents:
         if p < 0 or p > 100:
             flags.append("percent_out_of_range")
 
-    # Detect suspicious ranges like "90-95%" / "10 to 12"
-    range_matches = _RANGE_RE.findall(claim)
-    if range_matches:
-        ranges = []
-        for a, b in range_matches:
-            try:
-                fa, fb = float(a), float(b)
-                lo, hi = min(fa, fb), max(fa, fb)
-                ranges.append((lo, hi))
-            except Exception:
-                continue
-        if ranges:
-            computed["ranges"] = ranges
+    # Suspicious ranges like "90-95%" / "10 to 12"
+    if ranges:
+        computed["ranges"] = ranges
 
     # Heuristic: huge currency amounts mentioned with urgency often correlate with scams
-    if "$" in claim and any(k in lowered for k in ["today", "now", "urgent", "limited time", "within"]):
+    if "$" in text and "urgency" in kinds:
         flags.append("currency_with_urgency_pattern")
 
     # Heuristic numeric suspiciousness score
     # 0.0 clean → 1.0 very suspicious
     score = 0.0
     if flags:
-        score = min(1.0, 0.15 * len(flags) + (0.2 if any("out_of_range" in f for f in flags) else 0.0))
-
-    out = NumericVerifyOutput(
-        claim_text=claim,
-        finding=NumericFinding(
-            extracted_numbers=extracted,
-            flags=flags,
-            computed_checks=computed,
-            score=score,
-        ),
-    )
+        score = min(1.0, 0.15 * len(flags) + (0.2 if "percent_out_of_range" in flags else 0.0))
+
+    return {
+        "extracted_numbers": extracted,
+        "flags": flags,
+        "computed_checks": computed,
+        "score": score,
+    }
+
+
+def _copy_finding(finding: Dict[str, Any]) -> Dict[str, Any]:
+    # Its lists hold strings, floats and tuples, so copying each list makes the result independent.
+    return {
+        "extracted_numbers": list(finding["extracted_numbers"]),
+        "flags": list(finding["flags"]),
+        "computed_checks": {name: list(values) for name, values in finding["computed_checks"].items()},
+        "score": finding["score"],
+    }
+
+
+def numeric_verify_batch(texts: Sequence[str]) -> List[Dict[str, Any]]:
+    """
+    Internal fast path: the same output as numeric_verify for each text
+    (claims, OCR text, captions), without Pydantic validation. Empty texts
+    are allowed; repeated texts are scanned once, and each gets its own copy
+    of the finding.
+    """
+    findings: Dict[str, Dict[str, Any]] = {}
+    results: List[Dict[str, Any]] = []
+    for text in texts:
+        text = text or ""
+        finding = findings.get(text)
+        if finding is None:
+            finding = findings[text] = _finding(text)
+        else:
+            # Nothing is handed out before the loop ends, so the first occurrence is still pristine here.
+            finding = _copy_finding(finding)
+        results.append({"claim_text": text, "finding": finding})
+    return results
+
+
+def numeric_verify(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Tool entrypoint: accepts dict (from Backboard tool call args),
+    validates via Pydantic, returns JSON-serializable dict output.
+    """
+    inp = NumericVerifyInput(**payload)
+    claim = inp.claim_text
+    out = NumericVerifyOutput(claim_text=claim, finding=NumericFinding(**_finding(claim)))
     return out.model_dump()
@@ -0,0 +1,253 @@
+import asyncio
+import heapq
+import itertools
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple
+
+from app.settings import env_float
+
+# Lower runs first.
+INTERACTIVE = 0
+BATCH = 1
+BACKGROUND = 2
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BATCH: "batch", BACKGROUND: "background"}
+
+_priority: ContextVar[int] = ContextVar("search_priority", default=INTERACTIVE)
+
+_MIN_RATE = 0.05
+
+
+@contextmanager
+def search_priority(level: int) -> Iterator[None]:
+    """Searches issued in this context (and tasks it spawns) queue at `level`."""
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> int:
+    return _priority.get()
+
+
+def _header_numbers(value: Optional[str]) -> List[float]:
+    numbers: List[float] = []
+    for part in (value or "").split(","):
+        try:
+            numbers.append(float(part.strip()))
+        except ValueError:
+            pass
+    return numbers
+
+
+def _policy_windows(value: Optional[str]) -> List[Tuple[float, float]]:
+    """'1;w=1, 15000;w=2592000' -> [(1, 1), (15000, 2592000)] as (limit, window seconds)."""
+    windows: List[Tuple[float, float]] = []
+    for part in (value or "").split(","):
+        match = re.match(r"\s*(\d+(?:\.\d+)?)\s*;\s*w\s*=\s*(\d+(?:\.\d+)?)", part)
+        if match:
+            windows.append((float(match.group(1)), float(match.group(2))))
+    return windows
+
+
+class TokenBucketScheduler:
+    """
+    Token bucket with a priority queue in front of it: waiters are granted
+    tokens lowest priority value first, FIFO within a level.
+
+    The refill rate follows the quota the upstream advertises
+    (X-RateLimit-Policy), requests pause until the reported reset when a
+    window is exhausted, and a 429 pauses for Retry-After (or the window
+    reset) with jitter. A 429 without either hint also halves the rate and
+    backs off exponentially; successes restore the rate additively.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: float = 1.0,
+        backoff_base: float = 1.0,
+        backoff_max: float = 30.0,
+    ):
+        self.configured_rate = max(_MIN_RATE, rate)
+        self.rate = self.configured_rate
+        self.burst = max(1.0, burst)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._consecutive_limited = 0
+        self._waiters: List[Tuple[int, int, float, "asyncio.Future[float]"]] = []
+        self._seq = itertools.count()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Any] = {
+            "granted": 0,
+            "timeouts": 0,
+            "rate_limited": 0,
+            "max_queue_depth": 0,
+            "wait_seconds_total": 0.0,
+            "wait_seconds_max": 0.0,
+        }
+        self._granted_by_priority: Dict[str, int] = {}
+
+    def _bind(self, loop: asyncio.AbstractEventLoop) -> None:
+        # Waiters and timers belong to one loop; scripts may run several in turn.
+        if self._loop is not loop:
+            self._loop = loop
+            self._waiters = []
+            self._timer = None
+
+    def _refill(self, now: float) -> None:
+        if now <= self._updated:
+            return
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _depth(self) -> int:
+        return sum(1 for _, _, _, future in self._waiters if not future.done())
+
+    def _pump(self) -> None:
+        self._timer = None
+        now = time.monotonic()
+        self._refill(now)
+        delay = 0.0
+        while self._waiters:
+            priority, _, enqueued_at, future = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+            if now < self._paused_until:
+                delay = self._paused_until - now
+                break
+            if self._tokens < 1.0:
+                delay = (1.0 - self._tokens) / self.rate
+                break
+            heapq.heappop(self._waiters)
+            self._tokens -= 1.0
+            waited = now - enqueued_at
+            with self._lock:
+                self._stats["granted"] += 1
+                self._stats["wait_seconds_total"] += waited
+                self._stats["wait_seconds_max"] = max(self._stats["wait_seconds_max"], waited)
+                name = PRIORITY_NAMES.get(priority, str(priority))
+                self._granted_by_priority[name] = self._granted_by_priority.get(name, 0) + 1
+            future.set_result(waited)
+        else:
+            return
+        if self._loop is not None:
+            self._timer = self._loop.call_later(max(0.001, delay), self._pump)
+
+    async def acquire(self, priority: Optional[int] = None, timeout: Optional[float] = None) -> float:
+        """Waits for a token; returns seconds spent queued. Raises asyncio.TimeoutError after `timeout`."""
+        loop = asyncio.get_running_loop()
+        self._bind(loop)
+        level = current_priority() if priority is None else priority
+        future: "asyncio.Future[float]" = loop.create_future()
+        heapq.heappush(self._waiters, (level, next(self._seq), time.monotonic(), future))
+        with self._lock:
+            self._stats["max_queue_depth"] = max(self._stats["max_queue_depth"], self._depth())
+        if self._timer is None:
+            self._pump()
+        try:
+            return await asyncio.wait_for(future, timeout) if timeout else await future
+        except asyncio.TimeoutError:
+            with self._lock:
+                self._stats["timeouts"] += 1
+            raise
+
+    def _pause(self, seconds: float) -> None:
+        now = time.monotonic()
+        self._paused_until = max(self._paused_until, now + max(0.0, seconds))
+        # Exactly one probe when the pause ends; the bucket refills from there.
+        self._tokens = 1.0
+        self._updated = self._paused_until
+        if self._timer is not None:
+            # Re-arm for the new pause end.
+            self._timer.cancel()
+            self._timer = None
+        if self._loop is not None and self._waiters:
+            self._timer = self._loop.call_later(max(0.001, self._paused_until - now), self._pump)
+
+    def observe(self, status_code: int, headers: Mapping[str, str]) -> None:
+        """Feed every upstream response back so the bucket tracks the real quota."""
+        windows = _policy_windows(headers.get("x-ratelimit-policy"))
+        if windows:
+            limit, window = min(windows, key=lambda item: item[1])
+            if window > 0 and limit > 0:
+                self.configured_rate = max(_MIN_RATE, limit / window)
+                self.burst = max(1.0, limit)
+
+        remaining = _header_numbers(headers.get("x-ratelimit-remaining"))
+        reset = _header_numbers(headers.get("x-ratelimit-reset"))
+        exhausted = [wait for left, wait in zip(remaining, reset) if left <= 0]
+        if exhausted and status_code != 429:
+            self._pause(min(max(exhausted), self.backoff_max))
+
+        if status_code == 429:
+            self._consecutive_limited += 1
+            retry_after = _header_numbers(headers.get("retry-after"))
+            if retry_after:
+                delay = retry_after[0] + random.uniform(0, 0.25 * max(retry_after[0], self.backoff_base))
+            elif exhausted:
+                delay = max(exhausted) + random.uniform(0, 0.25 * self.backoff_base)
+            else:
+                # No hint from the server: our rate is probably wrong, so slow down too.
+                self.rate = max(_MIN_RATE, self.rate * 0.5)
+                ceiling = self.backoff_base * (2 ** (self._consecutive_limited - 1))
+                # Equal jitter: keeps a floor while de-synchronising retries.
+                delay = ceiling / 2 + random.uniform(0, ceiling / 2)
+            self._pause(min(delay, self.backoff_max))
+            with self._lock:
+                self._stats["rate_limited"] += 1
+        else:
+            self._consecutive_limited = 0
+            self.rate = min(self.configured_rate, self.rate + self.configured_rate * 0.25)
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+            stats["granted_by_priority"] = dict(self._granted_by_priority)
+        depth_by_priority: Dict[str, int] = {}
+        for priority, _, _, future in list(self._waiters):
+            if not future.done():
+                name = PRIORITY_NAMES.get(priority, str(priority))
+                depth_by_priority[name] = depth_by_priority.get(name, 0) + 1
+        stats["queue_depth"] = sum(depth_by_priority.values())
+        stats["queue_depth_by_priority"] = depth_by_priority
+        stats["wait_seconds_avg"] = round(stats["wait_seconds_total"] / stats["granted"], 4) if stats["granted"] else 0.0
+        stats["wait_seconds_total"] = round(stats["wait_seconds_total"], 4)
+        stats["wait_seconds_max"] = round(stats["wait_seconds_max"], 4)
+        stats["rate_per_second"] = round(self.rate, 4)
+        stats["quota_rate_per_second"] = round(self.configured_rate, 4)
+        stats["paused_for_seconds"] = round(max(0.0, self._paused_until - now), 3)
+        return stats
+
+
+_limiter: Optional[TokenBucketScheduler] = None
+_limiter_lock = threading.Lock()
+
+
+def get_search_rate_limiter() -> TokenBucketScheduler:
+    """Process-wide Brave limiter; BRAVE_RATE_PER_SECOND is the starting rate until headers say otherwise."""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = TokenBucketScheduler(
+                rate=env_float("BRAVE_RATE_PER_SECOND", 1.0),
+                burst=env_float("BRAVE_BURST", 1.0),
+                backoff_base=env_float("BRAVE_BACKOFF_BASE_SECONDS", 1.0),
+                backoff_max=env_float("BRAVE_BACKOFF_MAX_SECONDS", 30.0),
+            )
+        return _limiter
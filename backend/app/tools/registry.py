@@ -1,4 +1,5 @@
-from typing import Any, Awaitable, Callable, Dict, List, Type
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Type
+from app.agents.assistant_registry import AssistantRegistry
 from app.tools.numeric_verify import numeric_verify
 from app.tools.web_search_tool import WebSearchTool
 from app.tools.credibility_tool import CredibilityTool
@@ -9,7 +10,6 @@ ToolFn = Callable[[Dict[str,Any]], Awaitable[Dict[str, Any]]]
 
 
 def get_tool_definitions():
-    print("Getting tool definitions...")
     tools : List[Dict[str, Any]] = [
         {
             "type": "function",
@@ -55,11 +55,9 @@ def get_tool_definitions():
 
 
     ]
-
-    print(f"Defined {len(tools)} tools.")
     return tools
 
-def build_tool_registry(client:BackboardClient) -> Dict[str, ToolFn]:
+def build_tool_registry(client:BackboardClient, assistants: Optional[AssistantRegistry] = None) -> Dict[str, ToolFn]:
     registry: Dict[str, ToolFn] = {}
 
     async def _numeric(args:Dict[str, Any]) -> Dict[str, Any]:
@@ -67,13 +65,13 @@ def build_tool_registry(client:BackboardClient) -> Dict[str, ToolFn]:
     
     registry["numeric_verify"] = _numeric
 
-    search_tool = WebSearchTool(client)
+    search_tool = WebSearchTool(client, assistants=assistants)
     async def _web_search(args:Dict[str, Any]) -> Dict[str, Any]:
         return await search_tool.run(args)
     
     registry["web_search_llm"] = _web_search
 
-    cred_tool = CredibilityTool(client)
+    cred_tool = CredibilityTool(client, assistants=assistants)
 
     async def _credibility(args:Dict[str, Any]) -> Dict[str, Any]:
         return await cred_tool.run(args)
@@ -82,6 +80,12 @@ def build_tool_registry(client:BackboardClient) -> Dict[str, ToolFn]:
 
     return registry
 
+
+async def warm_tool_assistants(client: BackboardClient, assistants: AssistantRegistry) -> None:
+    """Create (or look up) the LLM-backed tools' assistants ahead of the first request."""
+    for tool in (WebSearchTool(client, assistants=assistants), CredibilityTool(client, assistants=assistants)):
+        await tool.ensure_assistant()
+
 # def get_tool_registry() -> Dict[str, ToolFn]:
 #     registry: Dict[str, ToolFn] = {
 #         "numeric_verify": numeric_verify
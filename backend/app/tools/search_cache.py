@@ -0,0 +1,182 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.settings import CACHE_DIR, env_bool, env_float, env_int, env_str
+
+SearchResults = List[Dict[str, str]]
+
+FRESH = "fresh"
+STALE = "stale"
+EXPIRED = "expired"
+
+
+def normalize_query(query: str) -> str:
+    """Case, width and whitespace differences don't change what Brave returns."""
+    return " ".join(unicodedata.normalize("NFKC", query or "").casefold().split())
+
+
+def search_cache_key(backend: str, query: str, top_k: int) -> str:
+    return f"{backend}:{int(top_k)}:{normalize_query(query)}"
+
+
+class SearchResultCache:
+    """
+    Search results keyed by backend + top_k + normalised query, in an
+    in-memory LRU in front of a SQLite store.
+
+    An entry is fresh for `ttl_seconds`. For a further `stale_seconds` it is
+    served as-is while the caller refreshes it in the background
+    (stale-while-revalidate). Anything younger than `max_age_seconds` is still
+    kept as a fallback for when the upstream is rate limited or failing.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str],
+        ttl_seconds: float = 6 * 3600,
+        stale_seconds: float = 24 * 3600,
+        max_age_seconds: float = 7 * 24 * 3600,
+        memory_entries: int = 1024,
+        prune_every: int = 64,
+    ):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self.max_age_seconds = max(max_age_seconds, ttl_seconds + stale_seconds)
+        self.memory_entries = max(1, memory_entries)
+        self.prune_every = max(1, prune_every)
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[SearchResults, float]]" = OrderedDict()
+        self._writes_since_prune = 0
+        self._stats: Dict[str, int] = {
+            "fresh_hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "stale_on_error": 0,
+            "upstream_calls": 0,
+            "upstream_errors": 0,
+            "rate_limited": 0,
+            "revalidations": 0,
+            "writes": 0,
+            "evictions": 0,
+        }
+
+        self._db: Optional[sqlite3.Connection] = None
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS search_results ("
+                "key TEXT PRIMARY KEY, results TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS search_results_created ON search_results (created_at)"
+            )
+            self._db.commit()
+
+    def freshness(self, created_at: float, now: Optional[float] = None) -> str:
+        age = (now if now is not None else time.time()) - created_at
+        if age <= self.ttl_seconds:
+            return FRESH
+        if age <= self.ttl_seconds + self.stale_seconds:
+            return STALE
+        return EXPIRED
+
+    def _remember(self, key: str, results: SearchResults, created_at: float) -> None:
+        self._entries[key] = (results, created_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.memory_entries:
+            self._entries.popitem(last=False)
+
+    def lookup(self, key: str) -> Optional[Tuple[SearchResults, float]]:
+        """(results, created_at) for any entry still within max_age_seconds; no counters touched."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if now - entry[1] <= self.max_age_seconds:
+                    self._entries.move_to_end(key)
+                    return entry
+                del self._entries[key]
+
+            if self._db is None:
+                return None
+            row = self._db.execute(
+                "SELECT results, created_at FROM search_results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.max_age_seconds:
+                return None
+            try:
+                results = json.loads(row[0])
+            except ValueError:
+                return None
+            self._remember(key, results, row[1])
+            return results, row[1]
+
+    def put(self, key: str, results: SearchResults) -> None:
+        now = time.time()
+        with self._lock:
+            self._remember(key, results, now)
+            self._stats["writes"] += 1
+            if self._db is None:
+                return
+            self._db.execute(
+                "INSERT OR REPLACE INTO search_results (key, results, created_at) VALUES (?, ?, ?)",
+                (key, json.dumps(results, ensure_ascii=False), now),
+            )
+            self._db.commit()
+            self._writes_since_prune += 1
+            if self._writes_since_prune >= self.prune_every:
+                self._writes_since_prune = 0
+                removed = self._db.execute(
+                    "DELETE FROM search_results WHERE created_at < ?", (now - self.max_age_seconds,)
+                ).rowcount
+                self._db.commit()
+                self._stats["evictions"] += max(0, removed)
+
+    def count(self, counter: str, amount: int = 1) -> None:
+        with self._lock:
+            self._stats[counter] = self._stats.get(counter, 0) + amount
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+            stats["memory_entries"] = len(self._entries)
+            if self._db is not None:
+                stats["disk_entries"] = self._db.execute(
+                    "SELECT COUNT(*) FROM search_results"
+                ).fetchone()[0]
+        lookups = stats["fresh_hits"] + stats["stale_hits"] + stats["misses"]
+        served = stats["fresh_hits"] + stats["stale_hits"]
+        stats["hit_ratio"] = round(served / lookups, 4) if lookups else 0.0
+        return stats
+
+
+_cache: Optional[SearchResultCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_search_cache() -> Optional[SearchResultCache]:
+    """Process-wide cache configured from SEARCH_CACHE_* env vars; None when disabled."""
+    global _cache
+    if not env_bool("SEARCH_CACHE_ENABLED", True):
+        return None
+    with _cache_lock:
+        if _cache is None:
+            path = env_str("SEARCH_CACHE_PATH", os.path.join(CACHE_DIR, "search_cache.sqlite3"))
+            _cache = SearchResultCache(
+                path=None if path == ":memory:" else path,
+                ttl_seconds=env_float("SEARCH_CACHE_TTL_SECONDS", 6 * 3600),
+                stale_seconds=env_float("SEARCH_CACHE_STALE_SECONDS", 24 * 3600),
+                max_age_seconds=env_float("SEARCH_CACHE_MAX_AGE_SECONDS", 7 * 24 * 3600),
+                memory_entries=env_int("SEARCH_CACHE_MEMORY_ENTRIES", 1024),
+            )
+        return _cache
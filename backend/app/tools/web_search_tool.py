@@ -1,18 +1,30 @@
+import asyncio
 import json
 import re
-from typing import Any, Dict, List, Optional
-import requests
+from typing import Any, Dict, List, Optional, Sequence
 import os
+import logging
+
 import httpx
 from backboard import BackboardClient
+from app.agents.assistant_registry import AssistantRegistry
 from app.agents.prompts import WEB_SEARCH_TOOL_PROMPT
+from app.http_client import get_sync_client, request_with_retries
+from app.events import emit
+from app.metrics import span
+from app.settings import env_float, env_int, env_str
+from app.tools.rate_limiter import BACKGROUND, get_search_rate_limiter, search_priority
+from app.tools.search_cache import EXPIRED, FRESH, STALE, SearchResultCache, get_search_cache, search_cache_key
+from app.tools.urls import canonical_url
+
+logger = logging.getLogger(__name__)
 
 
 _DDG_URL = "https://duckduckgo.com/html/"
 _UA = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) Agent/1.0"
 
 def ddg_search(query:str, top_k:int=5):
-    r = requests.post(_DDG_URL, data={
+    r = get_sync_client().post(_DDG_URL, data={
         "q" : query
     }, headers={
         "User-Agent": _UA
@@ -44,7 +56,12 @@ def ddg_search(query:str, top_k:int=5):
 
 BRAVE_SEARCH_URL = "https://api.search.brave.com/res/v1/web/search"
 
-async def brave_search(query: str, top_k: int = 5) -> List[Dict[str, str]]:
+
+class SearchRateLimitedError(RuntimeError):
+    """The search backend answered 429."""
+
+
+async def _brave_fetch(query: str, top_k: int) -> List[Dict[str, str]]:
     api_key = os.getenv("BRAVE_API_KEY")
     if not api_key:
         raise RuntimeError("Missing BRAVE_API_KEY env var")
@@ -64,13 +81,25 @@ async def brave_search(query: str, top_k: int = 5) -> List[Dict[str, str]]:
         # "freshness": "week",  # day|week|month|year
     }
 
-    async with httpx.AsyncClient(timeout=12.0) as client:
-        r = await client.get(BRAVE_SEARCH_URL, headers=headers, params=params)
-
-    print("Brave status:", r.status_code, "query:", query)
-    # Don’t crash your whole pipeline on rate limit; return empty gracefully
-    if r.status_code == 429:
-        return []
+    # Every request takes a token from the shared Brave scheduler; a 429 backs
+    # the scheduler off and the query is retried instead of losing its evidence.
+    limiter = get_search_rate_limiter()
+    search_url = env_str("BRAVE_SEARCH_URL", BRAVE_SEARCH_URL)
+    retries = max(0, env_int("BRAVE_MAX_RETRIES_ON_429", 3))
+    max_wait = env_float("BRAVE_MAX_QUEUE_WAIT_SECONDS", 60.0)
+    for _ in range(retries + 1):
+        try:
+            await limiter.acquire(timeout=max_wait)
+        except asyncio.TimeoutError:
+            raise SearchRateLimitedError(f"Brave queue wait exceeded {max_wait}s for query: {query}")
+        with span("brave_request"):
+            r = await request_with_retries("GET", search_url, headers=headers, params=params, timeout=12.0)
+        limiter.observe(r.status_code, r.headers)
+        logger.debug("Brave status: %s query: %s", r.status_code, query)
+        if r.status_code != 429:
+            break
+    else:
+        raise SearchRateLimitedError(f"Brave rate limited query: {query}")
 
     r.raise_for_status()
     data = r.json()
@@ -85,24 +114,145 @@ async def brave_search(query: str, top_k: int = 5) -> List[Dict[str, str]]:
             items.append({"url": url, "title": title, "snippet": snippet})
     return items
 
+
+# One upstream request per cache key at a time, shared by misses and
+# background revalidations.
+_inflight: Dict[str, "asyncio.Task[List[Dict[str, str]]]"] = {}
+
+
+def _running(key: str) -> Optional["asyncio.Task[List[Dict[str, str]]]"]:
+    task = _inflight.get(key)
+    if task is not None and not task.done() and task.get_loop() is asyncio.get_running_loop():
+        return task
+    return None
+
+
+def _upstream(cache: SearchResultCache, key: str, query: str, top_k: int) -> "asyncio.Task[List[Dict[str, str]]]":
+    task = _running(key)
+    if task is not None:
+        return task
+
+    async def _fetch() -> List[Dict[str, str]]:
+        cache.count("upstream_calls")
+        try:
+            results = await _brave_fetch(query, top_k)
+        except SearchRateLimitedError:
+            cache.count("rate_limited")
+            raise
+        except httpx.HTTPError:
+            cache.count("upstream_errors")
+            raise
+        cache.put(key, results)
+        return results
+
+    task = asyncio.get_running_loop().create_task(_fetch())
+    _inflight[key] = task
+    task.add_done_callback(lambda done: _inflight.pop(key, None) if _inflight.get(key) is done else None)
+    return task
+
+
+def _revalidate(cache: SearchResultCache, key: str, query: str, top_k: int) -> None:
+    if _running(key) is not None:
+        return
+    cache.count("revalidations")
+    # Refreshes are never waited on, so they queue behind live requests.
+    with search_priority(BACKGROUND):
+        task = _upstream(cache, key, query, top_k)
+    # Nobody awaits a background refresh; retrieve its error so it isn't reported as unhandled.
+    task.add_done_callback(lambda done: done.cancelled() or done.exception())
+
+
+async def brave_search(query: str, top_k: int = 5) -> List[Dict[str, str]]:
+    """
+    Brave web search behind the search-result cache. Fresh entries are served
+    directly, stale ones are served while a background refresh runs, and when
+    Brave is rate limited or failing any retained entry beats returning nothing.
+    """
+    cache = get_search_cache()
+    if cache is None:
+        try:
+            return await _brave_fetch(query, top_k)
+        except SearchRateLimitedError:
+            # Don’t crash the whole pipeline on rate limit; return empty gracefully
+            return []
+
+    key = search_cache_key("brave", query, top_k)
+    entry = cache.lookup(key)
+    state = cache.freshness(entry[1]) if entry is not None else EXPIRED
+    if entry is not None and state == FRESH:
+        cache.count("fresh_hits")
+        return entry[0]
+    if entry is not None and state == STALE:
+        cache.count("stale_hits")
+        _revalidate(cache, key, query, top_k)
+        return entry[0]
+
+    cache.count("misses")
+    try:
+        return await asyncio.shield(_upstream(cache, key, query, top_k))
+    except (SearchRateLimitedError, httpx.HTTPError) as e:
+        if entry is not None:
+            cache.count("stale_on_error")
+            logger.info("Serving stale search results for %r: %s", query, e)
+            return entry[0]
+        if isinstance(e, SearchRateLimitedError):
+            return []
+        raise
+
+
+def merge_search_results(result_lists: Sequence[List[Dict[str, str]]]) -> List[Dict[str, str]]:
+    """
+    Flattens per-query results in query order, keeping the first hit for each
+    canonical URL so tracking-parameter or `www.` variants collapse into one.
+    """
+    merged: Dict[str, Dict[str, str]] = {}
+    for items in result_lists:
+        for item in items:
+            merged.setdefault(canonical_url(item["url"]), item)
+    return list(merged.values())
+
+
+async def search_queries(
+    queries: Sequence[str], top_k: int, concurrency: int
+) -> List[List[Dict[str, str]]]:
+    """Runs the queries concurrently (at most `concurrency` at once); a failed query yields []."""
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def _one(query: str) -> List[Dict[str, str]]:
+        async with semaphore:
+            try:
+                with span("search_query"):
+                    return await brave_search(query, top_k=top_k)
+            except httpx.HTTPError as e:
+                logger.warning("Search failed for query %r: %s", query, e)
+                return []
+
+    return list(await asyncio.gather(*(_one(q) for q in queries)))
+
+
 class WebSearchTool:
-    def __init__(self, client: BackboardClient, model_name:str = "gpt-4o"):
+    ASSISTANT_NAME = "WebSearchTool"
+
+    def __init__(
+        self,
+        client: BackboardClient,
+        model_name: str = "gpt-4o",
+        assistants: Optional[AssistantRegistry] = None,
+    ):
         self.client = client
         self.model_name = model_name
+        self.assistants = assistants or AssistantRegistry(client)
         self.assistant_id : Optional[str] = None
+        self.max_queries = max(1, env_int("WEB_SEARCH_MAX_QUERIES", 2))
+        self.search_concurrency = max(1, env_int("WEB_SEARCH_CONCURRENCY", 4))
 
 
     async def ensure_assistant(self):
-        if self.assistant_id:
-            return self.assistant_id
-        
-        a = await self.client.create_assistant(
-            name="WebSearchTool",
+        self.assistant_id = await self.assistants.ensure(
+            name=self.ASSISTANT_NAME,
             description=WEB_SEARCH_TOOL_PROMPT,
-            tools=[]
+            tools=[],
         )
-
-        self.assistant_id = a.assistant_id
         return self.assistant_id
     
     async def run(self, payload: Dict[str, Any]) -> Dict[str, Any]:
@@ -112,58 +262,66 @@ class WebSearchTool:
         
         top_k = payload.get("top_k",5)
         prior_queries = payload.get("prior_queries", []) or []
-        assistant_id = await self.ensure_assistant()
-        thread = await self.client.create_thread(assistant_id=assistant_id)
-
-        resp1 = await self.client.add_message(
-            thread_id=thread.thread_id,
-            content= json.dumps({
-                "claim_text": claim_text,
-                    "prior_queries": prior_queries,
-                    "search_results": [],
-            }),
-            stream=False,
-            memory="off",
-            model_name=self.model_name
+        thread = await self.assistants.create_thread(
+            name=self.ASSISTANT_NAME,
+            description=WEB_SEARCH_TOOL_PROMPT,
+            tools=[],
         )
 
-        print(f"Planning response: {resp1}")
+        with span("search_llm_planning"):
+            resp1 = await self.client.add_message(
+                thread_id=thread.thread_id,
+                content= json.dumps({
+                    "claim_text": claim_text,
+                        "prior_queries": prior_queries,
+                        "search_results": [],
+                }),
+                stream=False,
+                memory="off",
+                model_name=self.model_name
+            )
+
+        logger.debug("Planning response: %s", resp1)
         plan = json.loads(resp1.content) if isinstance(resp1.content, str) else resp1.content
-        print(f"Parsed plan: {plan}")
         queries = plan.get("queries", [])
         if not queries:
             # fallback query
             queries = [claim_text[:120]]
 
-        print(f"Generated queries: {queries}")
-        
-        queries = queries[:2]
-        merged:Dict[str, Dict[str,str]] = {}
+        logger.debug("Generated queries: %s", queries)
+
+        # Same query twice (modulo case/spacing) would only burn rate limit.
+        unique: Dict[str, str] = {}
         for q in queries:
-            for item in await brave_search(q, top_k=top_k):
-                merged[item["url"]] = item
-        
-        results = list(merged.values())
-
-        resp2 = await self.client.add_message(
-            thread_id=thread.thread_id,
-            content=json.dumps({
-                "claim_text": claim_text,
-                    "prior_queries": prior_queries,
-                    "search_results": results,
-            }),
-            stream=False,
-            memory="off",
-            model_name=self.model_name
+            if isinstance(q, str) and q.strip():
+                unique.setdefault(" ".join(q.lower().split()), q.strip())
+        queries = list(unique.values())[:self.max_queries] or [claim_text[:120]]
+        await emit("queries_planned", {"claim_text": claim_text, "queries": queries})
+
+        results = merge_search_results(
+            await search_queries(queries, top_k=top_k, concurrency=self.search_concurrency)
         )
 
-        print(f"Selection response: {resp2}")
+        with span("search_llm_selection"):
+            resp2 = await self.client.add_message(
+                thread_id=thread.thread_id,
+                content=json.dumps({
+                    "claim_text": claim_text,
+                        "prior_queries": prior_queries,
+                        "search_results": results,
+                }),
+                stream=False,
+                memory="off",
+                model_name=self.model_name
+            )
+
+        logger.debug("Selection response: %s", resp2)
 
         selection = json.loads(resp2.content) if isinstance(resp2.content, str) else resp2.content
 
         selection["queries"] = queries
         selection.setdefault("notes", [])
         selection["notes"].append(f"retrieved_results={len(results)}")
-        print(f"Final selection: {selection}")
+        logger.debug("Final selection: %s", selection)
         return selection
 
@@ -0,0 +1,143 @@
+import asyncio
+import hashlib
+import json
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from pydantic import BaseModel
+
+from app.settings import env_bool, env_float, env_int
+from app.tools.urls import canonical_url
+
+
+def _normalize_text(text: Optional[str]) -> str:
+    return " ".join(unicodedata.normalize("NFKC", text or "").split())
+
+
+def verdict_key(url: str, alt_text: str = "", caption: str = "", max_images: int = 3) -> str:
+    """
+    Requests that would produce the same analysis share a key: the canonical
+    post URL plus the claim text and caption with whitespace/width folded.
+    Per-request fields (request_id, metadata) are deliberately left out.
+    """
+    payload = json.dumps(
+        [canonical_url(url), _normalize_text(alt_text), _normalize_text(caption), int(max_images)],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class VerdictCache:
+    """
+    Bounded TTL cache of finished analyses, with single-flight coalescing:
+    concurrent callers with the same key await one shared computation.
+
+    The computation runs as its own task, so a caller that disconnects
+    doesn't cancel it for the others. Failures are passed to every waiter
+    and never cached.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 900.0):
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[BaseModel, float]]" = OrderedDict()
+        self._inflight: Dict[str, "asyncio.Task[BaseModel]"] = {}
+        self._stats: Dict[str, int] = {
+            "hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "errors": 0,
+            "evictions": 0,
+        }
+
+    def get(self, key: str) -> Optional[BaseModel]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if now - entry[1] > self.ttl_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key: str, value: BaseModel) -> None:
+        with self._lock:
+            self._entries[key] = (value, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            self._stats[counter] += 1
+
+    async def run(self, key: str, compute: Callable[[], Awaitable[BaseModel]]) -> BaseModel:
+        cached = self.get(key)
+        if cached is not None:
+            self._count("hits")
+            # Copies keep callers from mutating the shared cached object.
+            return cached.model_copy(deep=True)
+
+        task = self._inflight.get(key)
+        if task is not None and not task.done() and task.get_loop() is asyncio.get_running_loop():
+            self._count("coalesced")
+        else:
+            self._count("misses")
+            task = asyncio.get_running_loop().create_task(self._compute(key, compute))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._inflight.pop(key, None) if self._inflight.get(key) is done else None)
+        result = await asyncio.shield(task)
+        return result.model_copy(deep=True)
+
+    async def _compute(self, key: str, compute: Callable[[], Awaitable[BaseModel]]) -> BaseModel:
+        try:
+            result = await compute()
+        except Exception:
+            self._count("errors")
+            raise
+        self.put(key, result)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+            stats["entries"] = len(self._entries)
+            stats["inflight"] = len(self._inflight)
+        requests = stats["hits"] + stats["misses"] + stats["coalesced"]
+        stats["hit_ratio"] = round((stats["hits"] + stats["coalesced"]) / requests, 4) if requests else 0.0
+        return stats
+
+
+def image_verdict_key(image_id: str, alt_text: str = "", caption: str = "") -> str:
+    """
+    Key for reusing a verdict across reposts: a single-image post's canonical
+    image id (its near-duplicate group, see app.ocr.phash) plus the same
+    normalized text, whatever URL either copy was posted at.
+    """
+    payload = json.dumps(["image", image_id, _normalize_text(alt_text), _normalize_text(caption)], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+_cache: Optional[VerdictCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_verdict_cache() -> Optional[VerdictCache]:
+    """Process-wide cache configured from VERDICT_CACHE_* env vars; None when disabled."""
+    global _cache
+    if not env_bool("VERDICT_CACHE_ENABLED", True):
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = VerdictCache(
+                max_entries=env_int("VERDICT_CACHE_MAX_ENTRIES", 1024),
+                ttl_seconds=env_float("VERDICT_CACHE_TTL_SECONDS", 900.0),
+            )
+        return _cache
@@ -0,0 +1,210 @@
+"""
+Local Backboard-compatible API server for load tests.
+
+Serves the endpoints the SDK calls for create_assistant, create_thread,
+add_message and submit_tool_outputs, answering from a ScriptedBackboard
+(benchmarks/stubs.py), with per-operation latency distributions and
+injected error modes. Point the app at it with
+BACKBOARD_BASE_URL=http://127.0.0.1:8900; GET /stats reports calls by
+operation and status.
+
+    python -m benchmarks.backboard_server --port 8900 \
+        --latency add_message=lognormal:0.8:0.5 --latency '*=fixed:0.02' \
+        --error 429=0.02 --error 500=0.01 --error timeout=0.005
+"""
+import argparse
+import asyncio
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from benchmarks.stubs import Latency, ScriptedBackboard
+
+OPERATIONS = ("create_assistant", "create_thread", "add_message", "submit_tool_outputs")
+
+
+@dataclass
+class FaultProfile:
+    """
+    `latency` maps an operation (or "*") to its delay. `errors` maps an HTTP
+    status or "timeout" to the fraction of calls that fail that way; a
+    timeout holds the request for `hang_seconds` before answering 504.
+    """
+
+    latency: Dict[str, Latency] = field(default_factory=dict)
+    errors: Dict[str, float] = field(default_factory=dict)
+    hang_seconds: float = 120.0
+    retry_after_seconds: float = 1.0
+
+    def delay_for(self, operation: str) -> Latency:
+        return self.latency.get(operation) or self.latency.get("*") or Latency()
+
+
+def create_app(backboard: ScriptedBackboard, faults: FaultProfile, seed: int = 0) -> FastAPI:
+    app = FastAPI(title="Backboard stand-in")
+    rng = random.Random(seed)
+    counts: Dict[str, Dict[str, int]] = {}
+    started = time.monotonic()
+
+    def _count(operation: str, status: int) -> None:
+        by_status = counts.setdefault(operation, {})
+        by_status[str(status)] = by_status.get(str(status), 0) + 1
+
+    def _error(operation: str, status: int, detail: str, headers: Optional[Dict[str, str]] = None) -> JSONResponse:
+        _count(operation, status)
+        return JSONResponse({"detail": detail}, status_code=status, headers=headers)
+
+    async def _inject(operation: str, request: Request) -> Optional[JSONResponse]:
+        """Latency first, then at most one injected failure; None means answer normally."""
+        if not request.headers.get("x-api-key"):
+            return _error(operation, 401, "Missing X-API-Key")
+        await asyncio.sleep(faults.delay_for(operation).sample(rng))
+        roll = rng.random()
+        for mode, rate in faults.errors.items():
+            if roll >= rate:
+                roll -= rate
+                continue
+            if mode == "timeout":
+                await asyncio.sleep(faults.hang_seconds)
+                return _error(operation, 504, "Injected timeout")
+            status = int(mode)
+            headers = {"Retry-After": f"{faults.retry_after_seconds:g}"} if status == 429 else None
+            return _error(operation, status, f"Injected {status}", headers)
+        return None
+
+    def _ok(operation: str, payload: Dict[str, Any]) -> JSONResponse:
+        _count(operation, 200)
+        return JSONResponse(payload)
+
+    @app.post("/assistants")
+    async def create_assistant(request: Request):
+        failure = await _inject("create_assistant", request)
+        if failure:
+            return failure
+        body = await request.json()
+        if not body.get("name"):
+            return _error("create_assistant", 400, "name is required")
+        return _ok("create_assistant", backboard.create_assistant(body["name"], body.get("description") or ""))
+
+    @app.post("/assistants/{assistant_id}/threads")
+    async def create_thread(assistant_id: str, request: Request):
+        failure = await _inject("create_thread", request)
+        if failure:
+            return failure
+        try:
+            return _ok("create_thread", backboard.create_thread(assistant_id))
+        except KeyError:
+            return _error("create_thread", 404, f"Assistant {assistant_id} not found")
+
+    @app.post("/threads/{thread_id}/messages")
+    async def add_message(thread_id: str, request: Request):
+        failure = await _inject("add_message", request)
+        if failure:
+            return failure
+        # The SDK sends url-encoded form fields when no files are attached.
+        if not request.headers.get("content-type", "").startswith("application/x-www-form-urlencoded"):
+            return _error("add_message", 400, "Only form-encoded messages without files are supported")
+        form = parse_qs((await request.body()).decode("utf-8"), keep_blank_values=True)
+        if (form.get("stream") or ["false"])[0] == "true":
+            return _error("add_message", 400, "Streaming is not supported by the stand-in")
+        content = (form.get("content") or [""])[0]
+        try:
+            return _ok("add_message", backboard.add_message(thread_id, content))
+        except KeyError:
+            return _error("add_message", 404, f"Thread {thread_id} not found")
+        except ValueError as e:
+            return _error("add_message", 400, f"Unparseable content: {e}")
+
+    @app.post("/threads/{thread_id}/runs/{run_id}/submit-tool-outputs")
+    async def submit_tool_outputs(thread_id: str, run_id: str, request: Request):
+        failure = await _inject("submit_tool_outputs", request)
+        if failure:
+            return failure
+        body = await request.json()
+        try:
+            return _ok("submit_tool_outputs", backboard.submit_tool_outputs(thread_id, run_id, body.get("tool_outputs") or []))
+        except KeyError:
+            return _error("submit_tool_outputs", 404, f"Run {run_id} not found")
+
+    @app.get("/stats")
+    async def stats():
+        uptime = time.monotonic() - started
+        total = sum(sum(by_status.values()) for by_status in counts.values())
+        return {
+            "uptime_seconds": round(uptime, 3),
+            "requests": total,
+            "requests_per_minute": round(total / uptime * 60, 1) if uptime else 0.0,
+            "by_operation": counts,
+        }
+
+    return app
+
+
+def start_in_thread(app: FastAPI, host: str = "127.0.0.1", port: int = 0) -> Tuple[uvicorn.Server, str]:
+    """Runs `app` on a background thread; returns the server (set should_exit to stop) and its base URL."""
+    server = uvicorn.Server(uvicorn.Config(app, host=host, port=port, log_level="warning", access_log=False))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError("Backboard stand-in failed to start")
+        time.sleep(0.01)
+    bound_port = server.servers[0].sockets[0].getsockname()[1]
+    return server, f"http://{host}:{bound_port}"
+
+
+def _key_value(value: str) -> Tuple[str, str]:
+    key, sep, rest = value.partition("=")
+    if not sep:
+        raise argparse.ArgumentTypeError(f"expected KEY=VALUE, got {value!r}")
+    return key.strip(), rest.strip()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument(
+        "--latency", type=_key_value, action="append", default=[],
+        help="OPERATION=SPEC, e.g. add_message=lognormal:0.8:0.5 or '*=0.05' (see Latency.parse)",
+    )
+    parser.add_argument(
+        "--error", type=_key_value, action="append", default=[],
+        help="STATUS=RATE or timeout=RATE, e.g. 429=0.02",
+    )
+    parser.add_argument("--hang-seconds", type=float, default=120.0)
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After sent with injected 429s")
+    parser.add_argument("--script", help="JSON file overriding stubs.DEFAULT_SCRIPT")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    latency: Dict[str, Latency] = {}
+    for operation, spec in args.latency:
+        if operation != "*" and operation not in OPERATIONS:
+            parser.error(f"unknown operation {operation!r}; expected one of {', '.join(OPERATIONS)} or *")
+        latency[operation] = Latency.parse(spec)
+    errors = {mode: float(rate) for mode, rate in args.error}
+    for mode in errors:
+        if mode != "timeout" and not mode.isdigit():
+            parser.error(f"unknown error mode {mode!r}; expected an HTTP status or timeout")
+
+    script = None
+    if args.script:
+        with open(args.script, "r", encoding="utf-8") as fh:
+            script = json.load(fh)
+
+    faults = FaultProfile(latency, errors, args.hang_seconds, args.retry_after)
+    app = create_app(ScriptedBackboard(script), faults, seed=args.seed)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning", access_log=False)
+
+
+if __name__ == "__main__":
+    main()
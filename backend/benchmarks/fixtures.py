@@ -0,0 +1,104 @@
+import io
+import random
+from typing import List, Tuple
+
+from PIL import Image, ImageDraw, ImageFont
+
+SAMPLE_LINES = [
+    "BREAKING: Scientists confirm chocolate cures the common cold",
+    "Share before they delete this!",
+    "Unemployment fell to 3.2% last month",
+    "The city council approved a $40 million budget",
+    "Drinking 8 glasses of water a day is a myth",
+    "NASA announces new mission to the moon in 2027",
+    "Studies show 90% of people skip breakfast",
+    "Local elections moved to next Tuesday",
+]
+
+
+def _font(size: int) -> ImageFont.ImageFont:
+    for name in ("DejaVuSans-Bold.ttf", "Arial.ttf", "arial.ttf"):
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    return ImageFont.load_default(size=size)
+
+
+def render_text_image(
+    lines: List[str],
+    size: Tuple[int, int] = (1080, 1350),
+    background: Tuple[int, int, int] = (250, 250, 245),
+    foreground: Tuple[int, int, int] = (20, 20, 20),
+    font_size: int = 48,
+    noise: int = 0,
+    seed: int = 0,
+) -> Image.Image:
+    """Meme-style feed image: a few lines of text on a flat (optionally noisy) background."""
+    image = Image.new("RGB", size, background)
+    draw = ImageDraw.Draw(image)
+    font = _font(font_size)
+    y = size[1] // 6
+    for line in lines:
+        draw.text((size[0] // 12, y), line, fill=foreground, font=font)
+        y += int(font_size * 1.6)
+    if noise:
+        rng = random.Random(seed)
+        pixels = image.load()
+        for _ in range(noise):
+            x, yy = rng.randrange(size[0]), rng.randrange(size[1])
+            pixels[x, yy] = tuple(rng.randrange(256) for _ in range(3))
+    return image
+
+
+def sample_images(count: int, size: Tuple[int, int] = (1080, 1350)) -> List[Tuple[Image.Image, List[str]]]:
+    rng = random.Random(1234)
+    images = []
+    for index in range(count):
+        lines = rng.sample(SAMPLE_LINES, k=3)
+        dark = index % 3 == 2
+        images.append(
+            (
+                render_text_image(
+                    lines,
+                    size=size,
+                    background=(15, 15, 25) if dark else (250, 250, 245),
+                    foreground=(240, 240, 240) if dark else (20, 20, 20),
+                    noise=2000 if index % 2 else 0,
+                    seed=index,
+                ),
+                lines,
+            )
+        )
+    return images
+
+
+# (name, render overrides, JPEG quality or None): the conditions feed images come in.
+CORPUS_CONDITIONS = [
+    ("clean", {}, None),
+    ("dark", {"background": (15, 15, 25), "foreground": (240, 240, 240)}, None),
+    ("noisy", {"noise": 6000}, None),
+    ("low_contrast", {"background": (205, 205, 200), "foreground": (140, 140, 135)}, None),
+    ("small_text", {"font_size": 28}, None),
+    ("small_image", {"size": (540, 675), "font_size": 24}, None),
+    ("colored", {"background": (30, 90, 200), "foreground": (255, 220, 0)}, None),
+    ("jpeg_q30", {}, 30),
+    # Long thread screenshot: small feed-width text on a very tall canvas.
+    ("tall_screenshot", {"size": (1080, 5000), "font_size": 20}, None),
+]
+
+
+def ocr_corpus(count: int) -> List[Tuple[str, Image.Image, List[str]]]:
+    """(name, image, ground-truth lines), cycling through CORPUS_CONDITIONS with different text."""
+    rng = random.Random(4321)
+    corpus = []
+    for index in range(count):
+        condition, overrides, quality = CORPUS_CONDITIONS[index % len(CORPUS_CONDITIONS)]
+        lines = rng.sample(SAMPLE_LINES, k=3)
+        image = render_text_image(lines, seed=index, **overrides)
+        if quality is not None:
+            buffer = io.BytesIO()
+            image.save(buffer, format="JPEG", quality=quality)
+            image = Image.open(io.BytesIO(buffer.getvalue())).convert("RGB")
+        corpus.append((f"{index:02d}-{condition}", image, lines))
+    return corpus
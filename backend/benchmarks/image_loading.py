@@ -0,0 +1,96 @@
+"""
+Image loading for OCR: legacy full decode + 2x upscale vs the bounded loader.
+
+Each implementation runs in its own subprocess over the same large encoded
+images (JPEG and PNG), decoding and building the first OCR variant, so peak
+RSS is comparable.
+
+    python -m benchmarks.image_loading --sizes 1080x1350,1080x5000,4000x3000,8000x4500
+"""
+import argparse
+import io
+import json
+import multiprocessing
+import resource
+import statistics
+import sys
+import time
+from typing import Dict, List, Tuple
+
+from PIL import Image
+
+from app.ocr.images import decode_image, ocr_scale
+from app.ocr.preprocess import OcrVariants
+from benchmarks.fixtures import SAMPLE_LINES, render_text_image
+
+
+def _encoded(sizes: List[Tuple[int, int]]) -> List[Tuple[str, bytes]]:
+    images: List[Tuple[str, bytes]] = []
+    for size in sizes:
+        image = render_text_image(SAMPLE_LINES[:3], size=size, font_size=max(24, size[0] // 22))
+        for fmt in ("JPEG", "PNG"):
+            buffer = io.BytesIO()
+            image.save(buffer, fmt)
+            images.append((f"{size[0]}x{size[1]}.{fmt.lower()}", buffer.getvalue()))
+    return images
+
+
+def _legacy(content: bytes) -> Tuple[int, int]:
+    image = Image.open(io.BytesIO(content)).convert("RGB")
+    return OcrVariants(image, "fast").get("autocontrast").size
+
+
+def _bounded(content: bytes) -> Tuple[int, int]:
+    image = decode_image(content)
+    return OcrVariants(image, "fast", scale=ocr_scale(image.size)).get("autocontrast").size
+
+
+IMPLEMENTATIONS = {"legacy": _legacy, "bounded": _bounded}
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux, bytes on macOS.
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _run(name: str, sizes: List[Tuple[int, int]], repeats: int, queue) -> None:
+    images = _encoded(sizes)
+    baseline = _peak_rss_mb()
+    load = IMPLEMENTATIONS[name]
+    per_image: Dict[str, Dict[str, object]] = {}
+    for label, content in images:
+        timings: List[float] = []
+        for _ in range(repeats):
+            started = time.perf_counter()
+            ocr_size = load(content)
+            timings.append((time.perf_counter() - started) * 1000)
+        per_image[label] = {"ocr_size": list(ocr_size), "mean_ms": round(statistics.mean(timings), 1)}
+    queue.put({"per_image": per_image, "peak_rss_over_inputs_mb": round(_peak_rss_mb() - baseline, 1)})
+
+
+def _size(value: str) -> Tuple[int, int]:
+    width, _, height = value.partition("x")
+    return int(width), int(height)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="1080x1350,1080x5000,4000x3000,8000x4500")
+    parser.add_argument("--repeats", type=int, default=2)
+    args = parser.parse_args()
+    sizes = [_size(value) for value in args.sizes.split(",") if value]
+
+    ctx = multiprocessing.get_context("spawn")
+    results: Dict[str, Dict[str, object]] = {}
+    for name in IMPLEMENTATIONS:
+        queue = ctx.Queue()
+        proc = ctx.Process(target=_run, args=(name, sizes, args.repeats, queue))
+        proc.start()
+        results[name] = queue.get()
+        proc.join()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
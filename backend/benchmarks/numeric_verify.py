@@ -0,0 +1,119 @@
+"""
+numeric_verify throughput: legacy per-claim tool vs the single-pass engine.
+
+Texts are OCR-like posts (a few fixture lines each, some with ranges and
+urgency wording). Reports texts/sec for the legacy tool, the current tool
+entrypoint (Pydantic on both ends) and numeric_verify_batch, plus how many
+texts get different flags or scores than the legacy implementation.
+
+    python -m benchmarks.numeric_verify --texts 5000 --repeats 3
+"""
+import argparse
+import json
+import random
+import re
+import time
+from typing import Any, Callable, Dict, List
+
+from app.schemas.tool_io import NumericFinding, NumericVerifyInput, NumericVerifyOutput
+from app.tools.numeric_verify import numeric_verify, numeric_verify_batch
+from benchmarks.fixtures import SAMPLE_LINES
+
+_LEGACY_NUM_RE = re.compile(
+    r"""
+    (?:
+        (?P<currency>\$)\s*(?P<cur_num>\d{1,3}(?:,\d{3})*(?:\.\d+)?|\d+(?:\.\d+)?) |
+        (?P<percent>\d+(?:\.\d+)?)\s*(?P<pct_sign>%) |
+        (?P<number>\d{1,3}(?:,\d{3})*(?:\.\d+)?|\d+(?:\.\d+)?)
+    )
+    """,
+    re.VERBOSE,
+)
+_LEGACY_RANGE_RE = re.compile(r"(\d+(?:\.\d+)?)\s*(?:-|to)\s*(\d+(?:\.\d+)?)", re.IGNORECASE)
+
+EXTRA_LINES = [
+    "Act now: 90-95% off, limited time only",
+    "Guaranteed returns of 150% within 30 days",
+    "Prices rose 10 to 12 percent in 2024",
+    "Send $500 today to claim your $1,000,000 prize",
+    "No risk, always works",
+]
+
+
+def legacy_numeric_verify(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """The pre-batch implementation, kept here as the baseline."""
+    inp = NumericVerifyInput(**payload)
+    claim = inp.claim_text
+    extracted = [m.group(0).strip() for m in _LEGACY_NUM_RE.finditer(claim) if m.group(0).strip()]
+    flags: List[str] = []
+    computed: Dict[str, Any] = {}
+    lowered = claim.lower()
+    if any(k in lowered for k in ["100%", "guaranteed", "no risk", "always", "never"]):
+        flags.append("contains_absolute_or_guarantee_language")
+    percents = [float(s.replace(",", "").replace("$", "").replace("%", "").strip()) for s in extracted if "%" in s]
+    for p in percents:
+        if p < 0 or p > 100:
+            flags.append("percent_out_of_range")
+    ranges = [(min(float(a), float(b)), max(float(a), float(b))) for a, b in _LEGACY_RANGE_RE.findall(claim)]
+    if ranges:
+        computed["ranges"] = ranges
+    if "$" in claim and any(k in lowered for k in ["today", "now", "urgent", "limited time", "within"]):
+        flags.append("currency_with_urgency_pattern")
+    score = 0.0
+    if flags:
+        score = min(1.0, 0.15 * len(flags) + (0.2 if any("out_of_range" in f for f in flags) else 0.0))
+    out = NumericVerifyOutput(
+        claim_text=claim,
+        finding=NumericFinding(extracted_numbers=extracted, flags=flags, computed_checks=computed, score=score),
+    )
+    return out.model_dump()
+
+
+def sample_texts(count: int, seed: int = 0) -> List[str]:
+    rng = random.Random(seed)
+    pool = SAMPLE_LINES + EXTRA_LINES
+    return ["\n".join(rng.sample(pool, k=rng.randint(1, 4))) for _ in range(count)]
+
+
+def _texts_per_second(run: Callable[[List[str]], Any], texts: List[str], repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        run(texts)
+        best = min(best, time.perf_counter() - started)
+    return len(texts) / best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--texts", type=int, default=5000)
+    parser.add_argument("--unique", type=int, default=0, help="distinct texts (0 = all distinct); repeats exercise batch dedupe")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    distinct = sample_texts(args.unique or args.texts)
+    texts = [distinct[i % len(distinct)] for i in range(args.texts)]
+
+    implementations = {
+        "legacy": lambda batch: [legacy_numeric_verify({"claim_text": t}) for t in batch],
+        "tool": lambda batch: [numeric_verify({"claim_text": t}) for t in batch],
+        "batch": numeric_verify_batch,
+    }
+    results: Dict[str, Any] = {
+        name: {"texts_per_sec": round(_texts_per_second(run, texts, args.repeats))}
+        for name, run in implementations.items()
+    }
+    results["batch_speedup"] = round(results["batch"]["texts_per_sec"] / results["legacy"]["texts_per_sec"], 2)
+
+    differing = 0
+    for text, current in zip(distinct, numeric_verify_batch(distinct)):
+        legacy = legacy_numeric_verify({"claim_text": text})["finding"]
+        if (legacy["flags"], legacy["score"]) != (current["finding"]["flags"], current["finding"]["score"]):
+            differing += 1
+    results["flags_or_score_differ"] = differing
+
+    print(json.dumps({"texts": args.texts, "distinct": len(distinct), "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+"""
+OCR accuracy versus cost per profile over a fixture corpus with ground truth.
+
+Each profile runs in its own process: images are served locally and pushed
+through extract_post_text_for_llm (OCR cache off), recording per-image
+latency, tesseract calls, peak RSS, character error rate (CER) and line
+recall. An exhaustive sweep of every (variant, psm) pass then checks that the
+scheduled text equals the full-sweep text (`differs_from_full_sweep` lists
+the images where early exit changed it) and measures each pass's marginal
+contribution: how much worse the merged text gets without it.
+
+    python -m benchmarks.ocr_accuracy --images 16 --profiles fast,accurate
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import re
+import resource
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Tuple
+
+from benchmarks.fixtures import ocr_corpus
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+# A ground-truth line counts as recovered when some output line is this close to it.
+LINE_MATCH_CER = 0.2
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _peak_rss_mb(who: int = resource.RUSAGE_SELF) -> float:
+    peak = resource.getrusage(who).ru_maxrss
+    # ru_maxrss is KiB on Linux, bytes on macOS.
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _normalize(text: str) -> str:
+    return " ".join(re.sub(r"[^a-z0-9%$.,]+", " ", text.lower()).split())
+
+
+def _levenshtein(a: str, b: str) -> int:
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+
+def char_error_rate(reference: str, hypothesis: str) -> float:
+    """Edit distance over reference length, after case/punctuation/whitespace folding."""
+    ref, hyp = _normalize(reference), _normalize(hypothesis)
+    if not ref:
+        return 0.0 if not hyp else 1.0
+    return _levenshtein(ref, hyp) / len(ref)
+
+
+def line_recall(reference_lines: List[str], hypothesis: str) -> float:
+    candidates = [line for line in hypothesis.splitlines() if line.strip()]
+    if not reference_lines:
+        return 1.0
+    found = sum(
+        1
+        for line in reference_lines
+        if any(char_error_rate(line, candidate) <= LINE_MATCH_CER for candidate in candidates)
+    )
+    return found / len(reference_lines)
+
+
+def _total_passes() -> int:
+    from app.metrics import OCR_PASS_SECONDS
+
+    return sum(OCR_PASS_SECONDS.counts().values())
+
+
+def _full_sweep(content: bytes, profile: str) -> Tuple[List[str], List[str]]:
+    """(labels, texts) of every (variant, psm) pass in default order, on the image as the pipeline decodes it."""
+    from app.ocr.engine import run_ocr_job
+    from app.ocr.images import decode_image
+    from app.post_classifier import _ocr_psm_modes, _preprocess_for_ocr
+
+    variants = _preprocess_for_ocr(decode_image(content), profile)
+    labels: List[str] = []
+    texts: List[str] = []
+    for variant in variants.names:
+        processed = variants.get(variant)
+        for psm in _ocr_psm_modes(profile):
+            labels.append(f"{variant}/{psm.split()[-1]}")
+            texts.append(run_ocr_job(processed, psm))
+    return labels, texts
+
+
+def _marginal(
+    corpus: List[Tuple[str, Any, List[str]]], sweeps: List[Tuple[List[str], List[str]]]
+) -> Dict[str, Dict[str, float]]:
+    """Per (variant, psm): mean CER increase when that pass is left out of the merge, and lines only it recovers."""
+    from app.post_classifier import _merge_ocr_candidates
+
+    deltas: Dict[str, List[float]] = {}
+    solo_lines: Dict[str, int] = {}
+    for (_name, _image, lines), (labels, texts) in zip(corpus, sweeps):
+        reference = "\n".join(lines)
+        full_cer = char_error_rate(reference, _merge_ocr_candidates(texts))
+        for index, label in enumerate(labels):
+            without = texts[:index] + texts[index + 1:]
+            deltas.setdefault(label, []).append(char_error_rate(reference, _merge_ocr_candidates(without)) - full_cer)
+            others = "\n".join(without)
+            solo_lines[label] = solo_lines.get(label, 0) + sum(
+                1
+                for line in lines
+                if line_recall([line], texts[index]) and not line_recall([line], others)
+            )
+    return {
+        label: {
+            "cer_delta_mean": round(statistics.mean(values), 4),
+            "images_helped": sum(1 for value in values if value > 0),
+            "unique_lines": solo_lines[label],
+        }
+        for label, values in sorted(deltas.items(), key=lambda item: -statistics.mean(item[1]))
+    }
+
+
+def _run(profile: str, args: Dict[str, Any], queue) -> None:
+    # Measure OCR work itself, not cache hits; set before the engine and cache exist.
+    os.environ["OCR_CACHE_ENABLED"] = "0"
+    os.environ["OCR_WORKERS"] = str(args["workers"])
+    os.environ["OCR_EARLY_EXIT"] = "1" if args["early_exit"] else "0"
+
+    from app.ocr.backends import get_ocr_backend
+    from app.ocr.engine import shutdown_ocr_engine
+    from app.post_classifier import _merge_ocr_candidates, extract_post_text_for_llm
+    from benchmarks.stubs import ServerProfile, StubServer
+
+    try:
+        get_ocr_backend().image_to_string(ocr_corpus(1)[0][1].convert("L"), config="--psm 6")
+    except Exception as exc:
+        queue.put({"skipped": f"{type(exc).__name__}: {exc}"})
+        return
+
+    corpus = ocr_corpus(args["images"])
+    server = StubServer(ServerProfile(), corpus=[(image, lines) for _, image, lines in corpus]).start()
+    try:
+        # Unmeasured: process pool start-up and engine model loading.
+        extract_post_text_for_llm(server.image_url(0), ocr_profile=profile)
+        baseline_rss = _peak_rss_mb()
+        per_image: List[Dict[str, Any]] = []
+        for index, (name, _image, lines) in enumerate(corpus):
+            passes_before = _total_passes()
+            started = time.perf_counter()
+            text = extract_post_text_for_llm(server.image_url(index), ocr_profile=profile)["ocr-text"]
+            elapsed = (time.perf_counter() - started) * 1000
+            per_image.append(
+                {
+                    "image": name,
+                    "ms": round(elapsed, 2),
+                    "tesseract_calls": _total_passes() - passes_before,
+                    "cer": round(char_error_rate("\n".join(lines), text), 4),
+                    "line_recall": round(line_recall(lines, text), 4),
+                    "text": text,
+                }
+            )
+        peak_rss = _peak_rss_mb()
+        peak_children = _peak_rss_mb(resource.RUSAGE_CHILDREN)
+    finally:
+        server.stop()
+        shutdown_ocr_engine()
+
+    # Unmeasured reference: the exhaustive sweep the scheduler replaced, merged the same way.
+    sweeps = [_full_sweep(content, profile) for content, _ in server.images]
+    differs: List[str] = []
+    for item, (_name, _image, lines), (_labels, texts) in zip(per_image, corpus, sweeps):
+        full_text = _merge_ocr_candidates(texts).strip()
+        item["matches_full_sweep"] = item.pop("text") == full_text
+        if not item["matches_full_sweep"]:
+            differs.append(item["image"])
+            item["full_sweep_calls"] = len(texts)
+            item["full_sweep_cer"] = round(char_error_rate("\n".join(lines), full_text), 4)
+
+    latencies = [item["ms"] for item in per_image]
+    calls = [item["tesseract_calls"] for item in per_image]
+    result: Dict[str, Any] = {
+        "images": len(per_image),
+        "mean_ms": round(statistics.mean(latencies), 2),
+        "p50_ms": round(_percentile(latencies, 50), 2),
+        "p95_ms": round(_percentile(latencies, 95), 2),
+        "tesseract_calls": sum(calls),
+        "calls_per_image": round(statistics.mean(calls), 2),
+        "ms_per_call": round(sum(latencies) / max(1, sum(calls)), 2),
+        "cer_mean": round(statistics.mean(item["cer"] for item in per_image), 4),
+        "cer_p95": round(_percentile([item["cer"] for item in per_image], 95), 4),
+        "line_recall_mean": round(statistics.mean(item["line_recall"] for item in per_image), 4),
+        "differs_from_full_sweep": differs,
+        "peak_rss_mb": round(peak_rss, 1),
+        "peak_rss_over_baseline_mb": round(peak_rss - baseline_rss, 1),
+        "peak_rss_children_mb": round(peak_children, 1),
+        "per_image": per_image,
+    }
+    if args["marginal"]:
+        result["marginal"] = _marginal(corpus, sweeps)
+    queue.put(result)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--images", type=int, default=16, help="corpus size (cycles through the fixture conditions)")
+    parser.add_argument("--profiles", default="fast,accurate")
+    parser.add_argument("--workers", type=int, default=1, help="OCR_WORKERS; 1 keeps every pass in-process")
+    parser.add_argument("--early-exit", action="store_true", help="enable the early-exit scheduler (OCR_EARLY_EXIT=1)")
+    parser.add_argument("--no-marginal", dest="marginal", action="store_false", help="skip the per-pass sweep")
+    parser.add_argument("--output", help="result file (default benchmarks/results/ocr_accuracy-<utc stamp>.json)")
+    args = parser.parse_args()
+
+    options = {"images": args.images, "workers": args.workers, "early_exit": args.early_exit, "marginal": args.marginal}
+    ctx = multiprocessing.get_context("spawn")
+    results: Dict[str, Dict[str, Any]] = {}
+    for profile in [name for name in args.profiles.split(",") if name in ("fast", "accurate")]:
+        queue = ctx.Queue()
+        proc = ctx.Process(target=_run, args=(profile, options, queue))
+        proc.start()
+        results[profile] = queue.get()
+        proc.join()
+
+    fast, accurate = results.get("fast", {}), results.get("accurate", {})
+    if "mean_ms" in fast and "mean_ms" in accurate:
+        results["accurate_vs_fast"] = {
+            "latency_ratio": round(accurate["mean_ms"] / max(fast["mean_ms"], 1e-9), 2),
+            "calls_ratio": round(accurate["tesseract_calls"] / max(1, fast["tesseract_calls"]), 2),
+            "cer_delta": round(accurate["cer_mean"] - fast["cer_mean"], 4),
+            "line_recall_delta": round(accurate["line_recall_mean"] - fast["line_recall_mean"], 4),
+        }
+
+    started_at = datetime.now(timezone.utc)
+    report = {"benchmark": "ocr_accuracy", "started_at": started_at.isoformat(), "config": options, "results": results}
+    output = args.output or os.path.join(RESULTS_DIR, f"ocr_accuracy-{started_at:%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as fh:
+        json.dump(report, fh, indent=2)
+    print(json.dumps(report, indent=2))
+    print(f"saved {output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Per-image OCR latency: subprocess-per-call pytesseract vs resident tesserocr.
+
+    python -m benchmarks.ocr_backends --images 6 --profile fast
+"""
+import argparse
+import json
+import statistics
+import time
+from typing import Dict, List
+
+from app.ocr import backends
+from app.post_classifier import _merge_ocr_candidates, _ocr_jobs
+from benchmarks.fixtures import sample_images
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def bench_backend(backend: backends.OcrBackend, images, profile: str, repeats: int) -> Dict[str, float]:
+    latencies: List[float] = []
+    # Warm-up: the resident engine pays its model load once, outside the timings.
+    backend.image_to_string(images[0][0].convert("L"), config="--psm 6")
+    backend.calls = 0
+    for _ in range(repeats):
+        for image, _lines in images:
+            started = time.perf_counter()
+            texts = [backend.image_to_string(processed, config=psm).strip() for processed, psm in _ocr_jobs(image, profile)]
+            _merge_ocr_candidates(texts)
+            latencies.append((time.perf_counter() - started) * 1000)
+    return {
+        "images": len(latencies),
+        "tesseract_calls": backend.calls,
+        "mean_ms": round(statistics.mean(latencies), 2),
+        "p50_ms": round(_percentile(latencies, 50), 2),
+        "p95_ms": round(_percentile(latencies, 95), 2),
+        "per_call_ms": round(sum(latencies) / max(1, backend.calls), 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--images", type=int, default=6)
+    parser.add_argument("--repeats", type=int, default=1)
+    parser.add_argument("--profile", choices=["fast", "accurate"], default="fast")
+    args = parser.parse_args()
+
+    images = sample_images(args.images)
+    results: Dict[str, Dict[str, float]] = {}
+    for name in ("pytesseract", "tesserocr"):
+        try:
+            backend = backends.make_ocr_backend(name)
+        except RuntimeError as exc:
+            results[name] = {"skipped": str(exc)}
+            continue
+        results[name] = bench_backend(backend, images, args.profile, args.repeats)
+
+    if "mean_ms" in results.get("pytesseract", {}) and "mean_ms" in results.get("tesserocr", {}):
+        results["speedup"] = round(results["pytesseract"]["mean_ms"] / results["tesserocr"]["mean_ms"], 2)
+    print(json.dumps({"profile": args.profile, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
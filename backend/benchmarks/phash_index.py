@@ -0,0 +1,221 @@
+"""
+Near-duplicate image index: false matches on edited captions and lookup latency on rendered images.
+
+Distances are measured between fixture images and their reposts (rescaled,
+JPEG recompressed, both), and between captions with one word or one digit
+changed, or a negation inserted, on the same template. Such edits often hash
+like the original (`hash_matches`), so a match is only reused once a single OCR
+pass agrees with the stored text. With tesseract available, `verified_matches`
+counts the edits that pass anyway, and `verified_false_matches` those where a
+full OCR of the edited image reads the edited caption, which reuse would have
+lost; it must be 0. `verified` is the share of reposts that pass.
+
+Latency is measured on hashes of rendered text images, not random hashes: text
+screenshots hash close together, which is what fills the index buckets.
+Lookups are JPEG reposts of indexed images; `recall` is the share that finds
+its source within PHASH_MAX_CANDIDATES.
+
+    python -m benchmarks.phash_index --entries 10000,100000 --images 16
+"""
+import argparse
+import io
+import json
+import random
+import statistics
+import time
+from typing import Callable, Dict, List, Tuple
+
+from PIL import Image
+
+from app.ocr.engine import run_ocr_job
+from app.ocr.images import decode_image
+from app.ocr.phash import PerceptualIndex, perceptual_hashes
+from app.post_classifier import _merge_ocr_candidates, _ocr_jobs, _ocr_line_keys, _verification_job, _verifies
+from benchmarks.fixtures import SAMPLE_LINES, render_text_image, sample_images
+
+
+def _jpeg(image: Image.Image, quality: int) -> Image.Image:
+    buffer = io.BytesIO()
+    image.convert("RGB").save(buffer, "JPEG", quality=quality)
+    return Image.open(io.BytesIO(buffer.getvalue())).convert("RGB")
+
+
+def _scaled(image: Image.Image, factor: float) -> Image.Image:
+    return image.resize((round(image.width * factor), round(image.height * factor)), Image.Resampling.LANCZOS)
+
+
+def _served(image: Image.Image) -> Image.Image:
+    buffer = io.BytesIO()
+    image.save(buffer, "PNG")
+    return decode_image(buffer.getvalue())
+
+
+REPOSTS: Dict[str, Callable[[Image.Image], Image.Image]] = {
+    "half_size": lambda image: _scaled(image, 0.5),
+    "jpeg_q60": lambda image: _jpeg(image, 60),
+    "upscaled_jpeg_q75": lambda image: _jpeg(_scaled(image, 1.5), 75),
+    "small_jpeg_q50": lambda image: _jpeg(_scaled(image, 0.4), 50),
+}
+
+# (kind, caption, edited caption): one template, a claim-changing edit.
+CAPTION_EDITS = [
+    ("one_digit", "UNEMPLOYMENT IS AT 3%", "UNEMPLOYMENT IS AT 9%"),
+    ("one_digit", "Council approved $40 million", "Council approved $90 million"),
+    ("one_digit", "Moon mission set for 2027", "Moon mission set for 2029"),
+    ("one_word", "Unemployment fell to 3.2%", "Unemployment rose to 3.2%"),
+    ("one_word", "Chocolate cures colds", "Chocolate causes colds"),
+    ("negation", "Vaccines cause autism", "Vaccines do not cause autism"),
+]
+EDIT_STYLES = [
+    {},
+    {"background": (15, 15, 25), "foreground": (240, 240, 240)},
+    {"noise": 6000},
+    {"font_size": 28},
+]
+
+
+def _distances(a: Tuple[int, int], b: Tuple[int, int]) -> Tuple[int, int]:
+    return (a[0] ^ b[0]).bit_count(), (a[1] ^ b[1]).bit_count()
+
+
+def _summary(values: List[int]) -> Dict[str, float]:
+    return {"min": min(values), "median": statistics.median(values), "max": max(values)}
+
+
+def _stored_text(image: Image.Image) -> str:
+    """What the OCR cache holds for an image: the merged fast-profile sweep."""
+    return _merge_ocr_candidates([run_ocr_job(processed, psm) for processed, psm in _ocr_jobs(image, "fast")])
+
+
+def _verified(stored: str, image: Image.Image) -> bool:
+    return _verifies(stored, run_ocr_job(*_verification_job(image)))
+
+
+def _hash_match(index: PerceptualIndex, key: str, image: Image.Image) -> bool:
+    hashes = perceptual_hashes(image)
+    return hashes is not None and any(other == key for _, other in index.nearest(*hashes))
+
+
+def fixture_distances(count: int, verify: bool) -> Dict[str, object]:
+    images = [image for image, _ in sample_images(count)]
+    hashes = [perceptual_hashes(image) for image in images]
+    stored = [_stored_text(_served(image)) for image in images] if verify else []
+    reposts: Dict[str, Dict[str, object]] = {}
+    for name, transform in REPOSTS.items():
+        copies = [transform(image) for image in images]
+        pairs = [_distances(hashes[i], perceptual_hashes(copy)) for i, copy in enumerate(copies)]
+        reposts[name] = {"phash": _summary([p for p, _ in pairs]), "detail": _summary([d for _, d in pairs])}
+        if verify:
+            passed = sum(_verified(stored[i], _served(copy)) for i, copy in enumerate(copies))
+            reposts[name]["verified"] = round(passed / len(copies), 3)
+
+    edits: Dict[str, Dict[str, object]] = {}
+    for kind, caption, edited in CAPTION_EDITS:
+        for style in EDIT_STYLES:
+            lines = ["Share before they delete this!"]
+            original = render_text_image([caption, *lines], **style)
+            changed = render_text_image([edited, *lines], **style)
+            index = PerceptualIndex()
+            index.add("original", *perceptual_hashes(original))
+            entry = edits.setdefault(kind, {"pairs": 0, "hash_matches": 0, "phash": [], "detail": []})
+            phash, detail = _distances(perceptual_hashes(original), perceptual_hashes(changed))
+            entry["pairs"] += 1
+            entry["phash"].append(phash)
+            entry["detail"].append(detail)
+            if verify:
+                entry.setdefault("verified_matches", 0)
+                entry.setdefault("verified_false_matches", 0)
+            if _hash_match(index, "original", changed):
+                entry["hash_matches"] += 1
+                if verify and _verified(_stored_text(_served(original)), _served(changed)):
+                    entry["verified_matches"] += 1
+                    read = _ocr_line_keys(_stored_text(_served(changed)))
+                    entry["verified_false_matches"] += bool(_ocr_line_keys(edited) & read)
+    for entry in edits.values():
+        entry["phash"] = _summary(entry["phash"])
+        entry["detail"] = _summary(entry["detail"])
+    return {"repost": reposts, "caption_edits": edits}
+
+
+_WORDS = sorted({word for line in SAMPLE_LINES for word in line.split()})
+
+
+def _feed_image(seed: int) -> Image.Image:
+    """A small rendered text post: random caption, font size and light or dark template."""
+    rng = random.Random(seed)
+    lines = [" ".join(rng.choices(_WORDS, k=rng.randint(2, 5))) for _ in range(rng.randint(1, 4))]
+    dark = rng.random() < 0.3
+    return render_text_image(
+        lines,
+        size=(360, 450),
+        background=(15, 15, 25) if dark else (250, 250, 245),
+        foreground=(240, 240, 240) if dark else (20, 20, 20),
+        font_size=rng.choice((14, 16, 20)),
+        seed=seed,
+    )
+
+
+def lookup_latency(entries: int, lookups: int, seed: int, max_candidates: int) -> Dict[str, float]:
+    index = PerceptualIndex(max_entries=entries, max_candidates=max_candidates)
+    distinct = set()
+    started = time.perf_counter()
+    for key in range(entries):
+        hashes = perceptual_hashes(_feed_image(seed * entries + key))
+        if hashes is not None:
+            index.add(str(key), *hashes)
+            distinct.add(hashes[0])
+    build_seconds = time.perf_counter() - started
+    rng = random.Random(seed)
+    timings: List[float] = []
+    found = 0
+    for _ in range(lookups):
+        key = rng.randrange(entries)
+        hashes = perceptual_hashes(_jpeg(_feed_image(seed * entries + key), 60))
+        if hashes is None:
+            continue
+        started = time.perf_counter()
+        matches = index.nearest(*hashes)
+        timings.append((time.perf_counter() - started) * 1000)
+        found += any(other == str(key) for _, other in matches)
+    timings.sort()
+    stats = index.stats()
+    return {
+        "build_seconds": round(build_seconds, 1),
+        "distinct_phashes": len(distinct),
+        "p50_ms": round(timings[len(timings) // 2], 3),
+        "p99_ms": round(timings[int(len(timings) * 0.99)], 3),
+        "recall": round(found / len(timings), 3),
+        "truncated": round(stats["truncated"] / stats["lookups"], 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--entries", default="10000,100000")
+    parser.add_argument("--lookups", type=int, default=2000)
+    parser.add_argument("--images", type=int, default=16)
+    parser.add_argument("--max-candidates", type=int, default=256)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-verify", dest="verify", action="store_false", help="skip the OCR verification pass")
+    args = parser.parse_args()
+
+    verify = args.verify
+    if verify:
+        try:
+            run_ocr_job(Image.new("L", (32, 32), 255), "--psm 6")
+        except Exception as exc:
+            print(json.dumps({"verification": {"skipped": f"{type(exc).__name__}: {exc}"}}))
+            verify = False
+    results = {
+        "distances": fixture_distances(args.images, verify),
+        "lookup": {
+            size: lookup_latency(int(size), args.lookups, args.seed, args.max_candidates)
+            for size in args.entries.split(",")
+            if size
+        },
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
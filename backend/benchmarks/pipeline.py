@@ -0,0 +1,335 @@
+"""
+Offline end-to-end throughput and per-stage latency of /api/analyze_claims and BackboardAgent.run.
+
+Backboard, Brave, post pages and images are replaced by local stand-ins
+(benchmarks/stubs.py) with configurable latency and failure rates, so runs
+are reproducible and cost nothing. Results are saved as JSON; pass an older
+file as --baseline to flag p95/throughput regressions (exit status 1).
+
+    python -m benchmarks.pipeline --concurrency 1,4,16 --requests 32
+    python -m benchmarks.pipeline --baseline benchmarks/results/pipeline-<stamp>.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from benchmarks.fixtures import SAMPLE_LINES
+from benchmarks.stubs import FakeBackboardClient, Latency, ScriptedBackboard, ServerProfile, StubServer
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _summary_ms(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {"count": 0}
+    return {
+        "count": len(values),
+        "mean_ms": round(statistics.mean(values) * 1000, 2),
+        "p50_ms": round(_percentile(values, 50) * 1000, 2),
+        "p95_ms": round(_percentile(values, 95) * 1000, 2),
+        "p99_ms": round(_percentile(values, 99) * 1000, 2),
+    }
+
+
+def _configure_env(args: argparse.Namespace, workdir: str, server: StubServer) -> None:
+    """Must run before the app's singletons are created: they read env lazily, once."""
+    os.environ["BACKBOARD_API_KEY"] = os.environ.get("BACKBOARD_API_KEY") or "stub"
+    os.environ["BRAVE_API_KEY"] = "stub"
+    os.environ["BRAVE_SEARCH_URL"] = f"{server.base_url}/res/v1/web/search"
+    os.environ.setdefault("BRAVE_RATE_PER_SECOND", str(args.brave_rate))
+    os.environ.setdefault("BRAVE_BURST", str(args.brave_rate))
+    os.environ["ASSISTANT_REGISTRY_PATH"] = os.path.join(workdir, "assistants.json")
+    os.environ["OCR_CACHE_PATH"] = os.path.join(workdir, "ocr_cache.sqlite3")
+    os.environ["SEARCH_CACHE_PATH"] = os.path.join(workdir, "search_cache.sqlite3")
+    os.environ["CREDIBILITY_INDEX_PATH"] = os.path.join(workdir, "credibility.sqlite3")
+    if not args.caches:
+        # Cold pipeline: every request pays every stage.
+        for name in ("OCR_CACHE_ENABLED", "SEARCH_CACHE_ENABLED", "VERDICT_CACHE_ENABLED", "CREDIBILITY_INDEX_ENABLED"):
+            os.environ[name] = "0"
+
+
+def _posts(server: StubServer, level: int, count: int, images_per_post: int) -> List[Dict[str, Any]]:
+    posts = []
+    for index in range(count):
+        first = index % len(server.images)
+        images = [(first + offset) % len(server.images) for offset in range(images_per_post)]
+        posts.append(
+            {
+                "url": server.post_url(f"c{level}-{index}", images),
+                "alt_text": server.images[first][1][0],
+                "caption": SAMPLE_LINES[index % len(SAMPLE_LINES)],
+                "request_id": f"bench-c{level}-{index}",
+                "max_images": images_per_post,
+            }
+        )
+    return posts
+
+
+async def _run_level(
+    call: Callable[[Dict[str, Any]], Awaitable[None]],
+    posts: List[Dict[str, Any]],
+    concurrency: int,
+) -> Dict[str, Any]:
+    from app.metrics import span_sink
+
+    stage_samples: Dict[Tuple[str, str], List[float]] = {}
+
+    def _record(stage: str, outcome: str, seconds: float) -> None:
+        stage_samples.setdefault((stage, outcome), []).append(seconds)
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+
+    async def _one(post: Dict[str, Any]) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await call(post)
+            except Exception as exc:
+                name = type(exc).__name__
+                errors[name] = errors.get(name, 0) + 1
+                return
+            latencies.append(time.perf_counter() - started)
+
+    with span_sink(_record):
+        started = time.perf_counter()
+        await asyncio.gather(*(_one(post) for post in posts))
+        wall = time.perf_counter() - started
+
+    stages: Dict[str, Dict[str, Any]] = {}
+    for (stage, outcome), samples in sorted(stage_samples.items()):
+        if outcome == "ok":
+            stages.setdefault(stage, {}).update(_summary_ms(samples))
+        else:
+            stages.setdefault(stage, {})[outcome] = len(samples)
+    return {
+        "concurrency": concurrency,
+        "requests": len(posts),
+        "ok": len(latencies),
+        "errors": errors,
+        "wall_seconds": round(wall, 3),
+        "throughput_rps": round(len(latencies) / wall, 3) if wall else 0.0,
+        "latency": _summary_ms(latencies),
+        "stages": stages,
+    }
+
+
+async def _bench(args: argparse.Namespace, server: StubServer) -> Dict[str, Any]:
+    from app.agents.backboard_agent import BackboardAgent
+    from app.http_client import close_http_clients, start_http_clients
+    from app.ocr.engine import shutdown_ocr_engine
+    from app.schemas.agent_io import ClaimInput
+
+    import httpx
+
+    llm_latency = Latency(args.llm_latency, args.llm_jitter, args.llm_distribution)
+    client: Any
+    backboard_server = None
+    backboard_url = args.backboard_url
+    if backboard_url or args.backboard == "http":
+        # Real SDK over HTTP: exercises its connection pool and error mapping too.
+        from backboard import BackboardClient
+
+        if not backboard_url:
+            from benchmarks.backboard_server import FaultProfile, create_app, start_in_thread
+
+            faults = FaultProfile(
+                latency={"*": llm_latency},
+                errors={"500": args.llm_failure_rate} if args.llm_failure_rate else {},
+            )
+            backboard_server, backboard_url = start_in_thread(create_app(ScriptedBackboard(), faults, seed=args.seed))
+        client = BackboardClient(api_key="stub", base_url=backboard_url)
+    else:
+        client = FakeBackboardClient(latency=llm_latency, failure_rate=args.llm_failure_rate, seed=args.seed)
+    await start_http_clients()
+    agent = BackboardAgent(api_key="stub", client=client)
+    await agent.warm()
+
+    async def call_agent(post: Dict[str, Any]) -> None:
+        await agent.run(
+            ClaimInput(
+                claims=[post["alt_text"]],
+                context={"caption": post["caption"], "ocr_text": "", "urls": [post["url"]], "metadata": {}},
+                request_id=post["request_id"],
+            )
+        )
+
+    http: Optional[httpx.AsyncClient] = None
+    if "api" in args.targets:
+        from app.api import routes
+        from app.main import app
+
+        # The router's module-level agent talks to the real SDK; swap in the stubbed one.
+        routes.agent_runner = agent
+        http = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=None)
+
+    async def call_api(post: Dict[str, Any]) -> None:
+        response = await http.post("/api/analyze_claims", json=post)
+        if response.status_code != 200:
+            raise RuntimeError(f"HTTP {response.status_code}: {response.text[:200]}")
+
+    calls = {"api": call_api, "agent": call_agent}
+    results: Dict[str, List[Dict[str, Any]]] = {}
+    try:
+        for target in args.targets:
+            # Unmeasured: pays process-pool start-up and first-connection costs.
+            for post in _posts(server, 0, args.warmup, args.images_per_post):
+                try:
+                    await calls[target](post)
+                except Exception:
+                    pass
+            results[target] = []
+            for level in args.concurrency:
+                posts = _posts(server, level, args.requests, args.images_per_post)
+                # Distinct URLs per target so a verdict cache can't serve one target from the other.
+                for post in posts:
+                    post["url"] += f"&target={target}"
+                results[target].append(await _run_level(calls[target], posts, level))
+        if backboard_url:
+            async with httpx.AsyncClient() as probe:
+                backboard_calls = (await probe.get(f"{backboard_url}/stats")).json().get("by_operation", {})
+        else:
+            backboard_calls = dict(client.calls)
+    finally:
+        if http is not None:
+            await http.aclose()
+        if backboard_url:
+            await client.aclose()
+        if backboard_server is not None:
+            backboard_server.should_exit = True
+        await close_http_clients()
+        shutdown_ocr_engine()
+
+    return {"levels": results, "backboard_calls": backboard_calls, "stub_requests": dict(server.requests)}
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], max_regression: float, min_ms: float) -> List[str]:
+    """Human-readable regressions: p95 up (or throughput down) by more than `max_regression`."""
+    regressions: List[str] = []
+    for target, levels in current.get("levels", {}).items():
+        previous = {level["concurrency"]: level for level in baseline.get("levels", {}).get(target, [])}
+        for level in levels:
+            before = previous.get(level["concurrency"])
+            if before is None:
+                continue
+            where = f"{target} c={level['concurrency']}"
+            if before["throughput_rps"] and level["throughput_rps"] < before["throughput_rps"] * (1 - max_regression):
+                regressions.append(f"{where} throughput {before['throughput_rps']} -> {level['throughput_rps']} rps")
+            pairs = [("end_to_end", before["latency"], level["latency"])]
+            pairs += [
+                (stage, before["stages"].get(stage, {}), summary)
+                for stage, summary in level["stages"].items()
+            ]
+            for name, old, new in pairs:
+                old_p95, new_p95 = old.get("p95_ms"), new.get("p95_ms")
+                if old_p95 is None or new_p95 is None or max(old_p95, new_p95) < min_ms:
+                    continue
+                if new_p95 > old_p95 * (1 + max_regression):
+                    regressions.append(f"{where} {name} p95 {old_p95} -> {new_p95} ms")
+    return regressions
+
+
+def _csv_ints(value: str) -> List[int]:
+    return [int(part) for part in value.split(",") if part.strip()]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--targets", default="api,agent", help="comma list of api, agent")
+    parser.add_argument("--concurrency", type=_csv_ints, default=[1, 4, 16])
+    parser.add_argument("--requests", type=int, default=32, help="requests per concurrency level")
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--images-per-post", type=int, default=1)
+    parser.add_argument("--fixture-images", type=int, default=8)
+    parser.add_argument("--caches", action="store_true", help="keep OCR/search/verdict caches and the credibility index on")
+    parser.add_argument("--llm-latency", type=float, default=0.3)
+    parser.add_argument("--llm-jitter", type=float, default=0.1)
+    parser.add_argument("--llm-distribution", choices=["uniform", "lognormal", "exponential", "fixed"], default="uniform")
+    parser.add_argument("--llm-failure-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--backboard", choices=["inprocess", "http"], default="inprocess",
+        help="fake SDK client, or the real SDK against benchmarks/backboard_server.py on a local port",
+    )
+    parser.add_argument("--backboard-url", help="real SDK against an already running stand-in (implies http)")
+    parser.add_argument("--search-latency", type=float, default=0.15)
+    parser.add_argument("--search-error-rate", type=float, default=0.0, help="fraction of Brave calls answered 503")
+    parser.add_argument("--search-429-rate", type=float, default=0.0)
+    parser.add_argument("--brave-rate", type=float, default=1000.0, help="starting Brave token rate (requests/s)")
+    parser.add_argument("--page-latency", type=float, default=0.05)
+    parser.add_argument("--image-latency", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="result file (default benchmarks/results/pipeline-<utc stamp>.json)")
+    parser.add_argument("--baseline", help="earlier result file to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.25, help="allowed fractional p95/throughput change")
+    parser.add_argument("--min-ms", type=float, default=5.0, help="ignore stages faster than this at p95")
+    args = parser.parse_args()
+    args.targets = [target for target in args.targets.split(",") if target in ("api", "agent")]
+
+    server = StubServer(
+        ServerProfile(
+            page_latency=Latency(args.page_latency),
+            image_latency=Latency(args.image_latency),
+            search_latency=Latency(args.search_latency, args.search_latency / 3),
+            search_error_rate=args.search_error_rate,
+            search_429_rate=args.search_429_rate,
+        ),
+        image_count=args.fixture_images,
+        seed=args.seed,
+    ).start()
+    started_at = datetime.now(timezone.utc)
+    try:
+        with tempfile.TemporaryDirectory(prefix="bench-pipeline-") as workdir:
+            _configure_env(args, workdir, server)
+            run = asyncio.run(_bench(args, server))
+    finally:
+        server.stop()
+
+    result = {
+        "benchmark": "pipeline",
+        "started_at": started_at.isoformat(),
+        "git_commit": _git_commit(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "baseline")},
+        **run,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"pipeline-{started_at:%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as fh:
+        json.dump(result, fh, indent=2)
+    print(json.dumps(result, indent=2))
+    print(f"saved {output}", file=sys.stderr)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as fh:
+            regressions = compare(result, json.load(fh), args.max_regression, args.min_ms)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
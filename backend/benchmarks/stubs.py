@@ -0,0 +1,439 @@
+"""
+Local stand-ins for the pipeline's remote dependencies, with configurable
+latency and failure rates: a scripted Backboard (in-process client here, HTTP
+in benchmarks/backboard_server.py), and one HTTP server that serves post
+pages, fixture images and a Brave-compatible search API.
+"""
+import asyncio
+import io
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from backboard import BackboardNotFoundError, BackboardServerError
+from backboard.models import Assistant, MessageResponse, Thread, ToolOutputsResponse
+from PIL import Image
+
+from benchmarks.fixtures import sample_images
+
+
+@dataclass(frozen=True)
+class Latency:
+    """
+    Injected delay in seconds. `uniform`: mean +/- jitter; `lognormal`: the
+    given mean with sigma=jitter (long right tail, like LLM calls);
+    `exponential`: the given mean; `fixed`: always mean.
+    """
+
+    mean: float = 0.0
+    jitter: float = 0.0
+    kind: str = "uniform"
+
+    @classmethod
+    def parse(cls, spec: str) -> "Latency":
+        """'0.3', 'uniform:0.3:0.1', 'lognormal:0.8:0.5', 'exponential:0.2' or 'fixed:0.05'."""
+        parts = spec.split(":")
+        if len(parts) == 1:
+            return cls(float(parts[0]))
+        kind, numbers = parts[0], [float(part) for part in parts[1:]]
+        if kind not in ("uniform", "lognormal", "exponential", "fixed"):
+            raise ValueError(f"unknown latency distribution: {kind}")
+        return cls(numbers[0], numbers[1] if len(numbers) > 1 else 0.0, kind)
+
+    def sample(self, rng: random.Random) -> float:
+        if self.mean <= 0:
+            return 0.0
+        if self.kind == "fixed":
+            return self.mean
+        if self.kind == "exponential":
+            return rng.expovariate(1 / self.mean)
+        if self.kind == "lognormal":
+            sigma = max(self.jitter, 1e-6)
+            return rng.lognormvariate(math.log(self.mean) - sigma * sigma / 2, sigma)
+        return max(0.0, self.mean + rng.uniform(-self.jitter, self.jitter))
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _tool_call(name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": f"call_{uuid.uuid4().hex[:12]}",
+        "type": "function",
+        "function": {"name": name, "arguments": json.dumps(arguments)},
+    }
+
+
+# Overridable from a JSON file (see ScriptedBackboard); "{claim}" is substituted.
+DEFAULT_SCRIPT: Dict[str, Any] = {
+    "tool_rounds": [["web_search_llm", "numeric_verify"], ["credibility_llm"]],
+    "queries": ["{claim}", "{claim} fact check"],
+    "selected": 3,
+    "tier": "medium",
+    "synthesis": {
+        "ai_generated_risk_score": 0.1,
+        "misinformation_risk_score": 0.5,
+        "confidence": 0.5,
+    },
+}
+
+
+class ScriptedBackboard:
+    """
+    The subset of the Backboard API the app uses, as plain JSON payloads,
+    with scripted model replies that follow the real conversation. The main
+    assistant asks for each of `tool_rounds` in turn (credibility_llm gets
+    the sources web search selected, and is dropped when there are none),
+    then synthesises an AgentOutput from the evidence bundle. The
+    WebSearchTool and CredibilityTool assistants plan queries, select
+    results and rate sources. Unknown assistant, thread or run ids raise
+    KeyError (a 404 upstream).
+    """
+
+    def __init__(self, script: Optional[Dict[str, Any]] = None):
+        self.script = {**DEFAULT_SCRIPT, **(script or {})}
+        self._lock = threading.Lock()
+        self._assistants: Dict[str, str] = {}
+        self._threads: Dict[str, str] = {}
+        self._runs: Dict[str, Dict[str, Any]] = {}
+
+    def create_assistant(self, name: str, description: str = "") -> Dict[str, Any]:
+        assistant_id = str(uuid.uuid4())
+        with self._lock:
+            self._assistants[assistant_id] = name
+        return {
+            "assistant_id": assistant_id,
+            "name": name,
+            "description": description,
+            "created_at": _now().isoformat(),
+        }
+
+    def create_thread(self, assistant_id: str) -> Dict[str, Any]:
+        with self._lock:
+            name = self._assistants[str(assistant_id)]
+            thread_id = str(uuid.uuid4())
+            self._threads[thread_id] = name
+        return {"thread_id": thread_id, "created_at": _now().isoformat(), "messages": []}
+
+    def _message(self, thread_id: str, **fields: Any) -> Dict[str, Any]:
+        return {
+            "message": "Message added",
+            "thread_id": str(thread_id),
+            "status": "COMPLETED",
+            "timestamp": _now().isoformat(),
+            **fields,
+        }
+
+    def add_message(self, thread_id: str, content: str) -> Dict[str, Any]:
+        with self._lock:
+            name = self._threads[str(thread_id)]
+        if name == "WebSearchTool":
+            return self._message(thread_id, content=json.dumps(self._search_reply(json.loads(content))))
+        if name == "CredibilityTool":
+            return self._message(thread_id, content=json.dumps(self._credibility_reply(json.loads(content))))
+        if "EVIDENCE_BUNDLE:" in content:
+            return self._message(thread_id, content=json.dumps(self._synthesis_reply(content)))
+
+        payload = json.loads(content)
+        claims = [claim for claim in payload.get("claims", []) if claim] or ["unlabelled claim"]
+        run_id = uuid.uuid4().hex
+        run = {"round": 0, "claim": claims[0], "sources": []}
+        calls = self._round_calls(run)
+        if not calls:
+            return self._message(thread_id, content="No tools needed.", run_id=run_id)
+        with self._lock:
+            self._runs[run_id] = run
+        return self._message(
+            thread_id,
+            message="Tool calls required",
+            status="REQUIRES_ACTION",
+            tool_calls=calls,
+            run_id=run_id,
+        )
+
+    def submit_tool_outputs(self, thread_id: str, run_id: str, tool_outputs: List[Dict[str, Any]]) -> Dict[str, Any]:
+        with self._lock:
+            run = self._runs[run_id]
+        for output in tool_outputs:
+            try:
+                data = json.loads(output.get("output") or "{}")
+            except ValueError:
+                continue
+            if isinstance(data, dict):
+                run["sources"].extend(
+                    {"url": item["url"]} for item in data.get("selected", []) or [] if item.get("url")
+                )
+        run["round"] += 1
+        calls = self._round_calls(run)
+        reply = {
+            "message": "Tool calls required" if calls else "Run completed",
+            "thread_id": str(thread_id),
+            "run_id": run_id,
+            "status": "REQUIRES_ACTION" if calls else "COMPLETED",
+            "timestamp": _now().isoformat(),
+        }
+        if calls:
+            reply["tool_calls"] = calls
+        else:
+            reply["content"] = "Evidence gathered."
+            with self._lock:
+                self._runs.pop(run_id, None)
+        return reply
+
+    def _round_calls(self, run: Dict[str, Any]) -> List[Dict[str, Any]]:
+        rounds = self.script["tool_rounds"]
+        while run["round"] < len(rounds):
+            calls = []
+            for name in rounds[run["round"]]:
+                if name == "credibility_llm":
+                    if run["sources"]:
+                        calls.append(_tool_call(name, {"sources": run["sources"]}))
+                elif name == "web_search_llm":
+                    calls.append(_tool_call(name, {"claim_text": run["claim"], "top_k": 5, "claim_id": 0}))
+                else:
+                    calls.append(_tool_call(name, {"claim_text": run["claim"]}))
+            if calls:
+                return calls
+            run["round"] += 1
+        return []
+
+    def _search_reply(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        claim = payload.get("claim_text", "")
+        results = payload.get("search_results") or []
+        if not results:
+            return {"queries": [query.replace("{claim}", claim) for query in self.script["queries"]]}
+        return {
+            "selected": [
+                {**item, "evidence_summary": item.get("snippet", "")}
+                for item in results[: int(self.script["selected"])]
+            ],
+            "notes": [],
+        }
+
+    def _credibility_reply(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "items": [
+                {
+                    "url": source["url"],
+                    "domain": source.get("domain", ""),
+                    "tier": self.script["tier"],
+                    "rationale": "Stub rating.",
+                    "signals": ["stub"],
+                }
+                for source in payload.get("sources", [])
+            ]
+        }
+
+    def _synthesis_reply(self, content: str) -> Dict[str, Any]:
+        bundle = json.loads(content.split("EVIDENCE_BUNDLE:", 1)[1])
+        evidence = [
+            {
+                "claim_id": item.get("claim_id", 0),
+                "source_url": item.get("source_url"),
+                "source_credibility": item.get("source_credibility"),
+                "title": item.get("title"),
+            }
+            for item in bundle.get("evidence", [])
+        ]
+        return {
+            "verdict": "mixed" if evidence else "unverifiable",
+            "reasoning_chain": [f"{len(evidence)} stub evidence items."],
+            "evidence": evidence,
+            "uncertainties": [],
+            **self.script["synthesis"],
+        }
+
+
+class FakeBackboardClient:
+    """
+    In-process stand-in for BackboardClient over a ScriptedBackboard. Replies
+    go through the SDK's own response models. Every call sleeps for
+    `latency` and fails with BackboardServerError at `failure_rate`.
+    """
+
+    def __init__(
+        self,
+        latency: Latency = Latency(),
+        failure_rate: float = 0.0,
+        seed: int = 0,
+        script: Optional[Dict[str, Any]] = None,
+    ):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.base_url = "stub://backboard"
+        self.api_key = "stub"
+        self.backboard = ScriptedBackboard(script)
+        self._rng = random.Random(seed)
+        self.calls: Dict[str, int] = {}
+
+    async def _call(self, method: str) -> None:
+        self.calls[method] = self.calls.get(method, 0) + 1
+        await asyncio.sleep(self.latency.sample(self._rng))
+        if self._rng.random() < self.failure_rate:
+            raise BackboardServerError(f"stub {method} failure", status_code=500)
+
+    async def create_assistant(self, name: str, description: str = "", tools: Any = None, **_: Any) -> Assistant:
+        await self._call("create_assistant")
+        return Assistant.model_validate(self.backboard.create_assistant(name, description))
+
+    async def create_thread(self, assistant_id: Any, **_: Any) -> Thread:
+        await self._call("create_thread")
+        try:
+            return Thread.model_validate(self.backboard.create_thread(str(assistant_id)))
+        except KeyError:
+            raise BackboardNotFoundError(f"assistant {assistant_id} not found", status_code=404)
+
+    async def add_message(self, thread_id: Any, content: str, **_: Any) -> MessageResponse:
+        await self._call("add_message")
+        try:
+            return MessageResponse.model_validate(self.backboard.add_message(str(thread_id), content))
+        except KeyError:
+            raise BackboardNotFoundError(f"thread {thread_id} not found", status_code=404)
+
+    async def submit_tool_outputs(self, thread_id: Any, run_id: str, tool_outputs: List[Dict[str, Any]], **_: Any) -> ToolOutputsResponse:
+        await self._call("submit_tool_outputs")
+        try:
+            reply = self.backboard.submit_tool_outputs(str(thread_id), run_id, tool_outputs)
+        except KeyError:
+            raise BackboardNotFoundError(f"run {run_id} not found", status_code=404)
+        return ToolOutputsResponse.model_validate(reply)
+
+
+@dataclass(frozen=True)
+class ServerProfile:
+    page_latency: Latency = Latency()
+    image_latency: Latency = Latency()
+    search_latency: Latency = Latency()
+    search_error_rate: float = 0.0
+    search_429_rate: float = 0.0
+
+
+class StubServer:
+    """
+    Threaded HTTP server on 127.0.0.1 serving:
+
+    - /p/<post>/?images=<i,j>: a post page whose og:image/img tags point at fixture images
+    - /img/<i>.png: fixture image i (meme-style text renders)
+    - /res/v1/web/search?q=...: Brave web-search JSON; 503 at search_error_rate, 429 at search_429_rate
+    """
+
+    def __init__(
+        self,
+        profile: ServerProfile,
+        image_count: int = 8,
+        seed: int = 0,
+        corpus: Optional[List[Tuple[Image.Image, List[str]]]] = None,
+    ):
+        self.profile = profile
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self.images: List[Tuple[bytes, List[str]]] = []
+        for image, lines in corpus if corpus is not None else sample_images(image_count):
+            buffer = io.BytesIO()
+            image.save(buffer, format="PNG")
+            self.images.append((buffer.getvalue(), lines))
+        self.requests: Dict[str, int] = {}
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def image_url(self, index: int) -> str:
+        return f"{self.base_url}/img/{index}.png"
+
+    def post_url(self, post: str, images: List[int]) -> str:
+        return f"{self.base_url}/p/{post}/?images={','.join(str(i) for i in images)}"
+
+    def start(self) -> "StubServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _sleep(self, latency: Latency) -> None:
+        with self._rng_lock:
+            delay = latency.sample(self._rng)
+        time.sleep(delay)
+
+    def _roll(self, rate: float) -> bool:
+        with self._rng_lock:
+            return self._rng.random() < rate
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+            def _send(self, status: int, body: bytes, content_type: str, headers: Optional[Dict[str, str]] = None) -> None:
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self) -> None:
+                parsed = urlparse(self.path)
+                query = parse_qs(parsed.query)
+                route = parsed.path.strip("/").split("/")[0]
+                stub.requests[route] = stub.requests.get(route, 0) + 1
+
+                if route == "p":
+                    stub._sleep(stub.profile.page_latency)
+                    indices = [int(i) for i in (query.get("images") or ["0"])[0].split(",") if i]
+                    tags = "".join(f'<img src="/img/{i % len(stub.images)}.png">' for i in indices)
+                    og = f'<meta property="og:image" content="/img/{indices[0] % len(stub.images)}.png">' if indices else ""
+                    html = f"<html><head>{og}</head><body>{tags}</body></html>"
+                    self._send(200, html.encode("utf-8"), "text/html; charset=utf-8")
+                elif route == "img":
+                    stub._sleep(stub.profile.image_latency)
+                    try:
+                        index = int(parsed.path.rsplit("/", 1)[-1].split(".")[0])
+                        body = stub.images[index][0]
+                    except (ValueError, IndexError):
+                        self._send(404, b"not found", "text/plain")
+                        return
+                    self._send(200, body, "image/png")
+                elif parsed.path == "/res/v1/web/search":
+                    stub._sleep(stub.profile.search_latency)
+                    if stub._roll(stub.profile.search_429_rate):
+                        self._send(429, b"{}", "application/json", {"Retry-After": "1"})
+                        return
+                    if stub._roll(stub.profile.search_error_rate):
+                        self._send(503, b"{}", "application/json")
+                        return
+                    text = (query.get("q") or [""])[0]
+                    count = int((query.get("count") or ["5"])[0])
+                    slug = "-".join(text.lower().split())[:60] or "empty"
+                    results = [
+                        {
+                            "url": f"https://news{rank}.example.com/{slug}",
+                            "title": f"Result {rank} for {text}",
+                            "description": f"Stub snippet {rank} about {text}.",
+                        }
+                        for rank in range(count)
+                    ]
+                    self._send(200, json.dumps({"web": {"results": results}}).encode("utf-8"), "application/json")
+                else:
+                    self._send(404, b"not found", "text/plain")
+
+        return Handler
@@ -0,0 +1,106 @@
+"""
+Triage accuracy and cost on a labelled set of posts.
+
+`CLAIM_POSTS` hold something checkable, however short or oddly worded, and
+must all reach the agent: `claims_answered_locally` must be empty.
+`NON_CLAIM_POSTS` are greetings, celebrations, promotion and generated alt
+text; `non_claims_answered_locally` is the share triage spares an agent run.
+Every post is (caption, alt_text, ocr_text).
+
+    python -m benchmarks.triage --repeats 200
+"""
+import argparse
+import json
+import time
+from typing import Dict, List, Tuple
+
+from app.agents.triage import triage
+from benchmarks.fixtures import SAMPLE_LINES
+
+Post = Tuple[str, str, str]
+
+CLAIM_POSTS: List[Post] = [
+    ("Moon landing faked", "", ""),
+    ("Vaccines kill", "", ""),
+    ("5G spreads covid", "", ""),
+    ("The earth is flat", "", ""),
+    ("Election was stolen", "", ""),
+    ("Climate change is a hoax", "", ""),
+    ("They don't want you to know this", "", ""),
+    ("Drinking bleach cures covid", "", ""),
+    ("Taxes go up tomorrow", "", ""),
+    ("Good morning! New study proves coffee prevents cancer", "", ""),
+    ("Happy birthday to the president who banned guns", "", ""),
+    ("Throwback to when gas was $1", "", ""),
+    ("Happy Friday! 90% off everything", "", ""),
+    ("Read this before it's gone https://example.com/story", "", ""),
+    ("Share before they delete this!", "", ""),
+    ("", "Photo by Jane on May 1, 2024. May be an image of text that says 'WHO admits masks don't work'", ""),
+    ("", "", "UNEMPLOYMENT IS AT 3%"),
+    ("#vaccinesarepoison", "", ""),
+    ("Love this! @dailynews says the mayor resigned", "", ""),
+    ("Finally home. Turns out the border is closed", "", ""),
+] + [("", "", line) for line in SAMPLE_LINES]
+
+NON_CLAIM_POSTS: List[Post] = [
+    ("", "", ""),
+    ("🔥🔥🔥", "", ""),
+    ("", "Photo by Jane on May 1, 2024.", ""),
+    ("", "May be an image of 2 people, people smiling and beach", ""),
+    ("Happy birthday to my bestie! ❤️", "", ""),
+    ("Good morning everyone ☀️", "", ""),
+    ("Happy Friday! Link in bio", "", ""),
+    ("Throwback to summer vibes #tbt", "", ""),
+    ("Sunday brunch with the fam", "", ""),
+    ("Thank you all for the love and support", "", ""),
+    ("Merry Christmas from our family to yours 🎄", "", ""),
+    ("Congrats to the happy couple!", "", ""),
+    ("New post! Check it out", "", ""),
+    ("Follow for more 👉 @someaccount", "", ""),
+    ("Cute selfie lol", "", ""),
+    ("Missing these days", "", ""),
+    ("Sunset views 😍 #nofilter", "", ""),
+    ("Stay tuned, giveaway coming soon!", "", ""),
+    ("Feeling blessed and grateful", "", ""),
+    ("Weekend mood", "", ""),
+    ("Coffee first", "", ""),
+    ("Best day ever with my girls", "", ""),
+    ("Date night 💕", "", ""),
+    ("Happy anniversary babe, love you forever", "", ""),
+    ("Welcome to the family, baby Noah!", "", ""),
+    ("Can't wait for the weekend", "", ""),
+    ("Game day! Let's go", "", ""),
+    ("Outfit of the day #ootd", "", ""),
+]
+
+
+def _answered_locally(posts: List[Post]) -> List[Post]:
+    return [post for post in posts if triage(post[1], post[0], post[2]) is not None]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeats", type=int, default=200)
+    args = parser.parse_args()
+
+    posts = CLAIM_POSTS + NON_CLAIM_POSTS
+    started = time.perf_counter()
+    for _ in range(args.repeats):
+        for caption, alt_text, ocr_text in posts:
+            triage(alt_text, caption, ocr_text)
+    per_post_us = (time.perf_counter() - started) / (args.repeats * len(posts)) * 1e6
+
+    local = _answered_locally(NON_CLAIM_POSTS)
+    results: Dict[str, object] = {
+        "claim_posts": len(CLAIM_POSTS),
+        "claims_answered_locally": [" | ".join(part for part in post if part) for post in _answered_locally(CLAIM_POSTS)],
+        "non_claim_posts": len(NON_CLAIM_POSTS),
+        "non_claims_answered_locally": round(len(local) / len(NON_CLAIM_POSTS), 3),
+        "non_claims_escalated": [" | ".join(part for part in post if part) for post in NON_CLAIM_POSTS if post not in local],
+        "per_post_us": round(per_post_us, 1),
+    }
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()